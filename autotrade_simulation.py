@@ -4,9 +4,118 @@ The simulation tracks cash balance and open position based on a sequence
 of trade actions.  After each action a notification string containing the
 current balance and profit/loss relative to the starting capital is
 returned and optionally passed to a callback.
+
+:class:`SimLedger` holds the running account state and applies a trade in
+constant time; :func:`simulate_autotrade` replays a whole trade list on
+top of it.
 """
 from __future__ import annotations
-from typing import Iterable, Callable, Dict, List
+from dataclasses import dataclass
+from typing import Iterable, Callable, Dict, List, Mapping
+
+
+@dataclass
+class SimLedger:
+    """Running account of a simulated trading session.
+
+    Attributes
+    ----------
+    start_balance:
+        Initial amount of cash.
+    balance:
+        Current cash balance.
+    position:
+        Open quantity; negative values are short positions.
+    cost:
+        Cost basis of the open position (signed like ``position``).
+    realized:
+        Realized profit/loss of closed quantity, before fees.
+    fees:
+        Total fees paid.
+    last_price:
+        Price of the most recent trade, used for valuation.
+    fee_rate:
+        Fee charged per trade as a fraction of the traded value.
+    """
+
+    start_balance: float
+    balance: float | None = None
+    position: float = 0.0
+    cost: float = 0.0
+    realized: float = 0.0
+    fees: float = 0.0
+    last_price: float = 0.0
+    fee_rate: float = 0.0
+
+    def __post_init__(self) -> None:
+        self.start_balance = float(self.start_balance)
+        if self.balance is None:
+            self.balance = self.start_balance
+
+    def apply(self, side: str, price: float, qty: float) -> str:
+        """Book a trade and return the status message."""
+        side = side.upper()
+        price = float(price)
+        qty = float(qty)
+        if side == "BUY":
+            signed = qty
+        elif side == "SELL":
+            signed = -qty
+        else:
+            raise ValueError(f"unknown trade side: {side}")
+
+        fee = price * qty * self.fee_rate
+        self.balance -= signed * price + fee
+        self.fees += fee
+
+        if self.position == 0 or (self.position > 0) == (signed > 0):
+            self.cost += signed * price
+        else:
+            closing = min(abs(signed), abs(self.position))
+            direction = 1.0 if self.position > 0 else -1.0
+            avg = self.cost / self.position
+            self.realized += closing * direction * (price - avg)
+            self.cost -= avg * closing * direction
+            remainder = abs(signed) - closing
+            if remainder > 0:
+                # Position flipped sides; the rest opens at this price.
+                self.cost = -direction * remainder * price
+        self.position += signed
+        if self.position == 0:
+            self.cost = 0.0
+        self.last_price = price
+        return self.message()
+
+    def unrealized(self, price: float | None = None) -> float:
+        """Profit/loss of the open position valued at ``price``."""
+        price = self.last_price if price is None else price
+        return self.position * price - self.cost
+
+    def equity(self, price: float | None = None) -> float:
+        """Cash plus the open position valued at ``price``."""
+        price = self.last_price if price is None else price
+        return self.balance + self.position * price
+
+    def pnl(self, price: float | None = None) -> float:
+        """Total profit/loss relative to the starting balance."""
+        return self.equity(price) - self.start_balance
+
+    def message(self) -> str:
+        """Return the formatted balance and P&L notification."""
+        return f"Balance: {self.balance:.2f} | P&L: {self.pnl():+.2f}"
+
+    @classmethod
+    def replay(
+        cls,
+        actions: Iterable[Mapping[str, float]],
+        start_balance: float,
+        fee_rate: float = 0.0,
+    ) -> "SimLedger":
+        """Build a ledger by applying ``actions`` in order."""
+        ledger = cls(start_balance, fee_rate=fee_rate)
+        for trade in actions:
+            ledger.apply(trade["side"], trade["price"], trade["qty"])
+        return ledger
 
 
 def simulate_autotrade(
@@ -31,28 +140,11 @@ def simulate_autotrade(
     list[str]
         Formatted notifications for each processed action.
     """
-    balance = float(start_balance)
-    position = 0.0
-    last_price = 0.0
+    ledger = SimLedger(start_balance)
     notifications: List[str] = []
 
     for trade in actions:
-        side = trade["side"].upper()
-        price = float(trade["price"])
-        qty = float(trade["qty"])
-
-        if side == "BUY":
-            balance -= price * qty
-            position += qty
-        elif side == "SELL":
-            balance += price * qty
-            position -= qty
-        else:
-            raise ValueError(f"unknown trade side: {side}")
-
-        last_price = price
-        profit = balance + position * last_price - start_balance
-        message = f"Balance: {balance:.2f} | P&L: {profit:+.2f}"
+        message = ledger.apply(trade["side"], trade["price"], trade["qty"])
         notifications.append(message)
         if notify:
             notify(message)
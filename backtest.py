@@ -2,87 +2,330 @@
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 import logging
-from typing import Tuple
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 import pandas as pd
 import requests
 
-from strategies import get_strategy
+import http_client
+import ohlcv_store
+from backtest_engine import (
+    BARS_PER_YEAR,
+    BacktestConfig,
+    BacktestResult,
+    PortfolioResult,
+    run_engine,
+    run_portfolio,
+)
+from strategies import get_strategy, make_panel
 
 logger = logging.getLogger(__name__)
 
 BINANCE_KLINES_URL = "https://api.binance.com/api/v3/klines"
+KLINES_MAX_LIMIT = 1000
+SOURCE = "binance"
+# Parallel kline downloads and the minimum spacing between request starts.
+FETCH_WORKERS = 4
+MIN_REQUEST_INTERVAL = 0.1
+MAX_RATE_LIMIT_RETRIES = 3
+
+
+class RateLimiter:
+    """Space out calls so that at most one starts every ``interval`` seconds."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+_rate_limiter = RateLimiter(MIN_REQUEST_INTERVAL)
+
+
+def kline_chunks(start_ms: int, end_ms: int, interval: str) -> List[Tuple[int, int]]:
+    """Split ``start_ms``..``end_ms`` into ranges of at most one kline page."""
+    step = ohlcv_store.interval_ms(interval)
+    span = step * (KLINES_MAX_LIMIT - 1)
+    chunks = []
+    cursor = start_ms
+    while cursor <= end_ms:
+        chunks.append((cursor, min(cursor + span, end_ms)))
+        cursor += span + step
+    return chunks
+
+
+def _download_chunk(symbol: str, interval: str, start_ms: int, end_ms: int) -> list:
+    """Download one page of klines, backing off when rate limited."""
+    params = {
+        "symbol": symbol,
+        "interval": interval,
+        "startTime": start_ms,
+        "endTime": end_ms,
+        "limit": KLINES_MAX_LIMIT,
+    }
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        _rate_limiter.wait()
+        resp = http_client.get(BINANCE_KLINES_URL, params=params, timeout=10)
+        status = getattr(resp, "status_code", 200)
+        if status in (418, 429) and attempt < MAX_RATE_LIMIT_RETRIES:
+            headers = getattr(resp, "headers", None) or {}
+            retry_after = float(headers.get("Retry-After", 2 ** attempt))
+            logger.warning(
+                "Rate limited fetching %s candles, retrying in %.0fs", symbol, retry_after
+            )
+            time.sleep(retry_after)
+            continue
+        resp.raise_for_status()
+        return ohlcv_store.parse_binance_klines(resp.json())
+    return []  # pragma: no cover - loop always returns or raises
 
 
 def fetch_candles(symbol: str, start: str, end: str, interval: str = "1d") -> pd.DataFrame:
-    """Fetch historical candlestick data from Binance."""
+    """Return historical candlestick data from the local OHLCV store.
+
+    Only the parts of the requested range that have not been downloaded
+    before are fetched from Binance. Missing ranges are split into pages of
+    :data:`KLINES_MAX_LIMIT` candles and downloaded by up to
+    :data:`FETCH_WORKERS` threads, spaced by :data:`MIN_REQUEST_INTERVAL`.
+    A page with a malformed payload is logged and left missing, so the next
+    call requests it again; the other pages are stored either way.
+    """
     try:
         start_ms = int(datetime.fromisoformat(start).timestamp() * 1000)
         end_ms = int(datetime.fromisoformat(end).timestamp() * 1000)
     except ValueError as exc:
         logger.error("Invalid date format: %s - %s", start, end)
         raise ValueError("Invalid date format; expected YYYY-MM-DD") from exc
-    params = {
-        "symbol": symbol.upper(),
-        "interval": interval,
-        "startTime": start_ms,
-        "endTime": end_ms,
-    }
-    try:
-        resp = requests.get(BINANCE_KLINES_URL, params=params, timeout=10)
-        resp.raise_for_status()
-    except requests.RequestException as exc:
-        logger.error("Failed to fetch candles for %s: %s", symbol, exc)
-        raise
-    data = resp.json()
-    if not data:
-        logger.error("No candlestick data returned for %s", symbol)
-        return pd.DataFrame()
-    rows = [
-        {
-            "Date": datetime.fromtimestamp(int(item[0]) / 1000),
-            "Open": float(item[1]),
-            "High": float(item[2]),
-            "Low": float(item[3]),
-            "Close": float(item[4]),
-            "Volume": float(item[5]),
-        }
-        for item in data
+    symbol = symbol.upper()
+    chunks = [
+        chunk
+        for span in ohlcv_store.missing_spans(SOURCE, symbol, interval, start_ms, end_ms)
+        for chunk in kline_chunks(*span, interval)
     ]
-    df = pd.DataFrame(rows)
+    if chunks:
+        closed = int(time.time() * 1000) - ohlcv_store.interval_ms(interval)
+        workers = max(1, min(FETCH_WORKERS, len(chunks)))
+        error = None
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_download_chunk, symbol, interval, s, e): (s, e)
+                for s, e in chunks
+            }
+            for future in as_completed(futures):
+                chunk_start, chunk_end = futures[future]
+                try:
+                    rows = future.result()
+                except (ValueError, KeyError, TypeError, IndexError) as exc:
+                    # Checked first: JSON decode errors are RequestExceptions too.
+                    logger.error(
+                        "Malformed candles for %s %d-%d: %s",
+                        symbol,
+                        chunk_start,
+                        chunk_end,
+                        exc,
+                    )
+                    continue
+                except requests.RequestException as exc:
+                    logger.error("Failed to fetch candles for %s: %s", symbol, exc)
+                    error = error or exc
+                    continue
+                ohlcv_store.store_candles(SOURCE, symbol, interval, rows)
+                covered = chunk_end
+                if len(rows) >= KLINES_MAX_LIMIT:
+                    # Response was truncated; only the returned part is covered.
+                    covered = rows[-1][0]
+                ohlcv_store.add_span(
+                    SOURCE, symbol, interval, chunk_start, min(covered, closed)
+                )
+        if error is not None:
+            raise error
+    df = ohlcv_store.load_candles(SOURCE, symbol, interval, start_ms, end_ms)
     if df.empty:
-        return df
-    df.set_index("Date", inplace=True)
+        logger.error("No candlestick data returned for %s", symbol)
     return df
 
 
-def run_backtest(
+def equity_metrics(
+    signals: pd.DataFrame, config: Optional[BacktestConfig] = None
+) -> Tuple[float, float]:
+    """Return ROI and maximum drawdown of trading ``Signal`` under ``config``.
+
+    Without ``config`` the full balance is invested on every buy signal and
+    no costs are charged. The equity curve is stored in ``signals["Equity"]``.
+    """
+    result = run_engine(signals, config)
+    signals["Equity"] = result.equity / result.equity.iloc[0]
+    return result.metrics["roi"], result.metrics["max_drawdown"]
+
+
+def backtest_symbol(
     symbol: str,
     start: str,
     end: str,
+    /,
     strategy_name: str = "momentum",
     interval: str = "1d",
+    config: Optional[BacktestConfig] = None,
+    progress: Optional[Callable[[str], None]] = None,
     **strategy_params,
-) -> Tuple[float, float]:
-    """Run backtest for ``symbol`` and return ROI and drawdown."""
+) -> BacktestResult:
+    """Backtest ``symbol`` and return equity curve, trades and metrics.
+
+    ``config`` sets sizing, protective orders, fees and slippage; see
+    :class:`backtest_engine.BacktestConfig`. ``progress`` is called with
+    ``"fetch"``, ``"signals"`` and ``"simulate"`` as each step starts.
+    ``symbol``, ``start`` and ``end`` are positional-only, so strategy
+    parameters of the same name, e.g. the arbitrage ``symbol``, are passed
+    on to the strategy.
+    """
+    report = progress or (lambda step: None)
+    report("fetch")
     df = fetch_candles(symbol, start, end, interval)
     if df.empty:
         raise ValueError("No data returned from Binance")
     benchmark = df  # simplistic benchmark
+    report("signals")
     strategy = get_strategy(strategy_name, **strategy_params)
     signals = strategy.generate_signals(df, benchmark)
-    signals["Return"] = signals["Close"].pct_change().fillna(0)
-    mapping = {"buy": 1, "sell": 0}
-    signals["Position"] = signals["Signal"].map(mapping).ffill().fillna(0)
-    signals["Strategy_Return"] = signals["Return"] * signals["Position"].shift().fillna(0)
-    signals["Equity"] = (1 + signals["Strategy_Return"]).cumprod()
-    roi = float(signals["Equity"].iloc[-1] - 1)
-    cummax = signals["Equity"].cummax()
-    drawdown = float(((cummax - signals["Equity"]) / cummax).max())
+    report("simulate")
+    if config is None:
+        config = BacktestConfig(bars_per_year=BARS_PER_YEAR.get(interval, 365))
+    return run_engine(signals, config)
+
+
+def run_backtest(
+    symbol: str,
+    start: str,
+    end: str,
+    /,
+    strategy_name: str = "momentum",
+    interval: str = "1d",
+    config: Optional[BacktestConfig] = None,
+    **strategy_params,
+) -> Tuple[float, float]:
+    """Run backtest for ``symbol`` and return ROI and drawdown."""
+    result = backtest_symbol(
+        symbol, start, end, strategy_name, interval, config, **strategy_params
+    )
+    roi = result.metrics["roi"]
+    drawdown = result.metrics["max_drawdown"]
     logger.info("%s backtest ROI %.2f%%, drawdown %.2f%%", symbol, roi * 100, drawdown * 100)
     print(f"ROI: {roi:.2%}, Max Drawdown: {drawdown:.2%}")
     return roi, drawdown
 
-__all__ = ["run_backtest", "fetch_candles"]
+
+def _fetch_universe(
+    symbols: Iterable[str], start: str, end: str, interval: str, benchmark: str
+) -> Tuple[Dict[str, pd.DataFrame], pd.DataFrame]:
+    """Fetch candles of ``symbols`` and ``benchmark``; skip empty symbols."""
+    frames = {}
+    for symbol in symbols:
+        df = fetch_candles(symbol, start, end, interval)
+        if df.empty:
+            logger.warning("Skipping %s: no candles", symbol)
+            continue
+        frames[symbol.upper()] = df
+    if not frames:
+        raise ValueError("No data returned from Binance")
+    bench = fetch_candles(benchmark, start, end, interval)
+    if bench.empty:
+        raise ValueError(f"No benchmark data for {benchmark}")
+    return frames, bench
+
+
+def run_backtest_batch(
+    symbols: Iterable[str],
+    start: str,
+    end: str,
+    strategy_name: str = "momentum",
+    interval: str = "1d",
+    benchmark: str = "BTCUSDT",
+    **strategy_params,
+) -> Dict[str, Tuple[float, float]]:
+    """Backtest several symbols with a single batched signal pass.
+
+    Candles of all symbols are combined into one panel and scored with
+    :meth:`Strategy.generate_signals_batch` against ``benchmark``. Returns
+    ``symbol -> (roi, drawdown)``; symbols without data are skipped.
+    """
+    frames, bench = _fetch_universe(symbols, start, end, interval, benchmark)
+    strategy = get_strategy(strategy_name, **strategy_params)
+    signals = strategy.generate_signals_batch(make_panel(frames), bench)
+    results = {}
+    for symbol, df in frames.items():
+        results[symbol] = equity_metrics(signals[symbol].loc[df.index].copy())
+        logger.info(
+            "%s backtest ROI %.2f%%, drawdown %.2f%%",
+            symbol,
+            results[symbol][0] * 100,
+            results[symbol][1] * 100,
+        )
+    return results
+
+
+def run_portfolio_backtest(
+    symbols: Iterable[str],
+    start: str,
+    end: str,
+    strategy_name: str = "momentum",
+    interval: str = "1d",
+    benchmark: str = "BTCUSDT",
+    config: Optional[BacktestConfig] = None,
+    allocations: Optional[Dict[str, float]] = None,
+    **strategy_params,
+) -> PortfolioResult:
+    """Backtest ``symbols`` as one portfolio with shared cash.
+
+    Signals are scored against the real ``benchmark`` in one batched pass
+    and traded by :func:`backtest_engine.run_portfolio`. ``config.max_percent``
+    (or ``allocations`` per symbol) caps each position as a share of the
+    portfolio equity. ``metrics["benchmark_roi"]`` holds the buy-and-hold
+    return of the benchmark over the same period.
+    """
+    frames, bench = _fetch_universe(symbols, start, end, interval, benchmark)
+    strategy = get_strategy(strategy_name, **strategy_params)
+    signals = strategy.generate_signals_batch(make_panel(frames), bench)
+    if config is None:
+        config = BacktestConfig(bars_per_year=BARS_PER_YEAR.get(interval, 365))
+    allocations = {k.upper(): v for k, v in (allocations or {}).items()}
+    result = run_portfolio(
+        {symbol: signals[symbol].loc[df.index] for symbol, df in frames.items()},
+        config,
+        allocations,
+    )
+    bench_close = bench["Close"].reindex(result.equity.index).ffill().dropna()
+    result.metrics["benchmark_roi"] = (
+        float(bench_close.iloc[-1] / bench_close.iloc[0] - 1) if len(bench_close) else 0.0
+    )
+    logger.info(
+        "Portfolio backtest ROI %.2f%%, drawdown %.2f%% (benchmark %.2f%%)",
+        result.metrics["roi"] * 100,
+        result.metrics["max_drawdown"] * 100,
+        result.metrics["benchmark_roi"] * 100,
+    )
+    return result
+
+
+__all__ = [
+    "run_backtest",
+    "backtest_symbol",
+    "run_backtest_batch",
+    "run_portfolio_backtest",
+    "equity_metrics",
+    "fetch_candles",
+    "kline_chunks",
+    "RateLimiter",
+]
@@ -0,0 +1,555 @@
+"""NumPy backtest engine modelling the live auto-trading rules.
+
+:func:`run_engine` replays a frame of strategy signals the way
+``handle_signal`` and ``check_thresholds`` act on them live:
+
+* trades are triggered when the signal *changes* to ``buy`` or ``sell`` and
+  are filled at that bar's close,
+* buys are sized by ``trade_percent`` of the cash balance, a fixed
+  ``trade_amount`` or a fixed ``quantity`` and capped by ``max_percent`` of
+  equity (which also allows scaling into an open position),
+* a sell closes the whole position,
+* ``auto_stop``/``auto_takeprofit`` and ``trailing_percent`` close the
+  position intrabar when the bar's low/high crosses the level.
+
+Fees and slippage are charged on every fill. Signal changes and level
+crossings are located with vectorized NumPy operations; Python only loops
+over the resulting trade events, so long hourly series run in
+milliseconds.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+BARS_PER_YEAR = {
+    "1m": 525_600,
+    "5m": 105_120,
+    "15m": 35_040,
+    "30m": 17_520,
+    "1h": 8_760,
+    "4h": 2_190,
+    "1d": 365,
+    "1w": 52,
+}
+
+
+@dataclass
+class BacktestConfig:
+    """Trading rules and costs applied by :func:`run_engine`.
+
+    Percentages follow the bot configuration (``5`` means 5%); ``fee_rate``
+    and ``slippage`` are fractions of the traded value/price.
+    """
+
+    initial_balance: float = 1000.0
+    trade_percent: Optional[float] = 100.0
+    trade_amount: float = 0.0
+    quantity: float = 0.0
+    max_percent: Optional[float] = None
+    auto_stop: float = 0.0
+    auto_takeprofit: float = 0.0
+    trailing_percent: Optional[float] = None
+    fee_rate: float = 0.0
+    slippage: float = 0.0
+    bars_per_year: float = 365.0
+
+
+@dataclass
+class BacktestResult:
+    """Equity curve, closed trades and summary metrics of a backtest."""
+
+    equity: pd.Series
+    trades: pd.DataFrame
+    metrics: dict = field(default_factory=dict)
+
+
+TRADE_COLUMNS = [
+    "entry_time",
+    "exit_time",
+    "entry_price",
+    "exit_price",
+    "qty",
+    "pnl",
+    "return",
+    "reason",
+]
+
+
+def signal_events(signals: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return bar indices and sides (``1`` buy, ``-1`` sell) of signal changes."""
+    signals = np.asarray(signals, dtype=object)
+    changed = np.ones(len(signals), dtype=bool)
+    changed[1:] = signals[1:] != signals[:-1]
+    side = np.where(signals == "buy", 1, np.where(signals == "sell", -1, 0))
+    idx = np.flatnonzero(changed & (side != 0))
+    return idx, side[idx]
+
+
+def _buy_quantity(cfg: BacktestConfig, cash: float, qty: float, price: float, mark: float) -> float:
+    """Return the quantity to buy at ``price`` following the live sizing rules."""
+    position_val = qty * mark
+    if cfg.max_percent:
+        allowed = (cash + position_val) * cfg.max_percent / 100 - position_val
+        if allowed <= 0 or cash <= 0:
+            return 0.0
+    else:
+        if qty > 0:
+            return 0.0
+        allowed = cash
+    if cfg.trade_percent and cfg.trade_percent > 0:
+        size = cash * cfg.trade_percent / 100 / price
+    elif cfg.trade_amount > 0:
+        size = cfg.trade_amount / price
+    elif cfg.quantity > 0:
+        size = cfg.quantity
+    else:
+        size = 0.0
+    if cfg.max_percent:
+        size = min(size, allowed / price)
+    # Never spend more cash than available, fees included.
+    return max(0.0, min(size, cash / (price * (1 + cfg.fee_rate))))
+
+
+def _first_exit(
+    cfg: BacktestConfig,
+    opens: np.ndarray,
+    highs: np.ndarray,
+    lows: np.ndarray,
+    entry: float,
+    peak: float,
+) -> tuple[int, float, str, float]:
+    """Find the first bar in the window where a protective level is hit.
+
+    Returns ``(offset, fill price, reason, peak)``; ``offset`` is ``-1``
+    when no level is crossed. ``peak`` is the highest high seen so far and
+    carries the trailing stop over to the next window.
+    """
+    n = len(lows)
+    if n == 0:
+        return -1, 0.0, "", peak
+    fixed = -np.inf
+    if cfg.auto_stop and cfg.auto_stop > 0:
+        fixed = entry * (1 - cfg.auto_stop / 100)
+    stop = np.full(n, fixed)
+    if cfg.trailing_percent:
+        # The trailing level on a bar uses the highs of the bars before it.
+        prior = np.maximum.accumulate(np.concatenate(([peak], highs[:-1])))
+        stop = np.maximum(stop, prior * (1 - cfg.trailing_percent / 100))
+    stop_hit = lows <= stop
+    take = np.inf
+    if cfg.auto_takeprofit and cfg.auto_takeprofit > 0:
+        take = entry * (1 + cfg.auto_takeprofit / 100)
+    take_hit = highs >= take
+    hit = stop_hit | take_hit
+    if not hit.any():
+        return -1, 0.0, "", max(peak, float(highs.max()))
+    j = int(np.argmax(hit))
+    if stop_hit[j]:
+        # Assume the stop triggers first when both levels are inside a bar.
+        fill = min(opens[j], stop[j])
+        reason = "trailing_stop" if stop[j] > fixed else "stop_loss"
+    else:
+        fill = max(opens[j], take)
+        reason = "take_profit"
+    return j, float(fill), reason, peak
+
+
+def run_engine(
+    df: pd.DataFrame, config: Optional[BacktestConfig] = None
+) -> BacktestResult:
+    """Backtest the ``Signal`` column of ``df`` under ``config``.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        OHLC data with a ``Signal`` column as produced by
+        :meth:`Strategy.generate_signals`. Missing ``Open``/``High``/``Low``
+        columns default to ``Close``.
+    config : BacktestConfig, optional
+        Trading rules and costs. Defaults to investing the full balance on
+        every buy without costs or protective orders.
+
+    Returns
+    -------
+    BacktestResult
+        Equity curve, closed trades and metrics (``roi``, ``max_drawdown``,
+        ``trades``, ``win_rate``, ``fees``, ``exposure``, ``sharpe``).
+    """
+
+    cfg = config or BacktestConfig()
+    close = df["Close"].to_numpy(dtype=float)
+    opens = df["Open"].to_numpy(dtype=float) if "Open" in df else close
+    highs = df["High"].to_numpy(dtype=float) if "High" in df else close
+    lows = df["Low"].to_numpy(dtype=float) if "Low" in df else close
+    n = len(close)
+    event_idx, event_side = signal_events(df["Signal"].to_numpy())
+    protective = bool(
+        (cfg.auto_stop and cfg.auto_stop > 0)
+        or (cfg.auto_takeprofit and cfg.auto_takeprofit > 0)
+        or cfg.trailing_percent
+    )
+
+    cash = float(cfg.initial_balance)
+    qty = 0.0
+    cost = 0.0  # amount paid for the open position, fees included
+    entry_time = None
+    peak = -np.inf
+    fees = 0.0
+    # Bars at which cash/qty change, with the state after the change.
+    change_bars = [0]
+    change_cash = [cash]
+    change_qty = [0.0]
+    trades = []
+
+    def close_position(bar: int, fill: float, reason: str) -> None:
+        nonlocal cash, qty, cost, fees, entry_time, peak
+        proceeds = qty * fill
+        fee = proceeds * cfg.fee_rate
+        cash += proceeds - fee
+        fees += fee
+        pnl = proceeds - fee - cost
+        trades.append(
+            (
+                entry_time,
+                df.index[bar],
+                cost / qty,
+                fill,
+                qty,
+                pnl,
+                pnl / cost if cost else 0.0,
+                reason,
+            )
+        )
+        qty = 0.0
+        cost = 0.0
+        entry_time = None
+        peak = -np.inf
+        change_bars.append(bar)
+        change_cash.append(cash)
+        change_qty.append(0.0)
+
+    bounds = list(event_idx[1:]) + [n - 1]
+    for k, (i, side) in enumerate(zip(event_idx, event_side)):
+        if side > 0:
+            price = close[i] * (1 + cfg.slippage)
+            size = _buy_quantity(cfg, cash, qty, price, close[i])
+            if size > 0:
+                fee = size * price * cfg.fee_rate
+                cash -= size * price + fee
+                fees += fee
+                cost += size * price + fee
+                if qty == 0:
+                    entry_time = df.index[i]
+                    peak = price
+                qty += size
+                change_bars.append(i)
+                change_cash.append(cash)
+                change_qty.append(qty)
+        elif qty > 0:
+            close_position(i, close[i] * (1 - cfg.slippage), "signal")
+
+        if qty > 0 and protective:
+            # Look for a protective exit until (and including) the next event bar.
+            end = bounds[k] + 1
+            window = slice(i + 1, end)
+            j, fill, reason, peak = _first_exit(
+                cfg, opens[window], highs[window], lows[window], cost / qty, peak
+            )
+            if j >= 0:
+                close_position(i + 1 + j, fill * (1 - cfg.slippage), reason)
+
+    if qty > 0:
+        # Value the open position at the last close; it is reported as open.
+        trades.append(
+            (entry_time, None, cost / qty, close[-1], qty, qty * close[-1] - cost,
+             (qty * close[-1] - cost) / cost if cost else 0.0, "open")
+        )
+
+    bars = np.asarray(change_bars)
+    pos = np.searchsorted(bars, np.arange(n), side="right") - 1
+    cash_curve = np.asarray(change_cash)[pos]
+    qty_curve = np.asarray(change_qty)[pos]
+    equity_values = cash_curve + qty_curve * close
+    equity = pd.Series(equity_values, index=df.index, name="Equity")
+
+    trade_frame = pd.DataFrame(trades, columns=TRADE_COLUMNS)
+    return BacktestResult(
+        equity=equity,
+        trades=trade_frame,
+        metrics=compute_metrics(equity_values, trade_frame, qty_curve, fees, cfg),
+    )
+
+
+def compute_metrics(
+    equity: np.ndarray,
+    trades: pd.DataFrame,
+    qty: np.ndarray,
+    fees: float,
+    cfg: BacktestConfig,
+) -> dict:
+    """Return summary statistics of an equity curve and its trades."""
+    start = float(cfg.initial_balance)
+    roi = float(equity[-1] / start - 1) if len(equity) else 0.0
+    peaks = np.maximum.accumulate(equity) if len(equity) else equity
+    drawdown = float(((peaks - equity) / peaks).max()) if len(equity) else 0.0
+    returns = np.diff(equity) / equity[:-1] if len(equity) > 1 else np.array([])
+    std = returns.std() if len(returns) else 0.0
+    sharpe = (
+        float(returns.mean() / std * np.sqrt(cfg.bars_per_year)) if std > 0 else 0.0
+    )
+    closed = trades[trades["reason"] != "open"]
+    return {
+        "roi": roi,
+        "max_drawdown": drawdown,
+        "trades": int(len(closed)),
+        "win_rate": float((closed["pnl"] > 0).mean()) if len(closed) else 0.0,
+        "fees": float(fees),
+        "exposure": float((qty > 0).mean()) if len(qty) else 0.0,
+        "sharpe": sharpe,
+    }
+
+
+@dataclass
+class PortfolioResult:
+    """Portfolio equity, per-symbol holdings, trades and metrics."""
+
+    equity: pd.Series
+    holdings: pd.DataFrame
+    trades: pd.DataFrame
+    metrics: dict = field(default_factory=dict)
+    symbol_metrics: pd.DataFrame = field(default_factory=pd.DataFrame)
+
+
+def _aligned(frames: Mapping[str, pd.DataFrame], column: str, index: pd.Index) -> np.ndarray:
+    return np.column_stack(
+        [frames[sym][column].reindex(index).to_numpy() for sym in frames]
+    )
+
+
+def run_portfolio(
+    signals: Mapping[str, pd.DataFrame],
+    config: Optional[BacktestConfig] = None,
+    allocations: Optional[Mapping[str, float]] = None,
+) -> PortfolioResult:
+    """Backtest several symbols that share one cash balance.
+
+    Parameters
+    ----------
+    signals : Mapping[str, pd.DataFrame]
+        ``symbol -> frame`` with OHLC and ``Signal`` columns, e.g. the
+        per-symbol slices of :meth:`Strategy.generate_signals_batch`.
+        Frames are aligned on the union of their indexes.
+    config : BacktestConfig, optional
+        Trading rules and costs applied to every symbol. ``max_percent``
+        limits each position to that share of the total portfolio equity
+        and defaults to an equal split across the symbols.
+    allocations : Mapping[str, float], optional
+        Per-symbol ``max_percent`` overrides.
+
+    Returns
+    -------
+    PortfolioResult
+        Portfolio equity curve, per-symbol position values, trades (with a
+        ``symbol`` column), portfolio metrics and per-symbol metrics.
+    """
+
+    cfg = config or BacktestConfig()
+    symbols = list(signals)
+    n_sym = len(symbols)
+    index = signals[symbols[0]].index
+    for sym in symbols[1:]:
+        index = index.union(signals[sym].index)
+    frames = {sym: signals[sym] for sym in symbols}
+    close = _aligned(frames, "Close", index).astype(float)
+    ohlc = {}
+    for col in ("Open", "High", "Low"):
+        ohlc[col] = np.column_stack(
+            [
+                (frames[s][col] if col in frames[s] else frames[s]["Close"])
+                .reindex(index)
+                .to_numpy(dtype=float)
+                for s in symbols
+            ]
+        )
+    sig = _aligned(frames, "Signal", index).astype(object)
+    listed = np.isfinite(close)
+
+    # Signal-change events for all symbols at once.
+    changed = np.ones(sig.shape, dtype=bool)
+    changed[1:] = sig[1:] != sig[:-1]
+    side = np.where(sig == "buy", 1, np.where(sig == "sell", -1, 0))
+    side = np.where(changed & listed, side, 0)
+    event_bars = np.flatnonzero((side != 0).any(axis=1))
+    n = len(index)
+    # Next sell event per bar and symbol bounds each protective-exit search.
+    sell_pos = np.where(side == -1, np.arange(n)[:, None], n)
+    next_sell = np.minimum.accumulate(sell_pos[::-1], axis=0)[::-1]
+
+    default_limit = cfg.max_percent or 100.0 / n_sym
+    limits = np.array(
+        [(allocations or {}).get(sym, default_limit) for sym in symbols], dtype=float
+    )
+    protective = bool(
+        (cfg.auto_stop and cfg.auto_stop > 0)
+        or (cfg.auto_takeprofit and cfg.auto_takeprofit > 0)
+        or cfg.trailing_percent
+    )
+
+    cash = float(cfg.initial_balance)
+    qty = np.zeros(n_sym)
+    cost = np.zeros(n_sym)
+    peak = np.full(n_sym, -np.inf)
+    entry_bar = np.full(n_sym, -1)
+    pending: dict[int, tuple[int, float, str]] = {}
+    fees = 0.0
+    cash_bars = [0]
+    cash_values = [cash]
+    qty_changes: list[tuple[int, int, float]] = []
+    trades = []
+
+    def close_position(s: int, bar: int, fill: float, reason: str) -> None:
+        nonlocal cash, fees
+        proceeds = qty[s] * fill
+        fee = proceeds * cfg.fee_rate
+        cash += proceeds - fee
+        fees += fee
+        pnl = proceeds - fee - cost[s]
+        trades.append(
+            (symbols[s], entry_bar[s], bar, cost[s] / qty[s], fill, qty[s],
+             pnl, pnl / cost[s] if cost[s] else 0.0, reason)
+        )
+        qty[s] = cost[s] = 0.0
+        peak[s] = -np.inf
+        entry_bar[s] = -1
+        pending.pop(s, None)
+        cash_bars.append(bar)
+        cash_values.append(cash)
+        qty_changes.append((bar, s, 0.0))
+
+    def schedule_exit(s: int, bar: int) -> None:
+        end = min(int(next_sell[bar + 1, s]) if bar + 1 < n else n, n - 1) + 1
+        window = slice(bar + 1, end)
+        j, fill, reason, _ = _first_exit(
+            cfg, ohlc["Open"][window, s], ohlc["High"][window, s],
+            ohlc["Low"][window, s], cost[s] / qty[s], peak[s],
+        )
+        if j >= 0:
+            pending[s] = (bar + 1 + j, fill * (1 - cfg.slippage), reason)
+        else:
+            pending.pop(s, None)
+
+    def settle_exits(until: int) -> None:
+        for s, (bar, fill, reason) in sorted(pending.items(), key=lambda x: x[1][0]):
+            if bar <= until:
+                close_position(s, bar, fill, reason)
+
+    mark = pd.DataFrame(close, index=index).ffill().fillna(0.0).to_numpy()
+    for t in event_bars:
+        settle_exits(t)
+        sells = np.flatnonzero((side[t] == -1) & (qty > 0))
+        for s in sells:
+            close_position(s, t, close[t, s] * (1 - cfg.slippage), "signal")
+        buys = np.flatnonzero(side[t] == 1)
+        if not len(buys):
+            continue
+        # Equity and limits of all symbols are evaluated once per bar.
+        position_val = qty * mark[t]
+        equity = cash + position_val.sum()
+        allowed = equity * limits / 100 - position_val
+        price = close[t] * (1 + cfg.slippage)
+        for s in buys:
+            if allowed[s] <= 0 or cash <= 0:
+                continue
+            if cfg.trade_percent and cfg.trade_percent > 0:
+                size = cash * cfg.trade_percent / 100 / price[s]
+            elif cfg.trade_amount > 0:
+                size = cfg.trade_amount / price[s]
+            else:
+                size = cfg.quantity
+            size = min(size, allowed[s] / price[s], cash / (price[s] * (1 + cfg.fee_rate)))
+            if size <= 0:
+                continue
+            fee = size * price[s] * cfg.fee_rate
+            cash -= size * price[s] + fee
+            fees += fee
+            cost[s] += size * price[s] + fee
+            if qty[s] == 0:
+                entry_bar[s] = t
+                peak[s] = price[s]
+            elif cfg.trailing_percent and t > entry_bar[s]:
+                # Carry the highs seen since the first entry into the new search.
+                highs = ohlc["High"][entry_bar[s] + 1 : t + 1, s]
+                peak[s] = max(peak[s], np.nanmax(highs))
+            qty[s] += size
+            cash_bars.append(t)
+            cash_values.append(cash)
+            qty_changes.append((t, s, qty[s]))
+            if protective:
+                schedule_exit(s, t)
+    settle_exits(n - 1)
+
+    for s in np.flatnonzero(qty > 0):
+        value = qty[s] * mark[-1, s]
+        trades.append(
+            (symbols[s], entry_bar[s], -1, cost[s] / qty[s], mark[-1, s], qty[s],
+             value - cost[s], (value - cost[s]) / cost[s] if cost[s] else 0.0, "open")
+        )
+
+    qty_matrix = np.full((n, n_sym), np.nan)
+    qty_matrix[0] = 0.0
+    for bar, s, value in qty_changes:
+        qty_matrix[bar, s] = value
+    qty_matrix = pd.DataFrame(qty_matrix).ffill().to_numpy()
+    pos = np.searchsorted(np.asarray(cash_bars), np.arange(n), side="right") - 1
+    # Several cash updates on one bar: searchsorted picks the last of them.
+    cash_curve = np.asarray(cash_values)[pos]
+    holdings = qty_matrix * mark
+    equity_values = cash_curve + holdings.sum(axis=1)
+
+    trade_frame = pd.DataFrame(trades, columns=["symbol"] + TRADE_COLUMNS)
+    for col in ("entry_time", "exit_time"):
+        bars = trade_frame[col].to_numpy(dtype=int)
+        times = pd.Series(index[np.maximum(bars, 0)], index=trade_frame.index)
+        trade_frame[col] = times.where(bars >= 0)
+    invested = (qty_matrix > 0).any(axis=1)
+    metrics = compute_metrics(equity_values, trade_frame, invested, fees, cfg)
+    closed = trade_frame[trade_frame["reason"] != "open"]
+    grouped = trade_frame.groupby("symbol")
+    symbol_metrics = pd.DataFrame(
+        {
+            "trades": closed.groupby("symbol").size(),
+            "pnl": grouped["pnl"].sum(),
+            "win_rate": closed.groupby("symbol")["pnl"].apply(lambda p: (p > 0).mean()),
+        },
+        index=pd.Index(symbols, name="symbol"),
+    ).fillna({"trades": 0, "pnl": 0.0, "win_rate": 0.0})
+    symbol_metrics["trades"] = symbol_metrics["trades"].astype(int)
+    symbol_metrics["contribution"] = symbol_metrics["pnl"] / cfg.initial_balance
+    symbol_metrics["exposure"] = (qty_matrix > 0).mean(axis=0)
+    symbol_metrics["max_weight"] = (
+        holdings / np.where(equity_values > 0, equity_values, np.nan)[:, None]
+    ).max(axis=0)
+    return PortfolioResult(
+        equity=pd.Series(equity_values, index=index, name="Equity"),
+        holdings=pd.DataFrame(holdings, index=index, columns=symbols),
+        trades=trade_frame,
+        metrics=metrics,
+        symbol_metrics=symbol_metrics,
+    )
+
+
+__all__ = [
+    "BARS_PER_YEAR",
+    "BacktestConfig",
+    "BacktestResult",
+    "PortfolioResult",
+    "signal_events",
+    "run_engine",
+    "run_portfolio",
+    "compute_metrics",
+]
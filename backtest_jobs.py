@@ -0,0 +1,161 @@
+"""Background queue for backtest requests.
+
+Backtests can take tens of seconds for long ranges, so the bot hands them
+to :class:`BacktestQueue` instead of running them in the Telegram handler
+thread. A bounded thread pool runs the jobs; results are memoized by a hash
+of the request for ``ttl`` seconds and identical requests that arrive while
+a job is still running attach to that job instead of starting a new one.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Progress = Callable[[str], None]
+
+
+def request_key(request: Mapping[str, Any]) -> str:
+    """Return a stable hash of a backtest request."""
+    text = json.dumps(request, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class BacktestQueue:
+    """Run backtest jobs on ``workers`` threads with a TTL result cache.
+
+    Parameters
+    ----------
+    workers:
+        Maximum number of backtests running at the same time.
+    ttl:
+        Seconds a finished result is served from the cache.
+    """
+
+    def __init__(self, workers: int = 2, ttl: float = 3600.0) -> None:
+        self.workers = max(1, int(workers))
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="backtest"
+        )
+        self._lock = threading.Lock()
+        self._results: Dict[str, Tuple[float, Any]] = {}
+        self._running: Dict[str, Future] = {}
+        self._jobs: set = set()
+        # key -> [(progress, done, error)] of every requester
+        self._listeners: Dict[str, list] = {}
+
+    def cached(self, key: str) -> Optional[Any]:
+        """Return the unexpired result for ``key`` or ``None``."""
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is None:
+                return None
+            expires, result = entry
+            if expires < time.monotonic():
+                del self._results[key]
+                return None
+            return result
+
+    @property
+    def pending(self) -> int:
+        """Number of queued or running jobs."""
+        with self._lock:
+            return len(self._running)
+
+    def submit(
+        self,
+        request: Mapping[str, Any],
+        job: Callable[[Progress], Any],
+        progress: Optional[Progress] = None,
+        done: Optional[Callable[[Any], None]] = None,
+        error: Optional[Callable[[BaseException], None]] = None,
+    ) -> Tuple[str, Future]:
+        """Queue ``job`` for ``request`` unless its result is known.
+
+        ``job`` receives a progress callback and returns the result. Returns
+        ``(state, future)`` where ``state`` is ``"cached"`` for a memoized
+        result, ``"joined"`` when an identical job is already queued or
+        running, and ``"queued"`` otherwise. ``progress``, ``done`` and
+        ``error`` are called from the worker thread; every requester of a
+        shared job receives its updates. ``done`` is not called for cached
+        results, which the caller already has.
+        """
+        key = request_key(request)
+        result = self.cached(key)
+        if result is not None:
+            future: Future = Future()
+            future.set_result(result)
+            return "cached", future
+        with self._lock:
+            self._listeners.setdefault(key, []).append((progress, done, error))
+            running = self._running.get(key)
+            if running is not None:
+                return "joined", running
+            future = self._executor.submit(self._run, key, job)
+            self._running[key] = future
+            self._jobs.add(future)
+        future.add_done_callback(self._discard)
+        return "queued", future
+
+    def _discard(self, future: Future) -> None:
+        with self._lock:
+            self._jobs.discard(future)
+
+    def _listeners_for(self, key: str) -> list:
+        with self._lock:
+            return list(self._listeners.get(key, ()))
+
+    @staticmethod
+    def _call(callback: Optional[Callable], arg: Any) -> None:
+        if callback is None:
+            return
+        try:
+            callback(arg)
+        except Exception as exc:
+            logger.error("backtest callback failed: %s", exc)
+
+    def _run(self, key: str, job: Callable[[Progress], Any]) -> Any:
+        def report(text: str) -> None:
+            for progress, _, _ in self._listeners_for(key):
+                self._call(progress, text)
+
+        try:
+            result = job(report)
+        except BaseException as exc:
+            with self._lock:
+                self._running.pop(key, None)
+                listeners = self._listeners.pop(key, [])
+            for _, _, error in listeners:
+                self._call(error, exc)
+            raise
+        now = time.monotonic()
+        with self._lock:
+            for old in [k for k, (expires, _) in self._results.items() if expires < now]:
+                del self._results[old]
+            self._results[key] = (now + self.ttl, result)
+            self._running.pop(key, None)
+            listeners = self._listeners.pop(key, [])
+        for _, done, _ in listeners:
+            self._call(done, result)
+        return result
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until all queued jobs and their callbacks have finished."""
+        with self._lock:
+            futures = list(self._jobs)
+        wait(futures, timeout=timeout)
+
+    def shutdown(self) -> None:
+        """Stop accepting jobs and wait for running ones."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+__all__ = ["BacktestQueue", "request_key"]
@@ -0,0 +1,355 @@
+"""Parameter sweeps over strategy settings.
+
+Candles are fetched once and copied into a
+:class:`multiprocessing.shared_memory.SharedMemory` block. Worker processes
+of a :class:`~concurrent.futures.ProcessPoolExecutor` map that block as
+NumPy arrays instead of receiving pickled frames, rebuild the frame once
+per process and then evaluate their share of a grid or random search with
+:func:`backtest_engine.run_engine`. The result is a ranked
+:class:`pandas.DataFrame` with one row per parameter set.
+
+Usage::
+
+    python backtest_sweep.py BTCUSDT 2022-01-01 2024-01-01 \\
+        --strategy trend_following --interval 1h \\
+        --param short_window=10,20,30 --param long_window=50,100,200
+"""
+
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import itertools
+import logging
+import os
+import random
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backtest import fetch_candles
+from backtest_engine import BARS_PER_YEAR, BacktestConfig, run_engine
+from strategies import get_strategy
+
+logger = logging.getLogger(__name__)
+
+FRAME_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+# Engine metrics where a smaller value ranks first; all others rank descending.
+LOWER_IS_BETTER = frozenset({"max_drawdown", "fees"})
+
+# Frame spec: (shared memory name, number of rows, column names)
+FrameSpec = Tuple[str, int, Tuple[str, ...]]
+
+
+def share_frame(df: pd.DataFrame) -> Tuple[shared_memory.SharedMemory, FrameSpec]:
+    """Copy the OHLCV columns and index of ``df`` into shared memory.
+
+    The caller owns the returned block and must ``close`` and ``unlink`` it.
+    """
+    columns = tuple(c for c in FRAME_COLUMNS if c in df.columns)
+    n = len(df)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, n * 8 * (len(columns) + 1)))
+    index = np.ndarray((n,), dtype=np.int64, buffer=shm.buf)
+    index[:] = pd.DatetimeIndex(df.index).as_unit("ns").asi8
+    values = np.ndarray((len(columns), n), dtype=np.float64, buffer=shm.buf, offset=n * 8)
+    for row, col in zip(values, columns):
+        row[:] = df[col].to_numpy(dtype=np.float64)
+    return shm, (shm.name, n, columns)
+
+
+def attach_frame(spec: FrameSpec) -> Tuple[shared_memory.SharedMemory, pd.DataFrame]:
+    """Map a block created by :func:`share_frame` as a DataFrame.
+
+    The column arrays are views on the shared block; keep the returned
+    :class:`SharedMemory` alive while the frame is used.
+    """
+    name, n, columns = spec
+    shm = shared_memory.SharedMemory(name=name)
+    index = np.ndarray((n,), dtype=np.int64, buffer=shm.buf)
+    values = np.ndarray((len(columns), n), dtype=np.float64, buffer=shm.buf, offset=n * 8)
+    df = pd.DataFrame(
+        {col: values[i] for i, col in enumerate(columns)},
+        index=pd.DatetimeIndex(index.view("datetime64[ns]"), name="Date"),
+        copy=False,
+    )
+    return shm, df
+
+
+def expand_grid(grid: Mapping[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Return every combination of the values in ``grid``."""
+    keys = list(grid)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*grid.values())]
+
+
+def sample_params(
+    space: Mapping[str, Any], samples: int, seed: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Draw ``samples`` random parameter sets from ``space``.
+
+    Lists are sampled uniformly; ``(low, high)`` tuples draw integers when
+    both bounds are integers and floats otherwise.
+    """
+    rng = random.Random(seed)
+    draws = []
+    for _ in range(samples):
+        params = {}
+        for key, values in space.items():
+            if isinstance(values, tuple) and len(values) == 2:
+                low, high = values
+                if isinstance(low, int) and isinstance(high, int):
+                    params[key] = rng.randint(low, high)
+                else:
+                    params[key] = rng.uniform(low, high)
+            else:
+                params[key] = rng.choice(list(values))
+        draws.append(params)
+    return draws
+
+
+def strategy_kwargs(params: Mapping[str, Any]) -> Dict[str, Any]:
+    """Turn dotted keys such as ``weights.trend`` into nested dicts."""
+    kwargs: Dict[str, Any] = {}
+    for key, value in params.items():
+        target = kwargs
+        *parents, leaf = key.split(".")
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[leaf] = value
+    return kwargs
+
+
+def evaluate(
+    df: pd.DataFrame,
+    benchmark: pd.DataFrame,
+    strategy_name: str,
+    params: Mapping[str, Any],
+    config: Optional[BacktestConfig] = None,
+) -> Dict[str, Any]:
+    """Backtest one parameter set and return its params and metrics."""
+    row: Dict[str, Any] = dict(params)
+    try:
+        strategy = get_strategy(strategy_name, **strategy_kwargs(params))
+        signals = strategy.generate_signals(df, benchmark)
+        row.update(run_engine(signals, config).metrics)
+    except Exception as exc:
+        logger.warning("Sweep run %s failed: %s", dict(params), exc)
+        row["error"] = str(exc)
+    return row
+
+
+# Per-process state set up by ``_init_worker``.
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(
+    spec: FrameSpec,
+    bench_spec: Optional[FrameSpec],
+    strategy_name: str,
+    config: Optional[BacktestConfig],
+) -> None:
+    shm, df = attach_frame(spec)
+    blocks = [shm]
+    bench = df
+    if bench_spec is not None:
+        bench_shm, bench = attach_frame(bench_spec)
+        blocks.append(bench_shm)
+    _worker.update(
+        blocks=blocks, df=df, bench=bench, strategy=strategy_name, config=config
+    )
+
+
+def _evaluate_in_worker(params: Mapping[str, Any]) -> Dict[str, Any]:
+    return evaluate(
+        _worker["df"], _worker["bench"], _worker["strategy"], params, _worker["config"]
+    )
+
+
+def sweep_frames(
+    df: pd.DataFrame,
+    strategy_name: str,
+    param_sets: Iterable[Mapping[str, Any]],
+    benchmark: Optional[pd.DataFrame] = None,
+    config: Optional[BacktestConfig] = None,
+    workers: Optional[int] = None,
+    sort_by: str = "roi",
+) -> pd.DataFrame:
+    """Evaluate ``param_sets`` on ``df`` and return results ranked by ``sort_by``.
+
+    Metrics in :data:`LOWER_IS_BETTER` are sorted ascending, all others
+    descending. With ``workers`` greater than one the runs are spread over a process
+    pool that reads the candles from shared memory; otherwise they run in
+    this process. ``benchmark`` defaults to ``df`` like :func:`run_backtest`.
+    """
+    param_sets = list(param_sets)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(param_sets)))
+    if workers == 1:
+        bench = df if benchmark is None else benchmark
+        rows = [evaluate(df, bench, strategy_name, p, config) for p in param_sets]
+    else:
+        blocks = []
+        try:
+            shm, spec = share_frame(df)
+            blocks.append(shm)
+            bench_spec = None
+            if benchmark is not None:
+                bench_shm, bench_spec = share_frame(benchmark)
+                blocks.append(bench_shm)
+            chunksize = max(1, len(param_sets) // (workers * 4))
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(spec, bench_spec, strategy_name, config),
+            ) as pool:
+                rows = list(pool.map(_evaluate_in_worker, param_sets, chunksize=chunksize))
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+    results = pd.DataFrame(rows)
+    if sort_by in results:
+        results = results.sort_values(
+            sort_by, ascending=sort_by in LOWER_IS_BETTER, na_position="last"
+        )
+    return results.reset_index(drop=True)
+
+
+def run_sweep(
+    symbol: str,
+    start: str,
+    end: str,
+    strategy_name: str = "trend_following",
+    grid: Optional[Mapping[str, Sequence[Any]]] = None,
+    samples: Optional[int] = None,
+    interval: str = "1d",
+    benchmark: Optional[str] = None,
+    config: Optional[BacktestConfig] = None,
+    workers: Optional[int] = None,
+    sort_by: str = "roi",
+    seed: Optional[int] = None,
+) -> pd.DataFrame:
+    """Fetch candles once and evaluate a parameter grid or random search.
+
+    ``grid`` maps parameter names to candidate values; with ``samples`` set,
+    that many random combinations are drawn instead of the full grid.
+    Nested parameters use dotted names, e.g. ``weights.trend`` for the
+    momentum score weights. ``(low, high)`` ranges are only valid for a
+    random search and raise :class:`ValueError` without ``samples``.
+    """
+    grid = grid or {}
+    ranges = range_params(grid)
+    if ranges and not samples:
+        raise ValueError(
+            f"Ranges need a random search, set samples for: {', '.join(ranges)}"
+        )
+    df = fetch_candles(symbol, start, end, interval)
+    if df.empty:
+        raise ValueError("No data returned from Binance")
+    bench = None
+    if benchmark and benchmark.upper() != symbol.upper():
+        bench = fetch_candles(benchmark, start, end, interval)
+        if bench.empty:
+            raise ValueError(f"No benchmark data for {benchmark}")
+    if config is None:
+        config = BacktestConfig(bars_per_year=BARS_PER_YEAR.get(interval, 365))
+    param_sets = sample_params(grid, samples, seed) if samples else expand_grid(grid)
+    logger.info("Sweeping %d parameter sets for %s", len(param_sets), symbol)
+    return sweep_frames(df, strategy_name, param_sets, bench, config, workers, sort_by)
+
+
+def _parse_value(text: str) -> Any:
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+def range_params(grid: Mapping[str, Any]) -> List[str]:
+    """Return the names in ``grid`` given as ``(low, high)`` ranges."""
+    return [key for key, values in grid.items() if isinstance(values, tuple)]
+
+
+def parse_param(spec: str) -> Tuple[str, Any]:
+    """Parse ``name=a,b,c`` into a value list or ``name=low:high`` into a range."""
+    name, _, values = spec.partition("=")
+    if not name or not values:
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUES, got {spec!r}")
+    if ":" in values:
+        low, high = values.split(":", 1)
+        return name, (_parse_value(low), _parse_value(high))
+    return name, [_parse_value(v) for v in values.split(",")]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Backtest a grid of strategy parameters")
+    parser.add_argument("symbol")
+    parser.add_argument("start", help="YYYY-MM-DD")
+    parser.add_argument("end", help="YYYY-MM-DD")
+    parser.add_argument("--strategy", default="trend_following")
+    parser.add_argument("--interval", default="1d")
+    parser.add_argument("--benchmark", help="benchmark symbol (default: the symbol itself)")
+    parser.add_argument(
+        "--param",
+        action="append",
+        type=parse_param,
+        default=[],
+        help="NAME=v1,v2,... or NAME=low:high for random search (repeatable)",
+    )
+    parser.add_argument("--samples", type=int, help="number of random draws instead of the full grid")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--fee", type=float, default=0.0, help="fee rate per fill, e.g. 0.001")
+    parser.add_argument("--slippage", type=float, default=0.0, help="slippage per fill, e.g. 0.0005")
+    parser.add_argument("--sort", default="roi", help="metric to rank by (default: roi)")
+    parser.add_argument("--top", type=int, default=20, help="rows to print")
+    args = parser.parse_args(argv)
+    ranges = range_params(dict(args.param))
+    if ranges and not args.samples:
+        parser.error(f"--samples is required for NAME=low:high ranges ({', '.join(ranges)})")
+
+    config = BacktestConfig(
+        fee_rate=args.fee,
+        slippage=args.slippage,
+        bars_per_year=BARS_PER_YEAR.get(args.interval, 365),
+    )
+    results = run_sweep(
+        args.symbol,
+        args.start,
+        args.end,
+        args.strategy,
+        grid=dict(args.param),
+        samples=args.samples,
+        interval=args.interval,
+        benchmark=args.benchmark,
+        config=config,
+        workers=args.workers,
+        sort_by=args.sort,
+        seed=args.seed,
+    )
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(results.head(args.top).to_string(index=False))
+
+
+__all__ = [
+    "LOWER_IS_BETTER",
+    "share_frame",
+    "attach_frame",
+    "expand_grid",
+    "sample_params",
+    "strategy_kwargs",
+    "evaluate",
+    "sweep_frames",
+    "run_sweep",
+    "range_params",
+    "parse_param",
+]
+
+
+if __name__ == "__main__":
+    main()
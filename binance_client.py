@@ -1,12 +1,16 @@
 import hmac
 import hashlib
+import itertools
+import random
 import logging
 import time
 import threading
 import json
+from typing import Callable
 from urllib.parse import urlencode
 
-import requests
+import http_client
+
 try:  # pragma: no cover - optional dependency in tests
     from requests.exceptions import RequestException, Timeout
 except Exception:  # pragma: no cover - fallback when requests is stubbed
@@ -57,7 +61,7 @@ class BinanceClient:
         signed = self._sign(params)
         headers = {"X-MBX-APIKEY": self.api_key}
         try:
-            response = requests.post(
+            response = http_client.post(
                 f"{self.BASE_URL}/fapi/v1/order",
                 headers=headers,
                 params=signed,
@@ -85,7 +89,7 @@ class BinanceClient:
 
         order_type = "STOP_MARKET"
         try:
-            resp = requests.get(
+            resp = http_client.get(
                 f"{self.BASE_URL}/fapi/v1/ticker/price",
                 params={"symbol": symbol},
                 timeout=10,
@@ -111,7 +115,7 @@ class BinanceClient:
         signed = self._sign(params)
         headers = {"X-MBX-APIKEY": self.api_key}
         try:
-            response = requests.post(
+            response = http_client.post(
                 f"{self.BASE_URL}/fapi/v1/order",
                 headers=headers,
                 params=signed,
@@ -136,7 +140,7 @@ class BinanceClient:
         signed = self._sign(params)
         headers = {"X-MBX-APIKEY": self.api_key}
         try:
-            response = requests.get(
+            response = http_client.get(
                 f"{self.BASE_URL}/fapi/v2/balance",
                 headers=headers,
                 params=signed,
@@ -161,52 +165,97 @@ try:  # pragma: no cover - optional dependency
 except Exception:  # pragma: no cover - allow running without websocket-client
     websocket = None
 
+try:  # pragma: no cover - optional faster JSON decoder
+    import orjson
 
-class BinanceWebSocketClient:
-    """Lightweight Binance WebSocket client for ticker updates.
+    _loads = orjson.loads
+except Exception:  # pragma: no cover - fall back to the standard library
+    _loads = json.loads
 
-    Prices received from the Binance futures WebSocket are stored in-memory
-    and can be retrieved via :meth:`get_price`.
-    """
+# Stream type -> per-symbol stream suffix
+STREAM_SUFFIXES = {
+    "ticker": "@ticker",
+    "miniTicker": "@miniTicker",
+    "bookTicker": "@bookTicker",
+    "markPrice": "@markPrice@1s",
+}
+# One stream with the mark prices of all futures, used by ``allMarkPrice``.
+ALL_MARK_PRICE_STREAM = "!markPrice@arr@1s"
+STREAM_TYPES = (*STREAM_SUFFIXES, "allMarkPrice")
 
-    STREAM_URL = "wss://fstream.binance.com/ws"
 
-    def __init__(self, symbols: list[str] | None = None) -> None:
-        self.symbols = [s.lower() for s in (symbols or [])]
-        self._prices: dict[str, float] = {}
-        self._lock = threading.Lock()
+class _StreamShard:
+    """One combined-stream connection carrying a subset of the symbols."""
+
+    def __init__(self, client: "BinanceWebSocketClient", symbols: set[str]) -> None:
+        self.client = client
+        self.symbols = set(symbols)
         self.connected = False
+        self.closed = False
+        # Symbols the server streams on the current connection. Updated by
+        # the shard thread and by senders on other threads.
+        self._streamed: set[str] = set()
+        self._streamed_lock = threading.Lock()
         self._ws: websocket.WebSocketApp | None = None
-        if websocket is not None:
-            self._connect()
-        else:  # pragma: no cover - when websocket-client isn't installed
-            logger.warning("websocket-client library not available")
-
-    def _connect(self) -> None:
-        """Establish WebSocket connection and subscribe to streams."""
+        self._send_lock = threading.Lock()
+        self._next_send = 0.0
+        self._ids = itertools.count(1)
+        self._stop = threading.Event()
+        self._opened = False
+        self.last_message = 0.0
+
+    def url(self) -> str:
+        with self._streamed_lock:
+            streamed = sorted(self._streamed)
+        streams = "/".join(self.client.stream_names(streamed))
+        return f"{self.client.STREAM_URL}?streams={streams}"
+
+    def _wanted(self) -> set[str]:
+        # ``symbols`` is changed by the client under its shard lock.
+        with self.client._shard_lock:
+            return set(self.symbols)
+
+    def start(self) -> None:
+        """Run the connection on one thread until :meth:`close`."""
+        threading.Thread(target=self._run, name="binance-ws", daemon=True).start()
+
+    def _run(self) -> None:
+        # Reconnects reuse this thread instead of starting new ones.
+        failures = 0
+        while not self.closed:
+            self._opened = False
+            self._connect_once()
+            self.connected = False
+            if self.closed:
+                break
+            failures = 0 if self._opened else failures + 1
+            delay = self.client.backoff_delay(failures)
+            logger.warning("WebSocket closed. Reconnecting in %.1fs", delay)
+            self._stop.wait(delay)
+
+    def _connect_once(self) -> None:
+        """Open the connection with all current symbols in the URL and block."""
+        wanted = self._wanted()
+        with self._streamed_lock:
+            self._streamed = wanted
 
         def on_open(ws: websocket.WebSocketApp) -> None:
             self.connected = True
-            if self.symbols:
-                params = [f"{s}@ticker" for s in self.symbols]
-                ws.send(
-                    json.dumps(
-                        {"method": "SUBSCRIBE", "params": params, "id": int(time.time())}
-                    )
-                )
+            self._opened = True
+            self.last_message = self.client.clock()
+            # Symbols added or removed while connecting differ from the URL.
+            wanted = self._wanted()
+            with self._streamed_lock:
+                missing = wanted - self._streamed
+                extra = self._streamed - wanted
+            if extra:
+                self.send("UNSUBSCRIBE", extra)
+            if missing:
+                self.send("SUBSCRIBE", missing)
 
         def on_message(ws: websocket.WebSocketApp, message: str) -> None:
-            try:
-                data = json.loads(message)
-                if "stream" in data and "data" in data:
-                    data = data["data"]
-                symbol = data.get("s")
-                price = data.get("c")
-                if symbol and price:
-                    with self._lock:
-                        self._prices[symbol.upper()] = float(price)
-            except Exception as exc:  # pragma: no cover - unexpected payloads
-                logger.error("WebSocket message error: %s", exc)
+            self.last_message = self.client.clock()
+            self.client._handle_message(message)
 
         def on_error(ws: websocket.WebSocketApp, error: Exception) -> None:
             logger.error("WebSocket error: %s", error)
@@ -215,47 +264,347 @@ class BinanceWebSocketClient:
             ws: websocket.WebSocketApp, close_status_code: int, close_msg: str
         ) -> None:
             self.connected = False
-            logger.warning(
-                "WebSocket closed: %s %s. Reconnecting...", close_status_code, close_msg
-            )
-            self._schedule_reconnect()
+            if not self.closed:
+                logger.warning("WebSocket closed: %s %s", close_status_code, close_msg)
 
         self._ws = websocket.WebSocketApp(
-            self.STREAM_URL,
+            self.url(),
             on_open=on_open,
             on_message=on_message,
             on_error=on_error,
             on_close=on_close,
         )
-        threading.Thread(target=self._ws.run_forever, daemon=True).start()
+        try:
+            # websocket-client sends pings and drops the connection when no
+            # pong arrives within ``ping_timeout``; server pings are answered
+            # automatically.
+            self._ws.run_forever(
+                ping_interval=self.client.ping_interval,
+                ping_timeout=self.client.ping_timeout,
+            )
+        except Exception as exc:  # pragma: no cover - network errors
+            logger.error("WebSocket connection error: %s", exc)
+
+    def silent_for(self) -> float:
+        """Seconds since the last message of an open connection."""
+        if not self.connected:
+            return 0.0
+        return self.client.clock() - self.last_message
+
+    def drop(self) -> None:
+        """Close the current connection; the run loop reconnects."""
+        if self._ws is not None:
+            try:
+                self._ws.close()
+            except Exception as exc:  # pragma: no cover - socket already gone
+                logger.debug("WebSocket close error: %s", exc)
 
-    def _schedule_reconnect(self) -> None:
-        """Attempt to reconnect after a short delay."""
+    def send(self, method: str, symbols: set[str] | list[str]) -> None:
+        """Send one (UN)SUBSCRIBE message, at most ``messages_per_second``.
 
-        def runner() -> None:
-            time.sleep(5)
-            if websocket is not None:
-                self._connect()
+        The caller waits for its send slot without holding any lock, so
+        concurrent senders are only delayed by the rate limit itself.
+        """
+        if not symbols or not self.connected or self._ws is None:
+            return
+        params = self.client.stream_names(symbols)
+        with self._send_lock:
+            now = time.monotonic()
+            slot = max(now, self._next_send)
+            self._next_send = slot + 1 / self.client.messages_per_second
+            message_id = next(self._ids)
+        if slot > now:
+            time.sleep(slot - now)
+        try:
+            self._ws.send(json.dumps({"method": method, "params": params, "id": message_id}))
+        except Exception as exc:  # pragma: no cover - network send error
+            logger.error("WebSocket %s error for %s: %s", method, params, exc)
+        with self._streamed_lock:
+            if method == "SUBSCRIBE":
+                self._streamed.update(symbols)
+            else:
+                self._streamed.difference_update(symbols)
+
+    def close(self) -> None:
+        self.closed = True
+        self.connected = False
+        self._stop.set()
+        self.drop()
 
-        threading.Thread(target=runner, daemon=True).start()
 
-    def subscribe(self, symbol: str) -> None:
-        """Subscribe to ticker updates for ``symbol``."""
-        sym = symbol.lower()
-        if sym in self.symbols:
+class _Outbox:
+    """Subscription changes collected under the lock and sent afterwards."""
+
+    def __init__(self) -> None:
+        self.new: list[_StreamShard] = []
+        self.sends: dict[_StreamShard, dict[str, set[str]]] = {}
+
+    def add(self, shard: _StreamShard, method: str, symbols) -> None:
+        ops = self.sends.setdefault(shard, {"SUBSCRIBE": set(), "UNSUBSCRIBE": set()})
+        ops[method].update(symbols)
+
+
+class BinanceWebSocketClient:
+    """Lightweight Binance WebSocket client for ticker updates.
+
+    Prices received from the Binance futures WebSocket are stored in-memory
+    and can be retrieved via :meth:`get_price`. ``on_price`` is called with
+    ``(symbol, price)`` for every update, on the socket thread.
+
+    Symbols are spread over several connections to the combined
+    ``/stream?streams=`` endpoint with at most ``max_streams`` streams each.
+    New symbols join the least loaded connection through a rate-limited
+    ``SUBSCRIBE`` message; when removals leave more connections than needed,
+    the smallest one is closed and its symbols move to the others.
+
+    ``stream_type`` selects the payload: ``miniTicker`` (default) and
+    ``ticker`` report the last price, ``bookTicker`` the mid of the best bid
+    and ask, ``markPrice`` the mark price once per second. ``allMarkPrice``
+    uses a single ``!markPrice@arr@1s`` connection carrying every futures
+    symbol and needs no subscriptions; updates of symbols that were not
+    subscribed are ignored.
+
+    Each price carries the time it was received and :meth:`get_price`
+    returns ``None`` once it is older than ``stale_after`` seconds, so
+    callers fall back to REST for symbols that stopped updating. Every
+    connection runs on a single thread that reconnects with exponential
+    backoff (``backoff_base`` doubling up to ``backoff_max`` seconds) and
+    sends ping frames every ``ping_interval`` seconds.
+    """
+
+    STREAM_URL = "wss://fstream.binance.com/stream"
+
+    def __init__(
+        self,
+        symbols: list[str] | None = None,
+        on_price: Callable[[str, float], None] | None = None,
+        max_streams: int = 200,
+        messages_per_second: float = 5.0,
+        stream_type: str = "miniTicker",
+        stale_after: float = 60.0,
+        ping_interval: float = 20.0,
+        ping_timeout: float = 10.0,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if stream_type not in STREAM_TYPES:
+            raise ValueError(
+                f"Unknown stream type {stream_type!r}; expected one of {', '.join(STREAM_TYPES)}"
+            )
+        self.stream_type = stream_type
+        self.all_market = stream_type == "allMarkPrice"
+        self.on_price = on_price
+        self.stale_after = stale_after
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.clock = clock
+        self.max_streams = max(1, int(max_streams))
+        self.messages_per_second = messages_per_second
+        self.symbols: list[str] = []
+        # symbol -> (price, receive time)
+        self._prices: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._shards: list[_StreamShard] = []
+        self._shard_of: dict[str, _StreamShard] = {}
+        self._shard_lock = threading.RLock()
+        if websocket is None:  # pragma: no cover - when websocket-client isn't installed
+            logger.warning("websocket-client library not available")
+        for sym in dict.fromkeys(s.lower() for s in (symbols or [])):
+            self.symbols.append(sym)
+        self._symbol_set = set(self.symbols)
+        if websocket is None:
             return
-        self.symbols.append(sym)
-        if self.connected and self._ws:
+        if self.all_market:
+            self._open_shard([])
+            return
+        for i in range(0, len(self.symbols), self.max_streams):
+            self._open_shard(self.symbols[i : i + self.max_streams])
+
+    @property
+    def connected(self) -> bool:
+        """Whether at least one connection is open."""
+        return any(shard.connected for shard in self._shards)
+
+    @property
+    def connections(self) -> int:
+        return len(self._shards)
+
+    def backoff_delay(self, failures: int) -> float:
+        """Return the wait before the next reconnect after ``failures`` attempts."""
+        delay = min(self.backoff_max, self.backoff_base * 2 ** failures)
+        return delay * random.uniform(0.5, 1.0)
+
+    def reconnect_stale(self) -> int:
+        """Drop open connections that received nothing for ``stale_after`` seconds.
+
+        Returns the number of connections that were dropped; each one
+        reconnects from its own thread.
+        """
+        with self._shard_lock:
+            stale = [s for s in self._shards if s.silent_for() > self.stale_after]
+        for shard in stale:
+            logger.warning("WebSocket silent for %.0fs; reconnecting", shard.silent_for())
+            shard.drop()
+        return len(stale)
+
+    def stream_names(self, symbols) -> list[str]:
+        """Return the stream names carrying ``symbols``."""
+        if self.all_market:
+            return [ALL_MARK_PRICE_STREAM]
+        suffix = STREAM_SUFFIXES[self.stream_type]
+        return [f"{s}{suffix}" for s in sorted(symbols)]
+
+    def _price(self, item: dict) -> float | None:
+        if self.stream_type == "bookTicker":
+            bid, ask = item.get("b"), item.get("a")
+            return (float(bid) + float(ask)) / 2 if bid and ask else None
+        field = "p" if self.stream_type in ("markPrice", "allMarkPrice") else "c"
+        value = item.get(field)
+        return float(value) if value else None
+
+    def _open_shard(self, symbols: list[str]) -> _StreamShard:
+        shard = _StreamShard(self, set(symbols))
+        self._shards.append(shard)
+        for sym in symbols:
+            self._shard_of[sym] = shard
+        shard.start()
+        return shard
+
+    def _handle_message(self, message: str) -> None:
+        try:
+            data = _loads(message)
+            if isinstance(data, dict) and "stream" in data and "data" in data:
+                data = data["data"]
+            for item in data if isinstance(data, list) else (data,):
+                symbol = item.get("s")
+                if not symbol:
+                    continue
+                if self.all_market and symbol.lower() not in self._symbol_set:
+                    continue
+                price = self._price(item)
+                if price:
+                    self._update_price(symbol, price)
+        except Exception as exc:  # pragma: no cover - unexpected payloads
+            logger.error("WebSocket message error: %s", exc)
+
+    def _update_price(self, symbol: str, price: float) -> None:
+        symbol = symbol.upper()
+        with self._lock:
+            self._prices[symbol] = (price, self.clock())
+        if self.on_price is not None:
             try:
-                self._ws.send(
-                    json.dumps(
-                        {"method": "SUBSCRIBE", "params": [f"{sym}@ticker"], "id": 1}
-                    )
-                )
-            except Exception as exc:  # pragma: no cover - network send error
-                logger.error("WebSocket subscribe error for %s: %s", sym, exc)
+                self.on_price(symbol, price)
+            except Exception as exc:  # pragma: no cover - listener errors
+                logger.error("WebSocket price listener error: %s", exc)
+
+    def _add_symbol(self, sym: str, outbox: _Outbox) -> None:
+        self.symbols.append(sym)
+        self._symbol_set.add(sym)
+        if websocket is None or self.all_market:
+            return
+        open_shards = [s for s in self._shards if len(s.symbols) < self.max_streams]
+        if not open_shards:
+            shard = _StreamShard(self, set())
+            self._shards.append(shard)
+            outbox.new.append(shard)
+        else:
+            shard = min(open_shards, key=lambda s: len(s.symbols))
+        shard.symbols.add(sym)
+        self._shard_of[sym] = shard
+        if shard not in outbox.new:
+            outbox.add(shard, "SUBSCRIBE", [sym])
+
+    def _remove_symbol(self, sym: str, outbox: _Outbox) -> None:
+        self.symbols.remove(sym)
+        self._symbol_set.discard(sym)
+        with self._lock:
+            self._prices.pop(sym.upper(), None)
+        shard = self._shard_of.pop(sym, None)
+        if shard is None:
+            return
+        shard.symbols.discard(sym)
+        if not shard.symbols:
+            shard.close()
+            self._shards.remove(shard)
+        else:
+            outbox.add(shard, "UNSUBSCRIBE", [sym])
+
+    def _flush(self, outbox: _Outbox) -> None:
+        """Start new connections and send the queued messages, outside the lock."""
+        for shard in outbox.new:
+            shard.start()
+        for shard, ops in outbox.sends.items():
+            if shard.closed:
+                continue
+            for method in ("UNSUBSCRIBE", "SUBSCRIBE"):
+                shard.send(method, ops[method])
+
+    def subscribe(self, symbol: str) -> None:
+        """Subscribe to ticker updates for ``symbol``."""
+        self.update_symbols(add=[symbol])
+
+    def unsubscribe(self, symbol: str) -> None:
+        """Stop ticker updates for ``symbol``."""
+        self.update_symbols(remove=[symbol])
+
+    def set_symbols(self, symbols: list[str] | set[str]) -> None:
+        """Subscribe to exactly ``symbols``."""
+        wanted = {s.lower() for s in symbols}
+        with self._shard_lock:
+            removed = [s for s in self.symbols if s not in wanted]
+        self.update_symbols(add=sorted(wanted), remove=removed)
+
+    def update_symbols(self, add=(), remove=()) -> None:
+        """Add and remove symbols with one message per connection and method."""
+        outbox = _Outbox()
+        with self._shard_lock:
+            for sym in dict.fromkeys(s.lower() for s in remove):
+                if sym in self._symbol_set:
+                    self._remove_symbol(sym, outbox)
+            for sym in dict.fromkeys(s.lower() for s in add):
+                if sym not in self._symbol_set:
+                    self._add_symbol(sym, outbox)
+            if remove:
+                self._rebalance(outbox)
+        self._flush(outbox)
+
+    def _rebalance(self, outbox: _Outbox) -> None:
+        """Close surplus connections and move their symbols to the others."""
+        needed = -(-len(self._shard_of) // self.max_streams)
+        while len(self._shards) > max(needed, 1):
+            smallest = min(self._shards, key=lambda s: len(s.symbols))
+            self._shards.remove(smallest)
+            smallest.close()
+            moved = sorted(smallest.symbols)
+            for shard in sorted(self._shards, key=lambda s: len(s.symbols)):
+                room = self.max_streams - len(shard.symbols)
+                batch, moved = moved[:room], moved[room:]
+                if not batch:
+                    continue
+                shard.symbols.update(batch)
+                for sym in batch:
+                    self._shard_of[sym] = shard
+                if shard not in outbox.new:
+                    outbox.add(shard, "SUBSCRIBE", batch)
+
+    def close(self) -> None:
+        """Close all connections."""
+        with self._shard_lock:
+            for shard in self._shards:
+                shard.close()
+            self._shards.clear()
+            self._shard_of.clear()
 
     def get_price(self, symbol: str) -> float | None:
-        """Return last received price for ``symbol``."""
+        """Return the last price of ``symbol`` unless it is stale."""
         with self._lock:
-            return self._prices.get(symbol.upper())
+            entry = self._prices.get(symbol.upper())
+        if entry is None:
+            return None
+        price, received = entry
+        if self.clock() - received > self.stale_after:
+            return None
+        return price
@@ -0,0 +1,347 @@
+"""Chart rendering in a separate worker process.
+
+Matplotlib is slow, holds the GIL while drawing and pyplot is not thread
+safe, so the bot does not render charts in its handler or price-check
+threads. :class:`ChartService` sends plain data (prices, timestamps,
+labels) to a :class:`~concurrent.futures.ProcessPoolExecutor` whose workers
+use the Agg backend and return PNG bytes.
+
+Rendered PNGs are kept in an LRU cache keyed by ``(chart type, symbol,
+data hash)``: when the same stop-loss alert or top-10 overview goes out to
+many users, the chart is rendered once. Concurrent requests for a chart that
+is still being rendered wait for that render instead of starting another.
+
+Each worker keeps one figure per chart type and size and clears its axes
+between renders instead of building a new figure every time.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import hashlib
+import io
+import logging
+import multiprocessing
+import pickle
+import threading
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Candle rows are ``[open_time_ms, open, high, low, close]``.
+Candles = Sequence[Sequence[float]]
+
+
+# --- worker side -----------------------------------------------------------
+
+_figures: Dict[Tuple, Any] = {}
+
+
+def _init_worker() -> None:
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+
+def _template(kind: str, nrows: int = 1, ncols: int = 1, figsize=None):
+    """Return a cleared figure and flat axes list for ``kind``."""
+    import matplotlib.pyplot as plt
+
+    key = (kind, nrows, ncols, figsize)
+    entry = _figures.get(key)
+    if entry is None:
+        fig, axes = plt.subplots(nrows, ncols, figsize=figsize)
+        flat = list(axes.flatten()) if hasattr(axes, "flatten") else [axes]
+        entry = _figures[key] = (fig, flat)
+    fig, axes = entry
+    for ax in axes:
+        ax.clear()
+        ax.set_axis_on()
+    return fig, axes
+
+
+def _png(fig) -> bytes:
+    fig.tight_layout()
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    return buf.getvalue()
+
+
+def _plot_candles(ax, candles: Candles, date_format: str, width: float) -> None:
+    import matplotlib.dates as mdates
+    import numpy as np
+    from mplfinance.original_flavor import candlestick_ohlc
+
+    times = mdates.date2num(
+        np.array([row[0] for row in candles], dtype="int64").astype("datetime64[ms]")
+    )
+    ohlc = [[t, *row[1:5]] for t, row in zip(times, candles)]
+    candlestick_ohlc(ax, ohlc, colorup="green", colordown="red", width=width)
+    ax.xaxis.set_major_formatter(mdates.DateFormatter(date_format))
+
+
+def render_orderbook(
+    symbol: str, bids: Sequence[Tuple[float, float]], asks: Sequence[Tuple[float, float]]
+) -> bytes:
+    """Order book depth chart of the top bid and ask levels."""
+    fig, (ax,) = _template("orderbook")
+    mid_price = (bids[0][0] + asks[0][0]) / 2
+    # Kaufaufträge (Bids) links vom Mid-Preis
+    ax.bar([p for p, _ in bids], [q for _, q in bids], color="green", label="Bids (Buy Orders)")
+    # Verkaufsaufträge (Asks) rechts vom Mid-Preis
+    ax.bar([p for p, _ in asks], [q for _, q in asks], color="red", label="Asks (Sell Orders)")
+    ax.axvline(mid_price, color="blue", linestyle="--", label=f"Mid Price {mid_price:.2f}")
+    ax.set_title(f"{symbol} – Orderbuch-Tiefe ({len(bids)} Level)")
+    ax.set_xlabel("Preis (USDT)")
+    ax.set_ylabel("Ordergröße")
+    ax.legend()
+    return _png(fig)
+
+
+def render_candles(
+    title: str,
+    candles: Candles,
+    date_format: str = "%H:%M",
+    xlabel: str = "",
+    ylabel: str = "",
+    figsize: Optional[Tuple[float, float]] = None,
+) -> bytes:
+    """Single candlestick chart."""
+    fig, (ax,) = _template("candles", figsize=figsize)
+    _plot_candles(ax, candles, date_format, 0.6 / 24)
+    if xlabel:
+        ax.set_xlabel(xlabel)
+    if ylabel:
+        ax.set_ylabel(ylabel)
+    if title:
+        ax.set_title(title)
+    return _png(fig)
+
+
+def render_candle_grid(panels: Sequence[Tuple[str, Candles]], no_data: str) -> bytes:
+    """Grid of small candlestick charts, e.g. for the top 10 coins."""
+    fig, axes = _template("candle_grid", 5, 2, (10, 12))
+    for ax, (title, candles) in zip(axes, panels):
+        if candles:
+            _plot_candles(ax, candles, "%m-%d", 0.6 / 24)
+            ax.set_xticks([])
+            ax.set_yticks([])
+        else:
+            ax.text(0.5, 0.5, no_data, ha="center", va="center")
+        ax.set_title(title)
+    for ax in axes[len(panels):]:
+        ax.axis("off")
+    return _png(fig)
+
+
+def render_equity(symbol: str, times_ms: Sequence[int], values: Sequence[float]) -> bytes:
+    """Equity curve of a backtest."""
+    import numpy as np
+
+    fig, (ax,) = _template("equity")
+    ax.plot(np.array(times_ms, dtype="int64").astype("datetime64[ms]"), values, color="blue")
+    ax.set_title(f"{symbol} – Backtest Equity")
+    ax.set_ylabel("Equity")
+    for label in ax.get_xticklabels():
+        label.set_rotation(30)
+        label.set_horizontalalignment("right")
+    return _png(fig)
+
+
+RENDERERS: Dict[str, Callable[..., bytes]] = {
+    "orderbook": render_orderbook,
+    "candles": render_candles,
+    "candle_grid": render_candle_grid,
+    "equity": render_equity,
+}
+
+
+# --- caller side -----------------------------------------------------------
+
+_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+class ChartService:
+    """Render charts in worker processes and cache the PNGs.
+
+    Parameters
+    ----------
+    workers:
+        Number of render processes. ``0`` renders in the calling process,
+        serialized by a lock, after switching matplotlib to Agg as well.
+    cache_size:
+        Number of rendered PNGs kept in the LRU cache.
+    timeout:
+        Seconds to wait for a render before giving up.
+    renderers:
+        Chart type -> render function; defaults to :data:`RENDERERS`. The
+        functions must be importable by the worker processes.
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        cache_size: int = 64,
+        timeout: float = 30.0,
+        renderers: Optional[Dict[str, Callable[..., bytes]]] = None,
+    ) -> None:
+        self.workers = max(0, int(workers))
+        self.cache_size = max(0, int(cache_size))
+        self.timeout = timeout
+        self.renderers = dict(RENDERERS if renderers is None else renderers)
+        self.renders = 0
+        self._cache: "OrderedDict[Tuple[str, str, str], bytes]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str, str], Future] = {}
+        self._lock = threading.Lock()
+        self._local_lock = threading.Lock()
+        self._local_ready = False
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @staticmethod
+    def data_hash(args: Tuple) -> str:
+        return hashlib.sha1(pickle.dumps(args, protocol=4)).hexdigest()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        # Started lazily so importing the bot does not start processes. The
+        # bot runs socket, scheduler and dispatcher threads by then; forking
+        # it could copy locks held by those threads into the workers, so the
+        # workers start from a fresh interpreter instead.
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(_START_METHOD),
+                    initializer=_init_worker,
+                )
+            return self._executor
+
+    def _render(self, kind: str, args: Tuple) -> bytes:
+        func = self.renderers[kind]
+        if self.workers == 0:
+            with self._local_lock:
+                if not self._local_ready:
+                    _init_worker()
+                    self._local_ready = True
+                return func(*args)
+        try:
+            return self._pool().submit(func, *args).result(timeout=self.timeout)
+        except BrokenProcessPool:
+            logger.warning("Chart worker died; restarting the render pool")
+            with self._lock:
+                self._executor = None
+            raise
+
+    def render(self, kind: str, symbol: str, *args: Any) -> Optional[io.BytesIO]:
+        """Return the PNG of chart ``kind`` for ``args`` as a new buffer.
+
+        ``symbol`` only labels the cache entry. Returns ``None`` when the
+        chart cannot be rendered.
+        """
+        key = (kind, symbol, self.data_hash(args))
+        with self._lock:
+            png = self._cache.get(key)
+            if png is not None:
+                self._cache.move_to_end(key)
+                return io.BytesIO(png)
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if not owner:
+            try:
+                png = future.result(timeout=self.timeout)
+            except Exception:
+                return None
+            return io.BytesIO(png) if png is not None else None
+
+        png = None
+        try:
+            png = self._render(kind, args)
+            self.renders += 1
+        except Exception as exc:
+            logger.error("Rendering %s chart for %s failed: %s", kind, symbol, exc)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                if png is not None and self.cache_size:
+                    self._cache[key] = png
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+            future.set_result(png)
+        return io.BytesIO(png) if png is not None else None
+
+    def close(self) -> None:
+        """Shut down the render processes."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+class TickCharts:
+    """Charts of one monitoring tick, built once and shared across users.
+
+    When an alert fires for many users at once, the chart of a symbol is
+    built on first use and its PNG reused for every later recipient. After
+    the first upload the Telegram ``file_id`` of the photo is sent instead
+    of the bytes, so the image is uploaded only once per tick.
+
+    Parameters
+    ----------
+    build:
+        Returns the chart for a key as a file-like object or ``None``.
+    """
+
+    def __init__(self, build: Callable[[str], Optional[io.BytesIO]]) -> None:
+        self._build = build
+        self._png: Dict[str, Optional[bytes]] = {}
+        self._file_ids: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+    def png(self, key: str) -> Optional[bytes]:
+        """Return the PNG bytes for ``key``, building them on first use."""
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if key not in self._png:
+                chart = self._build(key)
+                self._png[key] = chart.getvalue() if chart is not None else None
+            return self._png[key]
+
+    def send(self, send_photo: Callable[..., Any], chat_id: Any, key: str, **kwargs: Any) -> bool:
+        """Send the chart for ``key`` with ``send_photo(chat_id, photo)``.
+
+        Returns ``False`` when no chart is available.
+        """
+        file_id = self._file_ids.get(key)
+        if file_id is not None:
+            try:
+                send_photo(chat_id, file_id, **kwargs)
+                return True
+            except Exception as exc:
+                logger.warning("Resending chart %s by file_id failed: %s", key, exc)
+                self._file_ids.pop(key, None)
+        png = self.png(key)
+        if png is None:
+            return False
+        message = send_photo(chat_id, io.BytesIO(png), **kwargs)
+        photos = getattr(message, "photo", None)
+        if photos:
+            self._file_ids.setdefault(key, photos[-1].file_id)
+        return True
+
+
+__all__ = [
+    "ChartService",
+    "RENDERERS",
+    "TickCharts",
+    "render_orderbook",
+    "render_candles",
+    "render_candle_grid",
+    "render_equity",
+]
@@ -1,7 +1,8 @@
 import os
+import atexit
+import copy
 import json
 import configparser
-import requests
 import telebot
 from telebot.apihelper import ApiException
 try:
@@ -17,18 +18,25 @@ import threading
 import subprocess
 import sys
 import io
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 from typing import Any
 import sqlite3
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from mplfinance.original_flavor import candlestick_ohlc
 from datetime import datetime
 import logging
 import pandas as pd
-from strategies import get_strategy
+from strategies import get_strategy, make_panel
 from binance_client import BinanceClient, BinanceWebSocketClient
-from autotrade_simulation import simulate_autotrade
-from backtest import run_backtest
+from autotrade_simulation import SimLedger
+from backtest import backtest_symbol
+from backtest_jobs import BacktestQueue
+from chart_service import ChartService, TickCharts
+from price_alerts import AlertDispatcher, AlertIndex
+import http_client
+import ohlcv_store
+import state_store
+from price_snapshot import PriceSnapshot
+from persistence import Debouncer, atomic_write_json
 
 LOG_LEVEL_NAME = os.environ.get("LOG_LEVEL", "INFO").upper()
 logging.basicConfig(
@@ -39,9 +47,11 @@ logger = logging.getLogger(__name__)
 
 # === KONFIGURATION ===
 BINANCE_PRICE_URL = "https://fapi.binance.com/fapi/v1/premiumIndex"
+BINANCE_TICKER_24H_URL = "https://fapi.binance.com/fapi/v1/ticker/24hr"
+BINANCE_KLINES_URL = "https://api.binance.com/api/v3/klines"
 CONFIG_FILE = "config.json"
 COINGECKO_MARKETS_URL = "https://api.coingecko.com/api/v3/coins/markets"
-DB_FILE = "cache.db"
+DB_FILE = ohlcv_store.DB_FILE
 I18N_DIR = "i18n"
 
 KNOWN_QUOTES = ("USDT", "BUSD", "USDC", "DAI")
@@ -55,6 +65,21 @@ if not DEFAULT_QUOTE:
         DEFAULT_QUOTE = "USDT"
 DEFAULT_QUOTE = DEFAULT_QUOTE.upper()
 
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
+
+
+def host_semaphore(url):
+    """Return the semaphore limiting concurrent requests to ``url``'s host."""
+    host = urlparse(url).netloc
+    with _host_semaphores_lock:
+        sem = _host_semaphores.get(host)
+        if sem is None:
+            sem = threading.BoundedSemaphore(max(1, fetch_host_limit))
+            _host_semaphores[host] = sem
+    return sem
+
+
 def fetch_json(url, params=None, timeout=10, max_retries=3, backoff_factor=1.0):
     """Perform a GET request and return parsed JSON.
 
@@ -63,7 +88,8 @@ def fetch_json(url, params=None, timeout=10, max_retries=3, backoff_factor=1.0):
     """
     for attempt in range(1, max_retries + 1):
         try:
-            resp = requests.get(url, params=params, timeout=timeout)
+            with host_semaphore(url):
+                resp = http_client.get(url, params=params, timeout=timeout)
             status = getattr(resp, "status_code", 200)
             if status >= 400:
                 msg = ""
@@ -117,6 +143,21 @@ def load_config() -> dict[str, Any]:
             "binance_api_secret": "",
             "auto_stop": 0.0,
             "auto_takeprofit": 0.0,
+            "fetch_workers": 8,
+            "fetch_host_limit": 4,
+            "http_pool_size": 10,
+            "http_retries": 2,
+            "price_snapshot_ttl": 30,
+            "signal_engine": "stream",
+            "save_debounce": 2.0,
+            "backtest_workers": 2,
+            "backtest_cache_ttl": 3600,
+            "chart_workers": 1,
+            "chart_cache_size": 64,
+            "ws_alerts": True,
+            "ws_max_streams": 200,
+            "ws_stream": "miniTicker",
+            "ws_stale_after": 60,
         }
     with open(CONFIG_FILE, "r", encoding="utf-8") as f:
         data = json.load(f)
@@ -128,14 +169,29 @@ def load_config() -> dict[str, Any]:
         data.setdefault("binance_api_secret", "")
         data.setdefault("auto_stop", 0.0)
         data.setdefault("auto_takeprofit", 0.0)
+        data.setdefault("fetch_workers", 8)
+        data.setdefault("fetch_host_limit", 4)
+        data.setdefault("http_pool_size", 10)
+        data.setdefault("http_retries", 2)
+        data.setdefault("price_snapshot_ttl", 30)
+        data.setdefault("signal_engine", "stream")
+        data.setdefault("save_debounce", 2.0)
+        data.setdefault("backtest_workers", 2)
+        data.setdefault("backtest_cache_ttl", 3600)
+        data.setdefault("chart_workers", 1)
+        data.setdefault("chart_cache_size", 64)
+        data.setdefault("ws_alerts", True)
+        data.setdefault("ws_max_streams", 200)
+        data.setdefault("ws_stream", "miniTicker")
+        data.setdefault("ws_stale_after", 60)
         for cfg in data.get("users", {}).values():
             cfg.setdefault("binance_api_key", "")
             cfg.setdefault("binance_api_secret", "")
         return data
 
 
-def save_config() -> None:
-    """Persist the current configuration to disk.
+def config_snapshot() -> dict:
+    """Return the current configuration as a JSON-serializable dict.
 
     Parameters
     ----------
@@ -143,11 +199,12 @@ def save_config() -> None:
 
     Returns
     -------
-    None
+    dict
+        Configuration document written to ``config.json``. User state is
+        stored in the state database instead.
     """
     data = {
         "telegram_token": TELEGRAM_TOKEN,
-        "users": users,
         "check_interval": check_interval,
         "summary_time": summary_time,
         "strategy": strategy_name,
@@ -157,24 +214,65 @@ def save_config() -> None:
         "binance_api_secret": BINANCE_API_SECRET,
         "auto_stop": auto_stop,
         "auto_takeprofit": auto_takeprofit,
+        "fetch_workers": fetch_workers,
+        "fetch_host_limit": fetch_host_limit,
+        "http_pool_size": http_pool_size,
+        "http_retries": http_retries,
+        "price_snapshot_ttl": price_snapshot_ttl,
+        "signal_engine": signal_engine,
+        "save_debounce": save_debounce,
+        "backtest_workers": backtest_workers,
+        "backtest_cache_ttl": backtest_cache_ttl,
+        "chart_workers": chart_workers,
+        "chart_cache_size": chart_cache_size,
+        "ws_alerts": ws_alerts,
+        "ws_max_streams": ws_max_streams,
+        "ws_stream": ws_stream,
+        "ws_stale_after": ws_stale_after,
     }
-    # optionalen trailing_percent-Schlüssel entfernen, wenn nicht gesetzt
-    for cfg in data["users"].values():
-        for sym_cfg in cfg.get("symbols", {}).values():
-            if sym_cfg.get("trailing_percent") is None:
-                sym_cfg.pop("trailing_percent", None)
-            if sym_cfg.get("last_signal") is None:
-                sym_cfg.pop("last_signal", None)
-            if sym_cfg.get("trade_percent") is None:
-                sym_cfg.pop("trade_percent", None)
-            if sym_cfg.get("trade_amount", 0.0) == 0.0:
-                sym_cfg.pop("trade_amount", None)
-            if sym_cfg.get("quantity", 0.0) == 0.0:
-                sym_cfg.pop("quantity", None)
-            if sym_cfg.get("position", 0.0) == 0.0:
-                sym_cfg.pop("position", None)
-    with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    return data
+
+
+def persist_state() -> None:
+    """Write changed user rows to the state store and settings to config.json."""
+    global _saved_config
+    state_store.sync_users(users)
+    data = config_snapshot()
+    if data != _saved_config:
+        atomic_write_json(CONFIG_FILE, data)
+        _saved_config = data
+
+
+def load_users(cfg: dict) -> dict:
+    """Return user state from the state store.
+
+    Users still kept in ``config.json`` are imported once; afterwards the
+    state database is authoritative.
+    """
+    state_store.migrate_from_config(cfg.get("users", {}))
+    return state_store.load_users()
+
+
+def save_config() -> None:
+    """Mark the configuration and user state as changed.
+
+    Changes are written by ``config_writer`` on a background timer, at most
+    once every ``save_debounce`` seconds, and on shutdown.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    None
+    """
+    config_writer.mark_dirty()
+
+
+def flush_config() -> None:
+    """Write pending configuration changes immediately."""
+    config_writer.flush()
 
 
 def init_db() -> None:
@@ -214,11 +312,16 @@ def init_db() -> None:
             """
         )
         conn.commit()
+    ohlcv_store.init_db(DB_FILE)
 
 
 config = load_config()
 TELEGRAM_TOKEN = config.get("telegram_token", "")
-users = config.get("users", {})  # chat_id -> user data
+users = load_users(config)  # chat_id -> user data
+save_debounce = config.get("save_debounce", 2.0)
+_saved_config = None
+config_writer = Debouncer(persist_state, delay=save_debounce)
+atexit.register(config_writer.close)
 check_interval = config.get("check_interval", 5)
 summary_time = config.get("summary_time", "09:00")
 strategy_name = config.get("strategy", "momentum")
@@ -228,13 +331,60 @@ BINANCE_API_KEY = config.get("binance_api_key", "")
 BINANCE_API_SECRET = config.get("binance_api_secret", "")
 auto_stop = config.get("auto_stop", 0.0)
 auto_takeprofit = config.get("auto_takeprofit", 0.0)
+fetch_workers = config.get("fetch_workers", 8)
+fetch_host_limit = config.get("fetch_host_limit", 4)
+http_pool_size = config.get("http_pool_size", 10)
+http_retries = config.get("http_retries", 2)
+http_client.configure(pool_size=http_pool_size, max_retries=http_retries)
+price_snapshot_ttl = config.get("price_snapshot_ttl", 30)
+mark_price_snapshot = PriceSnapshot(
+    fetch_json, BINANCE_PRICE_URL, ttl=price_snapshot_ttl
+)
+ticker_snapshot = PriceSnapshot(
+    fetch_json, BINANCE_TICKER_24H_URL, ttl=price_snapshot_ttl
+)
 strategy = get_strategy(strategy_name, **strategy_params)
+signal_engine = config.get("signal_engine", "stream")
+# Per-pair strategy copies holding incremental indicator state.
+signal_streams = {}
+backtest_workers = config.get("backtest_workers", 2)
+backtest_cache_ttl = config.get("backtest_cache_ttl", 3600)
+backtest_queue = BacktestQueue(backtest_workers, ttl=backtest_cache_ttl)
+chart_workers = config.get("chart_workers", 1)
+chart_cache_size = config.get("chart_cache_size", 64)
+chart_service = ChartService(chart_workers, cache_size=chart_cache_size)
+atexit.register(chart_service.close)
 binance_clients = {}
+ws_alerts = config.get("ws_alerts", True)
+ws_max_streams = config.get("ws_max_streams", 200)
+ws_stream = config.get("ws_stream", "miniTicker")
+ws_stale_after = config.get("ws_stale_after", 60)
+alert_index = AlertIndex()
+# Serializes threshold checks of the polling tick and the WebSocket path.
+alert_lock = threading.RLock()
+# (chat_id, pair) -> symbol data whose trailing stop was raised on stream
+# ticks and not announced yet; reported once per polling tick.
+trailing_raises = {}
+alert_dispatcher = None
 
 ws_client = None
 try:
     _symbols = {sym for cfg in users.values() for sym in cfg.get("symbols", {})}
-    ws_client = BinanceWebSocketClient(list(_symbols)) if _symbols else None
+    if _symbols and ws_alerts:
+        alert_dispatcher = AlertDispatcher(
+            lambda pair, price: check_price_event(pair, price), alert_index
+        )
+    ws_client = (
+        BinanceWebSocketClient(
+            list(_symbols),
+            on_price=alert_dispatcher.push if alert_dispatcher else None,
+            max_streams=ws_max_streams,
+            stream_type=ws_stream,
+            stale_after=ws_stale_after,
+        )
+        if _symbols
+        else None
+    )
 except Exception as exc:  # pragma: no cover - websocket optional
     logger.warning("WebSocket client init failed: %s", exc)
 
@@ -383,7 +533,15 @@ def translate(chat_id, key, **kwargs):
 
 # === FUNKTIONEN ===
 def get_price(sym):
-    data = fetch_json(BINANCE_PRICE_URL, params={"symbol": sym})
+    """Return the mark price for ``sym``.
+
+    The price is served from the bulk premium-index snapshot; a
+    per-symbol request is only made when the snapshot is unavailable or
+    does not list ``sym`` yet, e.g. right after a new listing.
+    """
+    data = mark_price_snapshot.get(sym)
+    if data is None:
+        data = fetch_json(BINANCE_PRICE_URL, params={"symbol": sym})
     if data is None:
         return None
     try:
@@ -395,6 +553,14 @@ def get_price(sym):
         return None
 
 
+def get_ticker_24h(sym):
+    """Return 24h ticker statistics for ``sym`` from the bulk snapshot."""
+    data = ticker_snapshot.get(sym)
+    if data is None:
+        data = fetch_json(BINANCE_TICKER_24H_URL, params={"symbol": sym})
+    return data
+
+
 def generate_buy_sell_chart(sym):
     """Erstellt ein Orderbuch-Diagramm mit den 20 oberen Kauf- und Verkaufsaufträgen."""
     try:
@@ -410,33 +576,7 @@ def generate_buy_sell_chart(sym):
         if not bids or not asks:
             return None
 
-        mid_price = (bids[0][0] + asks[0][0]) / 2
-
-        fig, ax = plt.subplots()
-
-        # Kaufaufträge (Bids) links vom Mid-Preis
-        bid_prices = [p for p, _ in bids]
-        bid_sizes = [q for _, q in bids]
-        ax.bar(bid_prices, bid_sizes, color="green", label="Bids (Buy Orders)")
-
-        # Verkaufsaufträge (Asks) rechts vom Mid-Preis
-        ask_prices = [p for p, _ in asks]
-        ask_sizes = [q for _, q in asks]
-        ax.bar(ask_prices, ask_sizes, color="red", label="Asks (Sell Orders)")
-
-        ax.axvline(mid_price, color="blue", linestyle="--", label=f"Mid Price {mid_price:.2f}")
-
-        ax.set_title(f"{sym} – Orderbuch-Tiefe (20 Level)")
-        ax.set_xlabel("Preis (USDT)")
-        ax.set_ylabel("Ordergröße")
-        ax.legend()
-        fig.tight_layout()
-
-        buf = io.BytesIO()
-        fig.savefig(buf, format="png")
-        plt.close(fig)
-        buf.seek(0)
-        return buf
+        return chart_service.render("orderbook", sym, sym, bids, asks)
     except (ValueError, KeyError, TypeError) as e:
         logger.error("generate_buy_sell_chart error for %s: %s", sym, e)
         return None
@@ -503,55 +643,29 @@ def generate_top10_chart(coins):
     """Erstellt Candlestick-Charts für die Top-10-Coins."""
     logger.debug("generate_top10_chart using coingecko")
     try:
-        fig, axes = plt.subplots(5, 2, figsize=(10, 12))
-        axes = axes.flatten()
-        for ax, coin in zip(axes, coins):
+        panels = []
+        for coin in coins:
             symbol = coin.get("symbol")
             logger.debug("Processing %s", symbol)
-            ohlc_data = []
             coin_id = coin.get("id")
             raw = fetch_json(
                 f"https://api.coingecko.com/api/v3/coins/{coin_id}/ohlc",
                 params={"vs_currency": "usd", "days": 7},
                 max_retries=5,
             )
+            ohlc_data = []
             if raw:
                 logger.debug(
                     "Coingecko returned %d entries for %s", len(raw), symbol
                 )
-                for t, o, h, l, c in raw:
-                    ohlc_data.append(
-                        [mdates.date2num(datetime.utcfromtimestamp(t / 1000)), o, h, l, c]
-                    )
+                ohlc_data = [[t, o, h, l, c] for t, o, h, l, c in raw]
                 time.sleep(1)
-
-            if ohlc_data:
-                logger.debug(
-                    "Plotting %s with %d entries", symbol, len(ohlc_data)
-                )
-                candlestick_ohlc(
-                    ax,
-                    ohlc_data,
-                    colorup="green",
-                    colordown="red",
-                    width=0.6 / 24,
-                )
-                ax.xaxis.set_major_formatter(mdates.DateFormatter("%m-%d"))
-                ax.set_xticks([])
-                ax.set_yticks([])
             else:
                 logger.debug("No OHLC data for %s", symbol)
-                ax.text(0.5, 0.5, translate(None, "no_data"), ha="center", va="center")
-            ax.set_title(coin.get("symbol", "").upper())
-
-        for ax in axes[len(coins):]:
-            ax.axis("off")
-        fig.tight_layout()
-        buf = io.BytesIO()
-        fig.savefig(buf, format="png")
-        plt.close(fig)
-        buf.seek(0)
-        return buf
+            panels.append((coin.get("symbol", "").upper(), ohlc_data))
+        return chart_service.render(
+            "candle_grid", "top10", panels, translate(None, "no_data")
+        )
     except (ValueError, RuntimeError) as e:
         logger.error("generate_top10_chart error: %s", e)
         return None
@@ -596,7 +710,7 @@ def generate_binance_candlestick(pair):
             return None
         ohlc = [
             [
-                mdates.date2num(datetime.utcfromtimestamp(item[0] / 1000)),
+                int(item[0]),
                 float(item[1]),
                 float(item[2]),
                 float(item[3]),
@@ -604,20 +718,9 @@ def generate_binance_candlestick(pair):
             ]
             for item in raw
         ]
-        fig, ax = plt.subplots()
-        candlestick_ohlc(
-            ax, ohlc, colorup="green", colordown="red", width=0.6 / 24
+        return chart_service.render(
+            "candles", pair, pair, ohlc, "%H:%M", "Time (UTC)", "Price"
         )
-        ax.xaxis.set_major_formatter(mdates.DateFormatter("%H:%M"))
-        ax.set_xlabel("Time (UTC)")
-        ax.set_ylabel("Price")
-        ax.set_title(pair)
-        fig.tight_layout()
-        buf = io.BytesIO()
-        fig.savefig(buf, format="png")
-        plt.close(fig)
-        buf.seek(0)
-        return buf
     except (ValueError, TypeError) as e:
         logger.error(
             "generate_binance_candlestick error for %s: %s", pair, e
@@ -626,33 +729,43 @@ def generate_binance_candlestick(pair):
 
 
 def get_daily_ohlcv_binance(sym, limit=400):
-    raw = fetch_json(
-        "https://api.binance.com/api/v3/klines",
-        params={"symbol": sym, "interval": "1d", "limit": limit},
-    )
+    """Return the last ``limit`` daily candles for ``sym`` from the OHLCV store.
+
+    Only candles from the newest stored open time onwards are requested
+    from Binance, so the still open candle is refreshed and new ones are
+    appended. Without recent stored data the full ``limit`` is downloaded.
+    """
+    day_ms = ohlcv_store.interval_ms("1d")
+    now_ms = int(time.time() * 1000)
+    last = ohlcv_store.last_open_time("binance", sym, "1d")
+    params = {"symbol": sym, "interval": "1d", "limit": limit}
+    incremental = last is not None and now_ms - last < limit * day_ms
+    if incremental:
+        params["startTime"] = last
+    raw = fetch_json(BINANCE_KLINES_URL, params=params)
     if not raw:
         logger.error("Binance API error for %s", sym)
-        return None
-    try:
-        rows = [
-            {
-                "Date": datetime.utcfromtimestamp(item[0] / 1000),
-                "Open": float(item[1]),
-                "High": float(item[2]),
-                "Low": float(item[3]),
-                "Close": float(item[4]),
-                "Volume": float(item[5]),
-            }
-            for item in raw
-        ]
-        df = pd.DataFrame(rows).set_index("Date")
-        return df
-    except (ValueError, TypeError) as e:
-        logger.error("get_daily_ohlcv_binance error for %s: %s", sym, e)
-        return None
+        if not incremental:
+            return None
+    else:
+        try:
+            rows = ohlcv_store.parse_binance_klines(raw)
+            ohlcv_store.store_candles("binance", sym, "1d", rows)
+            closed = ohlcv_store.last_closed_open_time(rows, "1d", now_ms)
+            if closed is not None:
+                ohlcv_store.add_span("binance", sym, "1d", rows[0][0], closed)
+        except (ValueError, TypeError, IndexError, sqlite3.Error) as e:
+            logger.error("get_daily_ohlcv_binance error for %s: %s", sym, e)
+            return None
+    return ohlcv_store.load_candles("binance", sym, "1d", limit=limit)
 
 
 def get_daily_ohlcv_coinbase(sym, limit=400):
+    """Return the last ``limit`` daily candles for ``sym`` from Coinbase.
+
+    Downloaded candles are written to the OHLCV store, which also serves
+    the data when Coinbase is unavailable.
+    """
     product = sym.replace("USDT", "-USDT").replace("USD", "-USD")
     raw = fetch_json(
         f"https://api.exchange.coinbase.com/products/{product}/candles",
@@ -660,24 +773,26 @@ def get_daily_ohlcv_coinbase(sym, limit=400):
     )
     if not raw:
         logger.error("Coinbase API error for %s", sym)
-        return None
-    try:
-        rows = [
-            {
-                "Date": datetime.utcfromtimestamp(item[0]),
-                "Open": float(item[3]),
-                "High": float(item[2]),
-                "Low": float(item[1]),
-                "Close": float(item[4]),
-                "Volume": float(item[5]),
-            }
-            for item in raw[:limit]
-        ]
-        df = pd.DataFrame(rows).set_index("Date").sort_index()
-        return df
-    except (ValueError, TypeError) as e:
-        logger.error("get_daily_ohlcv_coinbase error for %s: %s", sym, e)
-        return None
+        if ohlcv_store.last_open_time("coinbase", sym, "1d") is None:
+            return None
+    else:
+        try:
+            rows = [
+                (
+                    int(item[0]) * 1000,
+                    float(item[3]),
+                    float(item[2]),
+                    float(item[1]),
+                    float(item[4]),
+                    float(item[5]),
+                )
+                for item in raw[:limit]
+            ]
+            ohlcv_store.store_candles("coinbase", sym, "1d", rows)
+        except (ValueError, TypeError, IndexError, sqlite3.Error) as e:
+            logger.error("get_daily_ohlcv_coinbase error for %s: %s", sym, e)
+            return None
+    return ohlcv_store.load_candles("coinbase", sym, "1d", limit=limit)
 
 
 def get_daily_ohlcv(sym, limit=400):
@@ -745,44 +860,17 @@ def get_cached_ohlc(symbol):
             (symbol,),
         )
         rows = cur.fetchall()
-    ohlc = []
-    for ts, o, h, l, c in rows:
-        ohlc.append([mdates.date2num(datetime.utcfromtimestamp(ts)), o, h, l, c])
-    return ohlc
+    return [[ts * 1000, o, h, l, c] for ts, o, h, l, c in rows]
 
 
 def generate_top10_chart_cached(coins):
-    try:
-        fig, axes = plt.subplots(5, 2, figsize=(10, 12))
-        axes = axes.flatten()
-        for ax, coin in zip(axes, coins):
-            symbol = coin.get("symbol", "").upper()
-            ohlc_data = get_cached_ohlc(symbol)
-            if ohlc_data:
-                candlestick_ohlc(
-                    ax,
-                    ohlc_data,
-                    colorup="green",
-                    colordown="red",
-                    width=0.6 / 24,
-                )
-                ax.xaxis.set_major_formatter(mdates.DateFormatter("%m-%d"))
-                ax.set_xticks([])
-                ax.set_yticks([])
-            else:
-                ax.text(0.5, 0.5, translate(None, "no_data"), ha="center", va="center")
-            ax.set_title(symbol)
-        for ax in axes[len(coins):]:
-            ax.axis("off")
-        fig.tight_layout()
-        buf = io.BytesIO()
-        fig.savefig(buf, format="png")
-        plt.close(fig)
-        buf.seek(0)
-        return buf
-    except (ValueError, RuntimeError) as e:
-        logger.error("generate_top10_chart_cached error: %s", e)
-        return None
+    panels = []
+    for coin in coins:
+        symbol = coin.get("symbol", "").upper()
+        panels.append((symbol, get_cached_ohlc(symbol)))
+    return chart_service.render(
+        "candle_grid", "top10", panels, translate(None, "no_data")
+    )
 
 
 def generate_cached_candle_chart(symbol):
@@ -790,21 +878,9 @@ def generate_cached_candle_chart(symbol):
     ohlc_data = get_cached_ohlc(symbol)
     if not ohlc_data:
         return None
-    fig, ax = plt.subplots(figsize=(6, 4))
-    candlestick_ohlc(
-        ax,
-        ohlc_data,
-        colorup="green",
-        colordown="red",
-        width=0.6 / 24,
+    return chart_service.render(
+        "candles", symbol, "", ohlc_data, "%m-%d", "", "", (6, 4)
     )
-    ax.xaxis.set_major_formatter(mdates.DateFormatter("%m-%d"))
-    fig.tight_layout()
-    buf = io.BytesIO()
-    fig.savefig(buf, format="png")
-    plt.close(fig)
-    buf.seek(0)
-    return buf
 
 
 def fetch_live_prices(coins):
@@ -826,272 +902,516 @@ def fetch_live_prices(coins):
             ) or info.get("price_change_percentage_24h_in_currency")
 
 
-def record_simulated_trade(cfg, side, price, qty):
-    """Update simulation state with a trade and return a status message."""
-    balance = cfg.get("sim_balance", cfg.get("sim_start", 0.0))
-    position = cfg.get("sim_position", 0.0)
-    side_u = side.upper()
-    if side_u == "BUY":
-        balance -= price * qty
-        position += qty
-    elif side_u == "SELL":
-        balance += price * qty
-        position -= qty
-    else:
-        raise ValueError(f"unknown trade side: {side}")
-    cfg["sim_balance"] = balance
-    cfg["sim_position"] = position
-    actions = cfg.setdefault("sim_actions", [])
-    actions.append({"side": side_u, "price": price, "qty": qty})
-    return simulate_autotrade(actions, cfg["sim_start"])[-1]
+def sim_ledger(cfg, chat_id=None, symbol=None):
+    """Return the simulation ledger stored in the symbol config ``cfg``."""
+    start = cfg.get("sim_start", 0.0)
+    if (
+        "sim_cost" not in cfg
+        and cfg.get("sim_position")
+        and chat_id is not None
+        and symbol is not None
+    ):
+        # Simulation started before the ledger fields existed: rebuild once.
+        return SimLedger.replay(state_store.load_sim_trades(str(chat_id), symbol), start)
+    return SimLedger(
+        start,
+        balance=cfg.get("sim_balance", start),
+        position=cfg.get("sim_position", 0.0),
+        cost=cfg.get("sim_cost", 0.0),
+        realized=cfg.get("sim_realized", 0.0),
+        fees=cfg.get("sim_fees", 0.0),
+    )
+
+
+def record_simulated_trade(cfg, side, price, qty, chat_id, symbol):
+    """Update simulation state with a trade and return a status message.
+
+    The ledger in ``cfg`` is updated in constant time and the trade is
+    appended to the state store under ``chat_id`` and ``symbol``.
+    """
+    ledger = sim_ledger(cfg, chat_id, symbol)
+    msg = ledger.apply(side, price, qty)
+    cfg["sim_balance"] = ledger.balance
+    cfg["sim_position"] = ledger.position
+    cfg["sim_cost"] = ledger.cost
+    cfg["sim_realized"] = ledger.realized
+    cfg["sim_fees"] = ledger.fees
+    state_store.add_sim_trade(str(chat_id), symbol, side, price, qty)
+    return msg
 
 # === FUNKTIONEN: Checks ===
-def check_price():
-    benchmark = get_daily_ohlcv(normalize_symbol("BTCUSDT"))
-    for cid, cfg in users.items():
+def collect_watched_pairs():
+    """Return the distinct trading pairs watched by users with notifications."""
+    pairs = set()
+    for cfg in users.values():
         if not cfg.get("notifications", True):
             continue
-        for sym, data in cfg.get("symbols", {}).items():
+        for sym in cfg.get("symbols", {}):
             pair = normalize_symbol(sym)
             if not pair:
                 logger.info("No Binance pair for %s", sym)
                 continue
-            price = None
-            if ws_client:
-                ws_client.subscribe(pair)
-                if ws_client.connected:
-                    price = ws_client.get_price(pair)
-            if price is None:
-                price = get_price(pair)
-            if price:
-                sl = data.get("stop_loss")
-                tp = data.get("take_profit")
-                trailing = data.get("trailing_percent")
-                if trailing is not None:
-                    candidate_sl = price * (1 - trailing / 100)
-                    if sl is None or sl <= 0:
-                        data["stop_loss"] = candidate_sl
-                        sl = candidate_sl
-                        save_config()
-                        bot.send_message(
-                            cid,
-                            translate(
-                                cid,
-                                "trailing_init",
-                                symbol=pair,
-                                sl=f"{sl:.2f}",
-                                percent=trailing,
-                            ),
-                        )
-                    elif price > sl and candidate_sl > sl:
-                        data["stop_loss"] = candidate_sl
-                        sl = candidate_sl
-                        save_config()
-                        bot.send_message(
-                            cid,
-                            translate(
-                                cid,
-                                "trailing_raise",
-                                symbol=pair,
-                                sl=f"{sl:.2f}",
-                                percent=trailing,
-                            ),
-                        )
-                if sl is not None and sl > 0 and price <= sl:
-                    msg = (
-                        translate(
-                            cid,
-                            "trailing_stop_reached",
-                            price=price,
-                            symbol=pair,
-                        )
-                        if trailing is not None
-                        else translate(
-                            cid, "stop_loss_reached", price=price, symbol=pair
-                        )
-                    )
-                    bot.send_message(cid, msg)
-                    chart = generate_buy_sell_chart(pair)
-                    if chart:
-                        bot.send_photo(cid, chart)
-                elif tp is not None and tp > 0 and price >= tp:
-                    bot.send_message(
+            pairs.add(pair)
+    return pairs
+
+
+def resolve_price(pair):
+    """Return the current price for ``pair`` from the WebSocket or REST API.
+
+    The REST API is only asked when the socket has no price for ``pair``
+    younger than ``ws_stale_after`` seconds.
+    """
+    price = None
+    if ws_client:
+        price = ws_client.get_price(pair)
+    if price is None:
+        price = get_price(pair)
+    return price
+
+
+def ws_alerts_live(pair):
+    """Return whether alerts of ``pair`` are evaluated on WebSocket ticks.
+
+    Pairs whose socket price went stale are checked by the polling tick.
+    """
+    return bool(
+        ws_alerts
+        and alert_dispatcher is not None
+        and ws_client is not None
+        and ws_client.get_price(pair) is not None
+    )
+
+
+def check_price_event(pair, price):
+    """Evaluate the price alerts of ``pair`` crossed by one WebSocket tick."""
+    evaluate_alerts(pair, price, announce_raise=False)
+
+
+def evaluate_alerts(pair, price, charts=None, announce_raise=True):
+    """Run :func:`check_thresholds` for the alerts of ``pair`` crossed by ``price``.
+
+    Both the WebSocket path and the polling fallback go through the alert
+    index, so an alert fires once when its threshold is crossed instead of
+    on every tick while the price stays beyond it.
+    """
+    with alert_lock:
+        entries = alert_index.crossed(pair, price)
+        if not entries:
+            return
+        if charts is None:
+            charts = TickCharts(generate_buy_sell_chart)
+        for cid, sym, data in entries:
+            try:
+                check_thresholds(cid, pair, data, price, charts, announce_raise)
+            except Exception as e:
+                logger.error("price alert error for %s: %s", pair, e)
+            # Trailing stops and percent alerts move their thresholds.
+            alert_index.update(cid, sym, data, pair)
+
+
+def announce_trailing_raises():
+    """Report trailing stops raised by WebSocket ticks since the last call."""
+    with alert_lock:
+        raised = list(trailing_raises.items())
+        trailing_raises.clear()
+    if not raised:
+        return
+    save_config()
+    for (cid, pair), data in raised:
+        cfg = users.get(cid, {})
+        if not cfg.get("notifications", True) or not any(
+            entry is data for entry in cfg.get("symbols", {}).values()
+        ):
+            # Removed or muted since the stop was raised.
+            continue
+        sl = data.get("stop_loss")
+        trailing = data.get("trailing_percent")
+        if sl is None or trailing is None:
+            continue
+        try:
+            bot.send_message(
+                cid,
+                translate(
+                    cid,
+                    "trailing_raise",
+                    symbol=pair,
+                    sl=f"{sl:.2f}",
+                    percent=trailing,
+                ),
+            )
+        except Exception as e:
+            logger.error("trailing stop notice for %s failed: %s", pair, e)
+
+
+def reindex_alerts(cid, sym):
+    """Update the alert index after the thresholds of ``sym`` changed.
+
+    Call with ``alert_lock`` held, together with the change itself.
+    """
+    cfg = users.get(str(cid), {})
+    data = cfg.get("symbols", {}).get(sym) if cfg.get("notifications", True) else None
+    alert_index.update(cid, sym, data, normalize_symbol(sym))
+
+
+def fetch_pair_data(pair):
+    """Fetch the current price and daily OHLCV data for ``pair``.
+
+    Returns a ``(price, asset)`` tuple; OHLCV data is only requested when a
+    price is available.
+    """
+    price = resolve_price(pair)
+    if not price:
+        return price, None
+    try:
+        asset = get_daily_ohlcv(pair)
+    except Exception as e:
+        logger.error("fetch_pair_data error for %s: %s", pair, e)
+        asset = None
+    return price, asset
+
+
+def fetch_tick_data(pairs):
+    """Fetch benchmark and per-pair data concurrently.
+
+    Requests are issued from a thread pool of ``fetch_workers`` threads;
+    :func:`fetch_json` additionally caps concurrent requests per host.
+    Returns the benchmark OHLCV data and a mapping ``pair -> (price, asset)``.
+    """
+    workers = max(1, min(fetch_workers, len(pairs) + 1))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        bench_future = pool.submit(get_daily_ohlcv, normalize_symbol("BTCUSDT"))
+        futures = {pair: pool.submit(fetch_pair_data, pair) for pair in pairs}
+        try:
+            benchmark = bench_future.result()
+        except Exception as e:
+            logger.error("fetch_tick_data benchmark error: %s", e)
+            benchmark = None
+        return benchmark, {pair: fut.result() for pair, fut in futures.items()}
+
+
+def stream_signal(pair, asset, benchmark):
+    """Return the latest signal using the pair's incremental strategy state.
+
+    The first call primes a copy of the strategy with the full history.
+    Later ticks only feed bars from the last seen candle onward, which
+    replaces the still open candle and appends newly closed ones.
+    """
+    stream = signal_streams.get(pair)
+    if stream is None:
+        stream = copy.copy(strategy)
+        stream.reset()
+        row = stream.prime(asset, benchmark)
+        if row is None:
+            return None
+        signal_streams[pair] = stream
+        return row["Signal"]
+    bench_close = benchmark["Close"]
+    row = stream.latest
+    for ts, bar in asset.loc[stream.last_timestamp:].iterrows():
+        row = stream.update(bar, bench_close.get(ts), ts)
+    return row["Signal"]
+
+
+def pair_signal(pair, asset, benchmark):
+    """Return the latest strategy signal for ``pair`` or ``None``."""
+    if asset is None or benchmark is None:
+        return None
+    try:
+        if getattr(strategy, "incremental", False):
+            return stream_signal(pair, asset, benchmark)
+        return strategy.latest_signal(asset, benchmark)["Signal"]
+    except Exception as e:
+        logger.error("check_price signal error for %s: %s", pair, e)
+        signal_streams.pop(pair, None)
+        return None
+
+
+def batch_signals(assets, benchmark):
+    """Return ``pair -> signal`` from one panel pass over all ``assets``."""
+    panel = make_panel(assets)
+    sigs = strategy.generate_signals_batch(panel, benchmark)
+    return {
+        pair: sigs[pair]["Signal"].loc[asset.index[-1]]
+        for pair, asset in assets.items()
+    }
+
+
+def tick_signals(pair_data, benchmark):
+    """Return the latest signal for every pair of the tick.
+
+    With ``signal_engine`` set to ``"batch"`` all pairs are scored together
+    via :meth:`Strategy.generate_signals_batch`; otherwise each pair is
+    evaluated by :func:`pair_signal`.
+    """
+    if signal_engine == "batch" and benchmark is not None:
+        assets = {
+            pair: asset
+            for pair, (_, asset) in pair_data.items()
+            if asset is not None and not asset.empty
+        }
+        try:
+            return batch_signals(assets, benchmark) if assets else {}
+        except Exception as e:
+            logger.error("check_price batch signal error: %s", e)
+    return {
+        pair: pair_signal(pair, asset, benchmark)
+        for pair, (_, asset) in pair_data.items()
+    }
+
+
+def check_thresholds(cid, pair, data, price, charts=None, announce_raise=True):
+    """Evaluate stop-loss, take-profit, trailing and percent alerts.
+
+    ``charts`` is the :class:`TickCharts` of the current tick so that the
+    order book chart of ``pair`` is fetched and rendered once for all users
+    alerted in the same tick. With ``announce_raise`` false, as on WebSocket
+    ticks, a raised trailing stop is only recorded in ``trailing_raises``
+    and announced by :func:`announce_trailing_raises` on the next polling
+    tick, so a rally does not send a message on every tick.
+    """
+    if charts is None:
+        charts = TickCharts(generate_buy_sell_chart)
+    sl = data.get("stop_loss")
+    tp = data.get("take_profit")
+    trailing = data.get("trailing_percent")
+    if trailing is not None:
+        candidate_sl = price * (1 - trailing / 100)
+        if sl is None or sl <= 0:
+            data["stop_loss"] = candidate_sl
+            sl = candidate_sl
+            save_config()
+            bot.send_message(
+                cid,
+                translate(
+                    cid,
+                    "trailing_init",
+                    symbol=pair,
+                    sl=f"{sl:.2f}",
+                    percent=trailing,
+                ),
+            )
+        elif price > sl and candidate_sl > sl:
+            data["stop_loss"] = candidate_sl
+            sl = candidate_sl
+            if announce_raise:
+                trailing_raises.pop((str(cid), pair), None)
+                save_config()
+                bot.send_message(
+                    cid,
+                    translate(
                         cid,
-                        translate(
-                            cid,
-                            "take_profit_reached",
-                            price=price,
-                            symbol=pair,
-                        ),
-                    )
-                    chart = generate_buy_sell_chart(pair)
-                    if chart:
-                        bot.send_photo(cid, chart)
-                percent = data.get("percent")
-                base_price = data.get("base_price")
-                if percent is not None and base_price is not None:
-                    change = (price - base_price) / base_price * 100
-                    if abs(change) >= percent:
-                        direction = (
-                            translate(cid, "direction_up")
-                            if change > 0
-                            else translate(cid, "direction_down")
+                        "trailing_raise",
+                        symbol=pair,
+                        sl=f"{sl:.2f}",
+                        percent=trailing,
+                    ),
+                )
+            else:
+                trailing_raises[(str(cid), pair)] = data
+    if sl is not None and sl > 0 and price <= sl:
+        msg = (
+            translate(
+                cid,
+                "trailing_stop_reached",
+                price=price,
+                symbol=pair,
+            )
+            if trailing is not None
+            else translate(cid, "stop_loss_reached", price=price, symbol=pair)
+        )
+        bot.send_message(cid, msg)
+        charts.send(bot.send_photo, cid, pair)
+    elif tp is not None and tp > 0 and price >= tp:
+        bot.send_message(
+            cid,
+            translate(
+                cid,
+                "take_profit_reached",
+                price=price,
+                symbol=pair,
+            ),
+        )
+        charts.send(bot.send_photo, cid, pair)
+    percent = data.get("percent")
+    base_price = data.get("base_price")
+    if percent is not None and base_price is not None:
+        change = (price - base_price) / base_price * 100
+        if abs(change) >= percent:
+            direction = (
+                translate(cid, "direction_up")
+                if change > 0
+                else translate(cid, "direction_down")
+            )
+            bot.send_message(
+                cid,
+                translate(
+                    cid,
+                    "price_change",
+                    symbol=pair,
+                    base=f"{base_price:.2f}",
+                    price=f"{price:.2f}",
+                    direction=direction,
+                    change=f"{change:+.2f}",
+                    percent=percent,
+                ),
+            )
+            charts.send(bot.send_photo, cid, pair)
+            data["base_price"] = price
+            save_config()
+
+
+def handle_signal(cid, pair, data, price, signal, sym=None):
+    """Notify about signal changes and execute configured auto trades."""
+    last_signal = data.get("last_signal")
+    if signal == last_signal:
+        return
+    if last_signal is not None:
+        bot.send_message(
+            cid,
+            translate(
+                cid,
+                "signal_changed",
+                symbol=pair,
+                old=translate(cid, f"signal_{last_signal}"),
+                new=translate(cid, f"signal_{signal}"),
+            ),
+        )
+    data["last_signal"] = signal
+    save_config()
+    client = get_binance_client(cid)
+    if signal not in ("buy", "sell"):
+        return
+    is_sim = data.get("sim_start") is not None
+    current_pos = data.get("sim_position" if is_sim else "position", 0.0)
+    amt = data.get("trade_amount", 0.0)
+    pct = data.get("trade_percent")
+    max_pct = data.get("max_percent")
+    balance = (
+        data.get("sim_balance", data["sim_start"])
+        if is_sim
+        else client.balance() if client else 0.0
+    )
+    position_val = current_pos * price
+    equity = balance + position_val
+    if signal == "buy":
+        if max_pct:
+            max_val = equity * max_pct / 100
+            allowed_val = max_val - position_val
+            if allowed_val <= 0 or balance <= 0:
+                return
+        else:
+            if current_pos > 0:
+                return
+            allowed_val = balance
+        if pct and pct > 0:
+            qty = balance * pct / 100 / price
+        elif amt > 0:
+            qty = amt / price
+        elif data.get("quantity", 0.0) > 0:
+            qty = data["quantity"]
+        else:
+            qty = 0.0
+        if max_pct:
+            qty = min(qty, allowed_val / price)
+        if qty <= 0:
+            return
+        if is_sim:
+            msg = record_simulated_trade(
+                data, "BUY", price, qty, chat_id=cid, symbol=sym or pair
+            )
+            bot.send_message(cid, msg)
+        elif client:
+            try:
+                client.order(pair, "BUY", qty)
+                data["position"] = current_pos + qty
+                save_config()
+                if auto_stop and auto_stop > 0:
+                    stop_price = price * (1 - auto_stop / 100)
+                    try:
+                        client.place_protective_order(pair, "SELL", qty, stop_price)
+                    except Exception as exc:
+                        logger.error("auto stop order error for %s: %s", pair, exc)
+                if auto_takeprofit and auto_takeprofit > 0:
+                    tp_price = price * (1 + auto_takeprofit / 100)
+                    try:
+                        client.place_protective_order(pair, "SELL", qty, tp_price)
+                    except Exception as exc:
+                        logger.error(
+                            "auto take-profit order error for %s: %s", pair, exc
                         )
-                        bot.send_message(
-                            cid,
-                            translate(
-                                cid,
-                                "price_change",
-                                symbol=pair,
-                                base=f"{base_price:.2f}",
-                                price=f"{price:.2f}",
-                                direction=direction,
-                                change=f"{change:+.2f}",
-                                percent=percent,
-                            ),
+            except Exception as exc:
+                logger.error("order error for %s: %s", pair, exc)
+    else:  # sell
+        if current_pos <= 0:
+            return
+        qty = current_pos
+        if is_sim:
+            msg = record_simulated_trade(
+                data, "SELL", price, qty, chat_id=cid, symbol=sym or pair
+            )
+            bot.send_message(cid, msg)
+        elif client:
+            try:
+                client.order(pair, "SELL", qty)
+                data["position"] = max(0.0, current_pos - qty)
+                save_config()
+                if auto_stop and auto_stop > 0:
+                    stop_price = price * (1 + auto_stop / 100)
+                    try:
+                        client.place_protective_order(pair, "BUY", qty, stop_price)
+                    except Exception as exc:
+                        logger.error("auto stop order error for %s: %s", pair, exc)
+                if auto_takeprofit and auto_takeprofit > 0:
+                    tp_price = price * (1 - auto_takeprofit / 100)
+                    try:
+                        client.place_protective_order(pair, "BUY", qty, tp_price)
+                    except Exception as exc:
+                        logger.error(
+                            "auto take-profit order error for %s: %s", pair, exc
                         )
-                        chart = generate_buy_sell_chart(pair)
-                        if chart:
-                            bot.send_photo(cid, chart)
-                        data["base_price"] = price
-                        save_config()
+            except Exception as exc:
+                logger.error("order error for %s: %s", pair, exc)
 
-                # Signal-Änderungen überwachen
-                try:
-                    asset = get_daily_ohlcv(pair)
-                    if asset is not None and benchmark is not None:
-                        sigs = strategy.generate_signals(asset, benchmark)
-                        signal = sigs.iloc[-1]["Signal"]
-                        last_signal = data.get("last_signal")
-                        if signal != last_signal:
-                            if last_signal is not None:
-                                bot.send_message(
-                                    cid,
-                                    translate(
-                                        cid,
-                                        "signal_changed",
-                                        symbol=pair,
-                                        old=translate(cid, f"signal_{last_signal}"),
-                                        new=translate(cid, f"signal_{signal}"),
-                                    ),
-                                )
-                            data["last_signal"] = signal
-                            save_config()
-                            client = get_binance_client(cid)
-                            if signal in ("buy", "sell"):
-                                price = get_price(pair)
-                                if not price:
-                                    continue
-                                is_sim = data.get("sim_start") is not None
-                                current_pos = data.get(
-                                    "sim_position" if is_sim else "position", 0.0
-                                )
-                                amt = data.get("trade_amount", 0.0)
-                                pct = data.get("trade_percent")
-                                max_pct = data.get("max_percent")
-                                balance = (
-                                    data.get("sim_balance", data["sim_start"])
-                                    if is_sim
-                                    else client.balance() if client else 0.0
-                                )
-                                position_val = current_pos * price
-                                equity = balance + position_val
-                                if signal == "buy":
-                                    if max_pct:
-                                        max_val = equity * max_pct / 100
-                                        allowed_val = max_val - position_val
-                                        if allowed_val <= 0 or balance <= 0:
-                                            continue
-                                    else:
-                                        if current_pos > 0:
-                                            continue
-                                        allowed_val = balance
-                                    if pct and pct > 0:
-                                        qty = balance * pct / 100 / price
-                                    elif amt > 0:
-                                        qty = amt / price
-                                    elif data.get("quantity", 0.0) > 0:
-                                        qty = data["quantity"]
-                                    else:
-                                        qty = 0.0
-                                    if max_pct:
-                                        qty = min(qty, allowed_val / price)
-                                    if qty <= 0:
-                                        continue
-                                    if is_sim:
-                                        msg = record_simulated_trade(data, "BUY", price, qty)
-                                        bot.send_message(cid, msg)
-                                    elif client:
-                                        try:
-                                            client.order(pair, "BUY", qty)
-                                            data["position"] = current_pos + qty
-                                            save_config()
-                                            if auto_stop and auto_stop > 0:
-                                                stop_price = price * (1 - auto_stop / 100)
-                                                try:
-                                                    client.place_protective_order(
-                                                        pair, "SELL", qty, stop_price
-                                                    )
-                                                except Exception as exc:
-                                                    logger.error(
-                                                        "auto stop order error for %s: %s",
-                                                        pair,
-                                                        exc,
-                                                    )
-                                            if auto_takeprofit and auto_takeprofit > 0:
-                                                tp_price = price * (1 + auto_takeprofit / 100)
-                                                try:
-                                                    client.place_protective_order(
-                                                        pair, "SELL", qty, tp_price
-                                                    )
-                                                except Exception as exc:
-                                                    logger.error(
-                                                        "auto take-profit order error for %s: %s",
-                                                        pair,
-                                                        exc,
-                                                    )
-                                        except Exception as exc:
-                                            logger.error("order error for %s: %s", pair, exc)
-                                else:  # sell
-                                    if current_pos <= 0:
-                                        continue
-                                    qty = current_pos
-                                    if is_sim:
-                                        msg = record_simulated_trade(data, "SELL", price, qty)
-                                        bot.send_message(cid, msg)
-                                    elif client:
-                                        try:
-                                            client.order(pair, "SELL", qty)
-                                            data["position"] = max(0.0, current_pos - qty)
-                                            save_config()
-                                            if auto_stop and auto_stop > 0:
-                                                stop_price = price * (1 + auto_stop / 100)
-                                                try:
-                                                    client.place_protective_order(
-                                                        pair, "BUY", qty, stop_price
-                                                    )
-                                                except Exception as exc:
-                                                    logger.error(
-                                                        "auto stop order error for %s: %s",
-                                                        pair,
-                                                        exc,
-                                                    )
-                                            if auto_takeprofit and auto_takeprofit > 0:
-                                                tp_price = price * (1 - auto_takeprofit / 100)
-                                                try:
-                                                    client.place_protective_order(
-                                                        pair, "BUY", qty, tp_price
-                                                    )
-                                                except Exception as exc:
-                                                    logger.error(
-                                                        "auto take-profit order error for %s: %s",
-                                                        pair,
-                                                        exc,
-                                                    )
-                                        except Exception as exc:
-                                            logger.error("order error for %s: %s", pair, exc)
-                except Exception as e:
-                    logger.error("check_price signal error for %s: %s", sym, e)
+
+def check_price():
+    """Run one monitoring tick over all users.
+
+    The tick runs in two phases: prices, OHLCV data and strategy signals
+    are fetched concurrently once per distinct pair, then the results are
+    fanned out to every user watching that pair. Price alerts of pairs that
+    receive WebSocket ticks are handled by :func:`check_price_event`; the
+    others are evaluated here with the same crossing rules. Trailing stops
+    raised by WebSocket ticks are announced here, once per tick.
+    """
+    pairs = sorted(collect_watched_pairs())
+    if ws_client:
+        ws_client.set_symbols(pairs)
+        ws_client.reconnect_stale()
+    benchmark, pair_data = fetch_tick_data(pairs)
+    signals = tick_signals(pair_data, benchmark)
+    pair_states = {
+        pair: (price, signals.get(pair))
+        for pair, (price, _) in pair_data.items()
+    }
+    charts = TickCharts(generate_buy_sell_chart)
+    for pair, (price, _) in pair_states.items():
+        if price and not ws_alerts_live(pair):
+            evaluate_alerts(pair, price, charts)
+    announce_trailing_raises()
+    for cid, cfg in users.items():
+        if not cfg.get("notifications", True):
+            continue
+        for sym, data in cfg.get("symbols", {}).items():
+            pair = normalize_symbol(sym)
+            if not pair:
+                continue
+            price, signal = pair_states.get(pair, (None, None))
+            if not price or signal is None:
+                continue
+            try:
+                handle_signal(cid, pair, data, price, signal, sym)
+            except Exception as e:
+                logger.error("check_price signal error for %s: %s", sym, e)
 
 
 def check_updates():
@@ -1132,10 +1452,7 @@ def send_daily_summary(chat_id=None):
                     translate(cid, "price_not_available", symbol=sym)
                 )
                 continue
-            data = fetch_json(
-                "https://fapi.binance.com/fapi/v1/ticker/24hr",
-                params={"symbol": pair},
-            )
+            data = get_ticker_24h(pair)
             if data:
                 try:
                     price = float(data.get("lastPrice"))
@@ -1180,10 +1497,12 @@ def set_config(message):
             ),
         )
         return
-    entry = symbols.setdefault(symbol_upper, {})
-    entry["stop_loss"] = stop_loss
-    entry["take_profit"] = take_profit
-    save_config()
+    with alert_lock:
+        entry = symbols.setdefault(symbol_upper, {})
+        entry["stop_loss"] = stop_loss
+        entry["take_profit"] = take_profit
+        save_config()
+        reindex_alerts(message.chat.id, symbol_upper)
     bot.reply_to(
         message,
         translate(message.chat.id, "config_updated", symbol=symbol_upper),
@@ -1296,7 +1615,11 @@ def autotradesim_command(message):
     sym_cfg["sim_start"] = start_balance
     sym_cfg["sim_balance"] = start_balance
     sym_cfg["sim_position"] = 0.0
-    sym_cfg["sim_actions"] = []
+    sym_cfg["sim_cost"] = 0.0
+    sym_cfg["sim_realized"] = 0.0
+    sym_cfg["sim_fees"] = 0.0
+    sym_cfg.pop("sim_actions", None)
+    state_store.clear_sim_trades(str(message.chat.id), symbol)
     if qty_str.endswith("%"):
         try:
             percent = float(qty_str[:-1])
@@ -1380,10 +1703,12 @@ def set_percent_command(message):
             message, translate(message.chat.id, "price_fetch_error", symbol=pair)
         )
         return
-    entry = symbols.setdefault(pair, {})
-    entry["percent"] = percent
-    entry["base_price"] = price
-    save_config()
+    with alert_lock:
+        entry = symbols.setdefault(pair, {})
+        entry["percent"] = percent
+        entry["base_price"] = price
+        save_config()
+        reindex_alerts(message.chat.id, pair)
     bot.reply_to(
         message,
         translate(
@@ -1424,32 +1749,33 @@ def set_trailing_command(message):
             ),
         )
         return
-    entry = symbols.setdefault(pair, {})
     if len(parts) == 1:
-        entry.pop("trailing_percent", None)
-        save_config()
-        bot.reply_to(
-            message, translate(message.chat.id, "trailing_removed", symbol=pair)
-        )
-        return
-    try:
-        percent = float(parts[1])
-    except ValueError:
-        bot.reply_to(message, translate(message.chat.id, "percent_nan_trail"))
-        return
-    if percent <= 0:
-        entry.pop("trailing_percent", None)
-        save_config()
+        percent = None
+    else:
+        try:
+            percent = float(parts[1])
+        except ValueError:
+            bot.reply_to(message, translate(message.chat.id, "percent_nan_trail"))
+            return
+    if percent is None or percent <= 0:
+        with alert_lock:
+            symbols.setdefault(pair, {}).pop("trailing_percent", None)
+            save_config()
+            reindex_alerts(message.chat.id, pair)
         bot.reply_to(
             message, translate(message.chat.id, "trailing_removed", symbol=pair)
         )
         return
-    entry["trailing_percent"] = percent
     price = get_price(pair)
-    if price is not None:
-        sl = price * (1 - percent / 100)
-        entry["stop_loss"] = sl
+    sl = price * (1 - percent / 100) if price is not None else None
+    with alert_lock:
+        entry = symbols.setdefault(pair, {})
+        entry["trailing_percent"] = percent
+        if sl is not None:
+            entry["stop_loss"] = sl
         save_config()
+        reindex_alerts(message.chat.id, pair)
+    if sl is not None:
         bot.reply_to(
             message,
             translate(
@@ -1461,7 +1787,6 @@ def set_trailing_command(message):
             ),
         )
     else:
-        save_config()
         bot.reply_to(
             message,
             translate(
@@ -1483,8 +1808,10 @@ def remove_symbol(message):
         return
     symbol = parts[0].upper()
     if symbol in cfg.get("symbols", {}):
-        del cfg["symbols"][symbol]
-        save_config()
+        with alert_lock:
+            del cfg["symbols"][symbol]
+            save_config()
+            alert_index.remove(message.chat.id, symbol)
         bot.reply_to(message, translate(message.chat.id, "symbol_removed", symbol=symbol))
     else:
         bot.reply_to(message, translate(message.chat.id, "symbol_not_found", symbol=symbol))
@@ -1609,11 +1936,13 @@ def cmd_portfolio(message):
     symbols = cfg.get("symbols", {})
     total_sim = 0.0
     trade_lines = []
+    sim_totals = state_store.sim_trade_totals(str(chat_id))
     for sym, data in symbols.items():
         total_sim += data.get("sim_balance", 0.0)
+        count, qty = sim_totals.get(sym, (0, 0.0))
         actions = data.get("sim_actions", [])
-        if actions:
-            qty = sum(a.get("qty", 0.0) for a in actions)
+        if count or actions:
+            qty += sum(a.get("qty", 0.0) for a in actions)
             trade_lines.append(f"{sym}: {qty:.4f}")
     client = get_binance_client(chat_id)
     real_balance = 0.0
@@ -1680,23 +2009,82 @@ def backtest_command(message):
             message, translate(message.chat.id, "backtest_error", symbol=symbol)
         )
         return
-    try:
-        roi, drawdown = run_backtest(pair, start, end)
-        bot.reply_to(
-            message,
+    cid = message.chat.id
+    # The cache key names the strategy the job runs, so changing the
+    # configured strategy or its parameters never serves stale results.
+    name, params = strategy_name, dict(strategy_params)
+    request = {
+        "symbol": pair,
+        "start": start,
+        "end": end,
+        "strategy": name,
+        "strategy_params": params,
+        "interval": "1d",
+    }
+
+    def job(progress):
+        return backtest_symbol(
+            pair, start, end, strategy_name=name, progress=progress, **params
+        )
+
+    def on_progress(step):
+        bot.send_message(
+            cid,
             translate(
-                message.chat.id,
-                "backtest_result",
+                cid,
+                "backtest_progress",
                 symbol=pair,
-                roi=roi * 100,
-                drawdown=drawdown * 100,
+                step=translate(cid, f"backtest_step_{step}"),
             ),
         )
-    except Exception as e:  # pragma: no cover - broad exception for user input
-        logger.error("backtest command error for %s: %s", pair, e)
-        bot.reply_to(
-            message, translate(message.chat.id, "backtest_error", symbol=symbol)
-        )
+
+    def on_error(exc):
+        logger.error("backtest command error for %s: %s", pair, exc)
+        bot.reply_to(message, translate(cid, "backtest_error", symbol=symbol))
+
+    state, future = backtest_queue.submit(
+        request,
+        job,
+        progress=on_progress,
+        done=lambda result: send_backtest_result(message, pair, result),
+        error=on_error,
+    )
+    if state == "cached":
+        send_backtest_result(message, pair, future.result())
+    elif state == "joined":
+        bot.reply_to(message, translate(cid, "backtest_joined", symbol=pair))
+    else:
+        bot.reply_to(message, translate(cid, "backtest_queued", symbol=pair))
+
+
+def generate_equity_chart(equity, symbol):
+    """Erstellt ein Diagramm der Equity-Kurve eines Backtests."""
+    try:
+        times = (equity.index.as_unit("ms").asi8).tolist()
+        values = [float(v) for v in equity.to_numpy()]
+    except (AttributeError, TypeError, ValueError) as e:
+        logger.error("generate_equity_chart error for %s: %s", symbol, e)
+        return None
+    return chart_service.render("equity", symbol, symbol, times, values)
+
+
+def send_backtest_result(message, pair, result):
+    """Send the metrics and equity chart of a finished backtest."""
+    cid = message.chat.id
+    bot.reply_to(
+        message,
+        translate(
+            cid,
+            "backtest_result",
+            symbol=pair,
+            roi=result.metrics["roi"] * 100,
+            drawdown=result.metrics["max_drawdown"] * 100,
+        ),
+    )
+    chart = generate_equity_chart(result.equity, pair)
+    if chart:
+        bot.send_photo(cid, chart)
+
 
 @bot.message_handler(commands=["signal"])
 def signal_command(message):
@@ -1714,8 +2102,7 @@ def signal_command(message):
         bot.reply_to(message, translate(message.chat.id, "signal_error", symbol=symbol))
         return
     try:
-        sigs = strategy.generate_signals(asset, bench)
-        last = sigs.iloc[-1]
+        last = strategy.latest_signal(asset, bench)
         sig_text = translate(message.chat.id, f"signal_{last['Signal']}")
         bot.reply_to(
             message,
@@ -1812,16 +2199,20 @@ def show_menu(message):
 @bot.message_handler(commands=['stop'])
 def stop_notifications(message):
     cfg = get_user(message.chat.id)
-    cfg["notifications"] = False
-    save_config()
+    with alert_lock:
+        cfg["notifications"] = False
+        save_config()
+        alert_index.update_user(message.chat.id, cfg, normalize_symbol)
     bot.reply_to(message, translate(message.chat.id, "notifications_stopped"))
 
 
 @bot.message_handler(commands=['start'])
 def start_notifications(message):
     cfg = get_user(message.chat.id)
-    cfg["notifications"] = True
-    save_config()
+    with alert_lock:
+        cfg["notifications"] = True
+        save_config()
+        alert_index.update_user(message.chat.id, cfg, normalize_symbol)
     bot.reply_to(message, translate(message.chat.id, "notifications_started"))
 
 
@@ -1854,6 +2245,7 @@ def schedule_jobs():
 
 
 schedule_jobs()
+alert_index.rebuild(users, normalize_symbol)
 
 
 def run_scheduler():
@@ -1866,4 +2258,5 @@ threading.Thread(target=run_scheduler, daemon=True).start()
 
 print(translate(None, "bot_running"))
 bot.infinity_polling()
+flush_config()
 
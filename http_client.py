@@ -0,0 +1,103 @@
+"""Shared HTTP transport with pooled keep-alive sessions.
+
+All outgoing REST calls go through :func:`get` and :func:`post`. One
+:class:`requests.Session` is kept per host so that TCP and TLS connections
+are reused across calls instead of being re-established for every request.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from urllib.parse import urlparse
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = 10
+MAX_RETRIES = 2
+BACKOFF_FACTOR = 0.3
+
+_sessions: dict[str, "requests.Session"] = {}
+_lock = threading.Lock()
+
+
+def configure(
+    pool_size: int | None = None,
+    max_retries: int | None = None,
+    backoff_factor: float | None = None,
+) -> None:
+    """Update transport settings.
+
+    Existing sessions are closed so the new settings apply to subsequent
+    requests.
+    """
+    global POOL_SIZE, MAX_RETRIES, BACKOFF_FACTOR
+    if pool_size is not None:
+        POOL_SIZE = max(1, int(pool_size))
+    if max_retries is not None:
+        MAX_RETRIES = max(0, int(max_retries))
+    if backoff_factor is not None:
+        BACKOFF_FACTOR = float(backoff_factor)
+    close_all()
+
+
+def _build_session():
+    """Create a session with a pooled, retrying adapter."""
+    session = requests.Session()
+    try:
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+    except Exception:  # pragma: no cover - adapters unavailable
+        return session
+    # Only connection failures are retried here: the request never reached
+    # the server, so this is safe for order placement as well.
+    retry = Retry(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=0,
+        status=0,
+        backoff_factor=BACKOFF_FACTOR,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=retry
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session(url: str):
+    """Return the shared session for the host of ``url``."""
+    host = urlparse(url).netloc
+    with _lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = _sessions[host] = _build_session()
+    return session
+
+
+def get(url: str, **kwargs):
+    """Send a GET request through the pooled session for ``url``."""
+    return get_session(url).get(url, **kwargs)
+
+
+def post(url: str, **kwargs):
+    """Send a POST request through the pooled session for ``url``."""
+    return get_session(url).post(url, **kwargs)
+
+
+def close_all() -> None:
+    """Close and forget all pooled sessions."""
+    with _lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        try:
+            session.close()
+        except Exception as exc:  # pragma: no cover - best effort cleanup
+            logger.debug("session close error: %s", exc)
+
+
+__all__ = ["configure", "get_session", "get", "post", "close_all"]
@@ -0,0 +1,288 @@
+"""Local OHLCV candle store backed by SQLite.
+
+Candles are kept in the ``ohlcv`` table of ``cache.db`` keyed by
+``(source, symbol, interval, open_time)``. The ``ohlcv_spans`` table
+records which time ranges have already been requested from the exchange,
+so callers only need to download candles newer than the last stored one
+or ranges that are not covered yet.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+from typing import Iterable, Sequence
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DB_FILE = "cache.db"
+
+INTERVAL_MS = {
+    "1m": 60_000,
+    "3m": 3 * 60_000,
+    "5m": 5 * 60_000,
+    "15m": 15 * 60_000,
+    "30m": 30 * 60_000,
+    "1h": 3_600_000,
+    "2h": 2 * 3_600_000,
+    "4h": 4 * 3_600_000,
+    "6h": 6 * 3_600_000,
+    "8h": 8 * 3_600_000,
+    "12h": 12 * 3_600_000,
+    "1d": 86_400_000,
+    "3d": 3 * 86_400_000,
+    "1w": 7 * 86_400_000,
+}
+
+Candle = Sequence[float]
+
+_initialized: set[str] = set()
+_init_lock = threading.Lock()
+
+
+def interval_ms(interval: str) -> int:
+    """Return the length of ``interval`` in milliseconds."""
+    try:
+        return INTERVAL_MS[interval]
+    except KeyError as exc:
+        raise ValueError(f"Unsupported interval: {interval}") from exc
+
+
+def init_db(db_file: str | None = None) -> None:
+    """Create the OHLCV tables if necessary."""
+    db_file = db_file or DB_FILE
+    with sqlite3.connect(db_file) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ohlcv (
+                source TEXT,
+                symbol TEXT,
+                interval TEXT,
+                open_time INTEGER,
+                open REAL,
+                high REAL,
+                low REAL,
+                close REAL,
+                volume REAL,
+                PRIMARY KEY(source, symbol, interval, open_time)
+            )
+            """
+        )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ohlcv_spans (
+                source TEXT,
+                symbol TEXT,
+                interval TEXT,
+                start INTEGER,
+                end INTEGER
+            )
+            """
+        )
+        conn.commit()
+    with _init_lock:
+        _initialized.add(db_file)
+
+
+def _connect(db_file: str | None) -> sqlite3.Connection:
+    db_file = db_file or DB_FILE
+    if db_file not in _initialized:
+        init_db(db_file)
+    return sqlite3.connect(db_file)
+
+
+def parse_binance_klines(raw: Iterable[Sequence]) -> list[tuple]:
+    """Convert Binance kline arrays to ``(open_time, o, h, l, c, v)`` rows."""
+    return [
+        (
+            int(item[0]),
+            float(item[1]),
+            float(item[2]),
+            float(item[3]),
+            float(item[4]),
+            float(item[5]),
+        )
+        for item in raw
+    ]
+
+
+def last_closed_open_time(
+    rows: Sequence[Candle], interval: str, now_ms: int
+) -> int | None:
+    """Return the open time of the newest candle in ``rows`` that is closed."""
+    step = interval_ms(interval)
+    closed = [int(r[0]) for r in rows if int(r[0]) + step <= now_ms]
+    return max(closed) if closed else None
+
+
+def store_candles(
+    source: str,
+    symbol: str,
+    interval: str,
+    rows: Iterable[Candle],
+    db_file: str | None = None,
+) -> int:
+    """Insert or replace candles and return the number of rows written.
+
+    Existing candles with the same open time are replaced, so the still
+    open last candle is updated on every refresh.
+    """
+    rows = [tuple(r) for r in rows]
+    if not rows:
+        return 0
+    with _connect(db_file) as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO ohlcv(source, symbol, interval, open_time, open, high, low, close, volume)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(source, symbol, interval, *r) for r in rows],
+        )
+        conn.commit()
+    return len(rows)
+
+
+def last_open_time(
+    source: str, symbol: str, interval: str, db_file: str | None = None
+) -> int | None:
+    """Return the open time of the newest stored candle or ``None``."""
+    with _connect(db_file) as conn:
+        cur = conn.execute(
+            "SELECT MAX(open_time) FROM ohlcv WHERE source=? AND symbol=? AND interval=?",
+            (source, symbol, interval),
+        )
+        row = cur.fetchone()
+    return row[0] if row and row[0] is not None else None
+
+
+def load_candles(
+    source: str,
+    symbol: str,
+    interval: str,
+    start: int | None = None,
+    end: int | None = None,
+    limit: int | None = None,
+    db_file: str | None = None,
+) -> pd.DataFrame:
+    """Return stored candles as a DataFrame indexed by UTC ``Date``.
+
+    ``start`` and ``end`` are inclusive open-time bounds in milliseconds.
+    With ``limit`` only the newest ``limit`` candles in the range are
+    returned.
+    """
+    query = (
+        "SELECT open_time, open, high, low, close, volume FROM ohlcv"
+        " WHERE source=? AND symbol=? AND interval=?"
+    )
+    params: list = [source, symbol, interval]
+    if start is not None:
+        query += " AND open_time >= ?"
+        params.append(int(start))
+    if end is not None:
+        query += " AND open_time <= ?"
+        params.append(int(end))
+    query += " ORDER BY open_time DESC"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(int(limit))
+    with _connect(db_file) as conn:
+        rows = conn.execute(query, params).fetchall()
+    rows.reverse()
+    df = pd.DataFrame(
+        rows, columns=["open_time", "Open", "High", "Low", "Close", "Volume"]
+    )
+    df["Date"] = pd.to_datetime(df["open_time"], unit="ms")
+    return df.drop(columns="open_time").set_index("Date")
+
+
+def _load_spans(
+    conn: sqlite3.Connection, source: str, symbol: str, interval: str
+) -> list[tuple[int, int]]:
+    cur = conn.execute(
+        "SELECT start, end FROM ohlcv_spans WHERE source=? AND symbol=? AND interval=?"
+        " ORDER BY start",
+        (source, symbol, interval),
+    )
+    return [(int(s), int(e)) for s, e in cur.fetchall()]
+
+
+def add_span(
+    source: str,
+    symbol: str,
+    interval: str,
+    start: int,
+    end: int,
+    db_file: str | None = None,
+) -> None:
+    """Mark open times ``start``..``end`` (inclusive) as downloaded.
+
+    Overlapping and adjacent spans are merged into one entry.
+    """
+    if end < start:
+        return
+    step = interval_ms(interval)
+    with _connect(db_file) as conn:
+        spans = _load_spans(conn, source, symbol, interval)
+        spans.append((int(start), int(end)))
+        spans.sort()
+        merged: list[list[int]] = []
+        for s, e in spans:
+            if merged and s <= merged[-1][1] + step:
+                merged[-1][1] = max(merged[-1][1], e)
+            else:
+                merged.append([s, e])
+        conn.execute(
+            "DELETE FROM ohlcv_spans WHERE source=? AND symbol=? AND interval=?",
+            (source, symbol, interval),
+        )
+        conn.executemany(
+            "INSERT INTO ohlcv_spans(source, symbol, interval, start, end) VALUES (?, ?, ?, ?, ?)",
+            [(source, symbol, interval, s, e) for s, e in merged],
+        )
+        conn.commit()
+
+
+def missing_spans(
+    source: str,
+    symbol: str,
+    interval: str,
+    start: int,
+    end: int,
+    db_file: str | None = None,
+) -> list[tuple[int, int]]:
+    """Return the parts of ``start``..``end`` not covered by stored spans."""
+    step = interval_ms(interval)
+    with _connect(db_file) as conn:
+        spans = _load_spans(conn, source, symbol, interval)
+    missing: list[tuple[int, int]] = []
+    cursor = int(start)
+    for s, e in spans:
+        if e < cursor:
+            continue
+        if s > end:
+            break
+        if s > cursor:
+            missing.append((cursor, min(s - step, end)))
+        cursor = max(cursor, e + step)
+        if cursor > end:
+            break
+    if cursor <= end:
+        missing.append((cursor, int(end)))
+    return [(s, e) for s, e in missing if e >= s]
+
+
+__all__ = [
+    "DB_FILE",
+    "INTERVAL_MS",
+    "interval_ms",
+    "init_db",
+    "parse_binance_klines",
+    "last_closed_open_time",
+    "store_candles",
+    "last_open_time",
+    "load_candles",
+    "add_span",
+    "missing_spans",
+]
@@ -0,0 +1,115 @@
+"""Debounced, atomic JSON persistence.
+
+:class:`Debouncer` coalesces frequent save requests: callers only mark
+the state dirty and a background timer runs the save action once per
+debounce interval. :func:`atomic_write_json` writes JSON to a temporary
+file in the same directory and moves it into place with
+:func:`os.replace`, so readers never see a partially written document.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+def atomic_write_json(path: str, data: Any, indent: int | None = 2) -> None:
+    """Write ``data`` as JSON to ``path`` atomically."""
+    text = json.dumps(data, indent=indent)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class Debouncer:
+    """Run ``action`` at most once per ``delay`` seconds after changes.
+
+    Parameters
+    ----------
+    action:
+        Callable persisting the current state. It runs on the timer thread
+        at flush time, so the latest state is always written.
+    delay:
+        Debounce interval in seconds. With ``0`` every :meth:`mark_dirty`
+        runs the action synchronously.
+    """
+
+    def __init__(self, action: Callable[[], None], delay: float = 2.0) -> None:
+        self._action = action
+        self.delay = delay
+        self._dirty = False
+        self._timer: threading.Timer | None = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    @property
+    def dirty(self) -> bool:
+        """Whether changes are waiting to be written."""
+        return self._dirty
+
+    def mark_dirty(self) -> None:
+        """Schedule a write of the current state."""
+        if self.delay <= 0:
+            with self._lock:
+                self._dirty = True
+            self.flush()
+            return
+        with self._lock:
+            self._dirty = True
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay, self._on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _on_timer(self) -> None:
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        except Exception as exc:
+            logger.error("Saving state failed: %s", exc)
+            self.mark_dirty()
+
+    def flush(self) -> None:
+        """Write pending changes now."""
+        with self._write_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                self._dirty = False
+            try:
+                self._action()
+            except BaseException:
+                with self._lock:
+                    self._dirty = True
+                raise
+
+    def close(self) -> None:
+        """Cancel the pending timer and write outstanding changes."""
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+        self.flush()
+
+
+__all__ = ["atomic_write_json", "Debouncer"]
@@ -0,0 +1,286 @@
+"""Event-driven evaluation of price alerts.
+
+The WebSocket client pushes every ticker update to an
+:class:`AlertDispatcher`, which hands it to a worker thread so the socket
+thread never waits for Telegram. The worker looks the pair up in an
+:class:`AlertIndex` of the users' stop-loss, take-profit, trailing and
+percent thresholds and evaluates only the entries whose threshold the
+price crossed since the previous tick.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ALERT_KEYS = ("stop_loss", "take_profit", "trailing_percent", "percent")
+
+# Index entries are keyed by ``(chat_id, symbol)`` as stored in the user config.
+Key = Tuple[str, str]
+# Sorted list item: ``(threshold, chat_id, symbol)``
+Trigger = Tuple[float, str, str]
+
+
+def _threshold(item: Trigger) -> float:
+    return item[0]
+
+
+def alert_triggers(data: Mapping[str, Any]) -> Tuple[List[float], List[float]]:
+    """Return the prices at which ``data`` needs to be evaluated.
+
+    The first list holds "price <= X" thresholds (stop-loss, lower percent
+    bound), the second "price >= Y" thresholds (take-profit, upper percent
+    bound and the price at which a trailing stop is raised).
+    """
+    below: List[float] = []
+    above: List[float] = []
+    sl = data.get("stop_loss")
+    tp = data.get("take_profit")
+    trailing = data.get("trailing_percent")
+    if sl is not None and sl > 0:
+        below.append(float(sl))
+    if tp is not None and tp > 0:
+        above.append(float(tp))
+    if trailing is not None:
+        if sl is None or sl <= 0:
+            # The first price initializes the trailing stop.
+            above.append(0.0)
+        elif trailing < 100:
+            above.append(float(sl) / (1 - trailing / 100))
+    percent = data.get("percent")
+    base_price = data.get("base_price")
+    if percent is not None and base_price is not None:
+        below.append(base_price * (1 - percent / 100))
+        above.append(base_price * (1 + percent / 100))
+    return below, above
+
+
+class AlertIndex:
+    """Per-pair sorted price thresholds of the users' alerts.
+
+    For every pair the index keeps one list of "fire when price <= X" and one
+    of "fire when price >= Y" thresholds, sorted by price. :meth:`crossed`
+    bisects both lists between the previous and the current price of the
+    pair, so a tick touches only the entries it crossed: ``O(log n + k)``.
+    Entries are added, moved and removed one at a time with :meth:`update`
+    and :meth:`remove` when a threshold changes.
+    """
+
+    def __init__(self) -> None:
+        self._below: Dict[str, List[Trigger]] = {}
+        self._above: Dict[str, List[Trigger]] = {}
+        self._entries: Dict[Key, Tuple[str, dict, List[Trigger], List[Trigger]]] = {}
+        self._last: Dict[str, float] = {}
+        # Entries already beyond a threshold when they were (re)indexed.
+        self._pending: Dict[str, Dict[Key, None]] = {}
+        self._lock = threading.Lock()
+
+    def _remove(self, key: Key) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        pair, _, below, above = entry
+        for side, items in ((self._below, below), (self._above, above)):
+            if not items:
+                continue
+            values = side[pair]
+            for item in items:
+                pos = bisect.bisect_left(values, item)
+                if pos < len(values) and values[pos] == item:
+                    del values[pos]
+            if not values:
+                del side[pair]
+        self._pending.get(pair, {}).pop(key, None)
+
+    def _add(self, key: Key, pair: str, data: dict) -> None:
+        below, above = alert_triggers(data)
+        if not below and not above:
+            return
+        cid, sym = key
+        below_items = [(value, cid, sym) for value in below]
+        above_items = [(value, cid, sym) for value in above]
+        for item in below_items:
+            bisect.insort(self._below.setdefault(pair, []), item)
+        for item in above_items:
+            bisect.insort(self._above.setdefault(pair, []), item)
+        self._entries[key] = (pair, data, below_items, above_items)
+        last = self._last.get(pair)
+        if last is not None and (
+            any(last <= value for value in below) or any(last >= value for value in above)
+        ):
+            self._pending.setdefault(pair, {})[key] = None
+
+    def update(self, cid: str, sym: str, data: Optional[dict], pair: Optional[str]) -> None:
+        """Re-index the alerts of ``sym`` for ``cid`` after a change.
+
+        ``data`` is stored by reference. Passing ``None`` for ``data`` or
+        ``pair`` removes the entry; unchanged thresholds leave it in place.
+        An entry whose new threshold is already crossed at the last seen
+        price is returned by the next :meth:`crossed` call of its pair.
+        """
+        key = (str(cid), sym)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and data is not None and pair:
+                old_pair, _, below, above = entry
+                if old_pair == pair.upper() and alert_triggers(data) == (
+                    [t for t, _, _ in below],
+                    [t for t, _, _ in above],
+                ):
+                    # Thresholds unchanged: the entry keeps its place.
+                    self._entries[key] = (old_pair, data, below, above)
+                    return
+            self._remove(key)
+            if data is not None and pair:
+                self._add(key, pair.upper(), data)
+
+    def remove(self, cid: str, sym: str) -> None:
+        """Drop the alerts of ``sym`` for ``cid``."""
+        self.update(cid, sym, None, None)
+
+    def update_user(
+        self,
+        cid: str,
+        cfg: Mapping[str, Any],
+        normalize: Callable[[str], Optional[str]],
+    ) -> None:
+        """Re-index all symbols of one user, e.g. after toggling notifications."""
+        cid = str(cid)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == cid]:
+                self._remove(key)
+            if not cfg.get("notifications", True):
+                return
+            for sym, data in list(cfg.get("symbols", {}).items()):
+                pair = normalize(sym)
+                if pair:
+                    self._add((cid, sym), pair.upper(), data)
+
+    def rebuild(
+        self,
+        users: Mapping[str, Mapping[str, Any]],
+        normalize: Callable[[str], Optional[str]],
+    ) -> None:
+        """Index the alerts of all ``users`` from scratch."""
+        with self._lock:
+            self._below.clear()
+            self._above.clear()
+            self._entries.clear()
+            self._pending.clear()
+            self._last.clear()
+        for cid, cfg in list(users.items()):
+            self.update_user(cid, cfg, normalize)
+
+    def crossed(self, pair: str, price: float) -> List[Tuple[str, str, dict]]:
+        """Return the ``(chat_id, symbol, data)`` entries crossed by ``price``.
+
+        On the first price of a pair every entry already beyond one of its
+        thresholds is returned.
+        """
+        pair = pair.upper()
+        with self._lock:
+            last = self._last.get(pair)
+            self._last[pair] = price
+            keys: Dict[Key, None] = self._pending.pop(pair, {})
+            below = self._below.get(pair, [])
+            if last is None or price < last:
+                lo = bisect.bisect_left(below, price, key=_threshold)
+                hi = len(below) if last is None else bisect.bisect_left(below, last, key=_threshold)
+                for _, cid, sym in below[lo:hi]:
+                    keys[(cid, sym)] = None
+            above = self._above.get(pair, [])
+            if last is None or price > last:
+                lo = 0 if last is None else bisect.bisect_right(above, last, key=_threshold)
+                hi = bisect.bisect_right(above, price, key=_threshold)
+                for _, cid, sym in above[lo:hi]:
+                    keys[(cid, sym)] = None
+            return [(cid, sym, self._entries[(cid, sym)][1]) for cid, sym in keys]
+
+    def entries(self, pair: str) -> List[Tuple[str, str, dict]]:
+        """Return all indexed ``(chat_id, symbol, data)`` entries of ``pair``."""
+        pair = pair.upper()
+        with self._lock:
+            return [
+                (cid, sym, data)
+                for (cid, sym), (p, data, _, _) in self._entries.items()
+                if p == pair
+            ]
+
+    def __contains__(self, pair: str) -> bool:
+        pair = pair.upper()
+        with self._lock:
+            return pair in self._below or pair in self._above
+
+
+class AlertDispatcher:
+    """Call ``handle(pair, price)`` for pushed ticks on a worker thread.
+
+    Ticks are coalesced per pair: while the worker is busy, e.g. waiting on
+    Telegram, newer ticks replace older ones, so each pair is evaluated at
+    its latest price only and a backlog never builds up.
+
+    Parameters
+    ----------
+    handle:
+        Evaluates the alerts of one pair at the given price.
+    index:
+        Ticks for pairs without alerts in this index are dropped right away.
+    """
+
+    def __init__(
+        self,
+        handle: Callable[[str, float], None],
+        index: Optional[AlertIndex] = None,
+    ) -> None:
+        self._handle = handle
+        self._index = index
+        self._latest: Dict[str, float] = {}
+        # Pairs with an unhandled tick, in arrival order.
+        self._dirty: Dict[str, None] = {}
+        self._busy = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._run, name="price-alerts", daemon=True
+        )
+        self._thread.start()
+
+    def push(self, pair: str, price: float) -> None:
+        """Record a tick; safe to call from the socket thread."""
+        pair = pair.upper()
+        if self._index is not None and pair not in self._index:
+            return
+        with self._cond:
+            self._latest[pair] = price
+            self._dirty[pair] = None
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._dirty:
+                    self._cond.wait()
+                pair = next(iter(self._dirty))
+                del self._dirty[pair]
+                price = self._latest.pop(pair)
+                self._busy = True
+            try:
+                self._handle(pair, price)
+            except Exception as exc:
+                logger.error("price alert error for %s: %s", pair, exc)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def join(self) -> None:
+        """Block until all pending ticks have been handled."""
+        with self._cond:
+            while self._dirty or self._busy:
+                self._cond.wait()
+
+
+__all__ = ["ALERT_KEYS", "AlertDispatcher", "AlertIndex", "alert_triggers"]
@@ -0,0 +1,115 @@
+"""TTL-cached bulk price tables.
+
+Binance returns data for every symbol when the ``symbol`` parameter is
+omitted from endpoints such as ``/fapi/v1/premiumIndex`` or
+``/fapi/v1/ticker/24hr``. :class:`PriceSnapshot` fetches such a table once
+and serves per-symbol lookups from it until the snapshot expires.
+
+A refresh runs in the thread of the first lookup after expiry, without
+holding the lock: concurrent lookups keep getting the previous table (or
+an empty one before the first fetch, so callers fall back to per-symbol
+requests) instead of queueing behind a slow request.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class PriceSnapshot:
+    """Cache the full per-symbol table of a bulk endpoint for ``ttl`` seconds.
+
+    Parameters
+    ----------
+    fetch:
+        Callable receiving the URL and returning the decoded JSON list or
+        ``None`` on failure (e.g. ``fetch_json``).
+    url:
+        Endpoint returning one entry per symbol.
+    ttl:
+        Number of seconds a snapshot is served before it is refreshed.
+    retry_after:
+        Seconds to wait before retrying a failed refresh; defaults to
+        ``ttl`` or 5 seconds, whichever is shorter.
+    clock:
+        Monotonic time source, mainly for tests.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Any],
+        url: str,
+        ttl: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+        retry_after: float | None = None,
+    ) -> None:
+        self._fetch = fetch
+        self.url = url
+        self.ttl = ttl
+        self.retry_after = min(ttl, 5.0) if retry_after is None else retry_after
+        self._clock = clock
+        self._rows: dict[str, dict] = {}
+        # Time at which the current table expires; ``None`` forces a refresh.
+        self._expires_at: float | None = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict[str, dict] | None:
+        try:
+            data = self._fetch(self.url)
+        except Exception as exc:
+            logger.error("PriceSnapshot refresh failed for %s: %s", self.url, exc)
+            return None
+        if not isinstance(data, list):
+            logger.error("PriceSnapshot refresh failed for %s", self.url)
+            return None
+        rows: dict[str, dict] = {}
+        for entry in data:
+            symbol = entry.get("symbol") if isinstance(entry, dict) else None
+            if symbol:
+                rows[symbol.upper()] = entry
+        return rows
+
+    def rows(self) -> dict[str, dict]:
+        """Return the current table, refreshing it when expired.
+
+        Only one caller refreshes at a time; the others get the table that
+        was current before.
+        """
+        with self._lock:
+            expired = self._expires_at is None or self._clock() >= self._expires_at
+            if not expired or self._refreshing:
+                return self._rows
+            self._refreshing = True
+        rows = None
+        try:
+            rows = self._load()
+        finally:
+            with self._lock:
+                self._refreshing = False
+                if rows is not None:
+                    self._rows = rows
+                    self._expires_at = self._clock() + self.ttl
+                else:
+                    # An empty table makes callers fall back to per-symbol
+                    # requests until the bulk endpoint is retried.
+                    self._rows = {}
+                    self._expires_at = self._clock() + self.retry_after
+        return self._rows
+
+    def get(self, symbol: str) -> dict | None:
+        """Return the snapshot entry for ``symbol`` or ``None``."""
+        return self.rows().get(symbol.upper())
+
+    def invalidate(self) -> None:
+        """Force a refresh on the next lookup."""
+        with self._lock:
+            self._expires_at = None
+
+
+__all__ = ["PriceSnapshot"]
@@ -0,0 +1,357 @@
+"""SQLite-backed store for user and symbol state.
+
+The bot keeps working on the nested ``users`` dict in memory; this module
+persists it to ``state.db`` in four tables:
+
+``users``
+    One JSON row per chat with the user settings (language, role, keys…).
+``symbols``
+    One JSON row per watched symbol with its alert and trading settings.
+``positions``
+    Real and simulated position sizes and simulation balances.
+``sim_trades``
+    Append-only log of simulated trades.
+
+:func:`sync_users` compares every row with the last stored version and
+only writes rows that changed, so a save after a single trailing-stop
+update touches a single row instead of re-serializing every user.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DB_FILE = "state.db"
+
+POSITION_FIELDS = ("position", "sim_start", "sim_balance", "sim_position")
+
+# Symbol settings dropped from storage while they hold their default value;
+# ``get_user`` fills the defaults back in.
+_SYMBOL_DEFAULTS = {
+    "trailing_percent": None,
+    "last_signal": None,
+    "trade_percent": None,
+    "trade_amount": 0.0,
+    "quantity": 0.0,
+}
+
+_initialized: set[str] = set()
+_lock = threading.Lock()
+# db_file -> {table: {key: serialized row}} as last written
+_synced: dict[str, dict[str, dict]] = {}
+
+
+def init_db(db_file: str | None = None) -> None:
+    """Create the state tables if necessary."""
+    db_file = db_file or DB_FILE
+    with sqlite3.connect(db_file) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS users (
+                chat_id TEXT PRIMARY KEY,
+                data TEXT
+            )
+            """
+        )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS symbols (
+                chat_id TEXT,
+                symbol TEXT,
+                data TEXT,
+                PRIMARY KEY(chat_id, symbol)
+            )
+            """
+        )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS positions (
+                chat_id TEXT,
+                symbol TEXT,
+                position REAL,
+                sim_start REAL,
+                sim_balance REAL,
+                sim_position REAL,
+                PRIMARY KEY(chat_id, symbol)
+            )
+            """
+        )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sim_trades (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                chat_id TEXT,
+                symbol TEXT,
+                side TEXT,
+                price REAL,
+                qty REAL
+            )
+            """
+        )
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS sim_trades_symbol ON sim_trades(chat_id, symbol)"
+        )
+        cur.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.commit()
+    with _lock:
+        _initialized.add(db_file)
+
+
+def _connect(db_file: str | None) -> sqlite3.Connection:
+    db_file = db_file or DB_FILE
+    if db_file not in _initialized:
+        init_db(db_file)
+    return sqlite3.connect(db_file)
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, sort_keys=True)
+
+
+def _split_user(cid: str, cfg: dict) -> tuple[str, dict, dict]:
+    """Return serialized user, symbol and position rows for one user."""
+    user = _dumps({k: v for k, v in cfg.items() if k != "symbols"})
+    symbols = {}
+    positions = {}
+    for sym, sym_cfg in cfg.get("symbols", {}).items():
+        row = {
+            k: v
+            for k, v in sym_cfg.items()
+            if k not in POSITION_FIELDS
+            and k != "sim_actions"
+            and not (k in _SYMBOL_DEFAULTS and v == _SYMBOL_DEFAULTS[k])
+        }
+        symbols[(cid, sym)] = _dumps(row)
+        positions[(cid, sym)] = tuple(sym_cfg.get(f) for f in POSITION_FIELDS)
+    return user, symbols, positions
+
+
+def _snapshot(users: dict) -> dict:
+    """Return a copy of ``users`` down to the symbol settings.
+
+    ``dict()`` copies run without releasing the GIL, so handlers adding or
+    removing users and symbols meanwhile cannot break the iteration of a
+    sync running on the writer thread.
+    """
+    return {
+        cid: {
+            **cfg,
+            "symbols": {
+                sym: dict(sym_cfg)
+                for sym, sym_cfg in dict(cfg.get("symbols", {})).items()
+            },
+        }
+        for cid, cfg in dict(users).items()
+    }
+
+
+def _rows(users: dict) -> dict[str, dict]:
+    tables: dict[str, dict] = {"users": {}, "symbols": {}, "positions": {}}
+    for cid, cfg in _snapshot(users).items():
+        user, symbols, positions = _split_user(str(cid), cfg)
+        tables["users"][str(cid)] = user
+        tables["symbols"].update(symbols)
+        tables["positions"].update(positions)
+    return tables
+
+
+def _write_rows(
+    conn: sqlite3.Connection, previous: dict[str, dict], current: dict[str, dict]
+) -> int:
+    """Write the difference between two :func:`_rows` results without committing."""
+    changes = 0
+    for table in ("users", "symbols", "positions"):
+        old, new = previous.get(table, {}), current[table]
+        changed = [key for key, row in new.items() if old.get(key) != row]
+        removed = [key for key in old if key not in new]
+        for key in changed:
+            row = new[key]
+            if table == "users":
+                conn.execute(
+                    "INSERT OR REPLACE INTO users(chat_id, data) VALUES (?, ?)",
+                    (key, row),
+                )
+            elif table == "symbols":
+                conn.execute(
+                    "INSERT OR REPLACE INTO symbols(chat_id, symbol, data) VALUES (?, ?, ?)",
+                    (*key, row),
+                )
+            else:
+                conn.execute(
+                    "INSERT OR REPLACE INTO positions"
+                    "(chat_id, symbol, position, sim_start, sim_balance, sim_position)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (*key, *row),
+                )
+        for key in removed:
+            if table == "users":
+                conn.execute("DELETE FROM users WHERE chat_id=?", (key,))
+            else:
+                conn.execute(
+                    f"DELETE FROM {table} WHERE chat_id=? AND symbol=?", key
+                )
+        changes += len(changed) + len(removed)
+    return changes
+
+
+def sync_users(users: dict, db_file: str | None = None) -> int:
+    """Write rows of ``users`` that changed since the last sync.
+
+    Returns the number of inserted, updated or deleted rows.
+    """
+    db_file = db_file or DB_FILE
+    current = _rows(users)
+    previous = _synced.get(db_file, {"users": {}, "symbols": {}, "positions": {}})
+    with _connect(db_file) as conn:
+        changes = _write_rows(conn, previous, current)
+        conn.commit()
+    _synced[db_file] = current
+    if changes:
+        logger.debug("state sync wrote %d rows", changes)
+    return changes
+
+
+def load_users(db_file: str | None = None) -> dict:
+    """Return the stored state as the nested ``users`` dict."""
+    db_file = db_file or DB_FILE
+    users: dict[str, dict] = {}
+    with _connect(db_file) as conn:
+        for cid, data in conn.execute("SELECT chat_id, data FROM users"):
+            users[cid] = json.loads(data)
+            users[cid]["symbols"] = {}
+        for cid, sym, data in conn.execute("SELECT chat_id, symbol, data FROM symbols"):
+            users.setdefault(cid, {"symbols": {}})["symbols"][sym] = json.loads(data)
+        for cid, sym, *values in conn.execute(
+            "SELECT chat_id, symbol, position, sim_start, sim_balance, sim_position"
+            " FROM positions"
+        ):
+            sym_cfg = users.get(cid, {}).get("symbols", {}).get(sym)
+            if sym_cfg is None:
+                continue
+            for field, value in zip(POSITION_FIELDS, values):
+                if value is not None:
+                    sym_cfg[field] = value
+    _synced[db_file] = _rows(users)
+    return users
+
+
+def is_migrated(db_file: str | None = None) -> bool:
+    """Return whether the JSON users have already been imported."""
+    with _connect(db_file) as conn:
+        row = conn.execute("SELECT value FROM meta WHERE key='migrated'").fetchone()
+    return row is not None
+
+
+def migrate_from_config(users: dict, db_file: str | None = None) -> bool:
+    """Import ``users`` from config.json once.
+
+    Existing ``sim_actions`` lists are moved to ``sim_trades``. The users,
+    the trades and the ``migrated`` flag are written in one transaction, so
+    an interrupted import is retried in full on the next start. Returns
+    ``True`` if the import ran.
+    """
+    db_file = db_file or DB_FILE
+    if is_migrated(db_file):
+        return False
+    trades = []
+    for cid, cfg in users.items():
+        for sym, sym_cfg in cfg.get("symbols", {}).items():
+            for action in sym_cfg.get("sim_actions", []):
+                trades.append(
+                    (
+                        str(cid),
+                        sym,
+                        str(action["side"]).upper(),
+                        float(action["price"]),
+                        float(action["qty"]),
+                    )
+                )
+    current = _rows(users)
+    with _connect(db_file) as conn:
+        _write_rows(conn, {}, current)
+        conn.executemany(
+            "INSERT INTO sim_trades(chat_id, symbol, side, price, qty) VALUES (?, ?, ?, ?, ?)",
+            trades,
+        )
+        conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES ('migrated', '1')")
+        conn.commit()
+    _synced[db_file] = current
+    logger.info(
+        "Migrated %d users and %d simulated trades to %s",
+        len(users),
+        len(trades),
+        db_file,
+    )
+    return True
+
+
+def add_sim_trade(
+    chat_id: str,
+    symbol: str,
+    side: str,
+    price: float,
+    qty: float,
+    db_file: str | None = None,
+) -> None:
+    """Append a simulated trade."""
+    with _connect(db_file) as conn:
+        conn.execute(
+            "INSERT INTO sim_trades(chat_id, symbol, side, price, qty) VALUES (?, ?, ?, ?, ?)",
+            (str(chat_id), symbol, side.upper(), float(price), float(qty)),
+        )
+        conn.commit()
+
+
+def load_sim_trades(
+    chat_id: str, symbol: str, db_file: str | None = None
+) -> list[dict]:
+    """Return the simulated trades of ``symbol`` in insertion order."""
+    with _connect(db_file) as conn:
+        rows = conn.execute(
+            "SELECT side, price, qty FROM sim_trades WHERE chat_id=? AND symbol=? ORDER BY id",
+            (str(chat_id), symbol),
+        ).fetchall()
+    return [{"side": side, "price": price, "qty": qty} for side, price, qty in rows]
+
+
+def sim_trade_totals(
+    chat_id: str, db_file: str | None = None
+) -> dict[str, tuple[int, float]]:
+    """Return ``symbol -> (trade count, summed quantity)`` for a chat."""
+    with _connect(db_file) as conn:
+        rows = conn.execute(
+            "SELECT symbol, COUNT(*), SUM(qty) FROM sim_trades WHERE chat_id=? GROUP BY symbol",
+            (str(chat_id),),
+        ).fetchall()
+    return {symbol: (count, qty or 0.0) for symbol, count, qty in rows}
+
+
+def clear_sim_trades(chat_id: str, symbol: str, db_file: str | None = None) -> None:
+    """Delete the simulated trades of ``symbol``."""
+    with _connect(db_file) as conn:
+        conn.execute(
+            "DELETE FROM sim_trades WHERE chat_id=? AND symbol=?", (str(chat_id), symbol)
+        )
+        conn.commit()
+
+
+__all__ = [
+    "DB_FILE",
+    "POSITION_FIELDS",
+    "init_db",
+    "sync_users",
+    "load_users",
+    "is_migrated",
+    "migrate_from_config",
+    "add_sim_trade",
+    "load_sim_trades",
+    "sim_trade_totals",
+    "clear_sim_trades",
+]
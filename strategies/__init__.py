@@ -5,7 +5,7 @@ from __future__ import annotations
 import inspect
 import logging
 
-from .base import Strategy
+from .base import Strategy, make_panel
 from .momentum import MomentumStrategy
 from .trend_following import TrendFollowingStrategy
 from .arbitrage import ArbitrageStrategy
@@ -46,5 +46,6 @@ __all__ = [
     "TrendFollowingStrategy",
     "ArbitrageStrategy",
     "get_strategy",
+    "make_panel",
     "STRATEGY_CLASSES",
 ]
@@ -4,7 +4,8 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 import pandas as pd
-import requests
+
+import http_client
 
 from .base import Strategy
 
@@ -25,7 +26,7 @@ class ArbitrageStrategy(Strategy):
 
     def _binance_price(self) -> float:
         url = "https://api.binance.com/api/v3/ticker/price"
-        resp = requests.get(url, params={"symbol": self.params.symbol}, timeout=10)
+        resp = http_client.get(url, params={"symbol": self.params.symbol}, timeout=10)
         resp.raise_for_status()
         return float(resp.json()["price"])
 
@@ -35,7 +36,7 @@ class ArbitrageStrategy(Strategy):
         if "-" not in pair:
             pair = pair[:-3] + "-" + pair[-3:]
         url = f"https://api.coinbase.com/v2/prices/{pair}/spot"
-        resp = requests.get(url, timeout=10)
+        resp = http_client.get(url, timeout=10)
         resp.raise_for_status()
         return float(resp.json()["data"]["amount"])
 
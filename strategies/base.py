@@ -1,12 +1,48 @@
 from __future__ import annotations
 
+import copy
+import pickle
 from abc import ABC, abstractmethod
+from typing import Any, Mapping
 
 import pandas as pd
 
 
+def make_panel(frames: Mapping[str, pd.DataFrame]) -> pd.DataFrame:
+    """Combine per-symbol OHLCV frames into a wide panel.
+
+    The result is indexed by the union of all dates and has ``(symbol,
+    field)`` MultiIndex columns; symbols without a bar on a date get
+    ``NaN`` for that row.
+    """
+    return pd.concat(dict(frames), axis=1, names=["Symbol", "Field"]).sort_index()
+
+
+def fields_to_panel(frames: Mapping[str, pd.DataFrame]) -> pd.DataFrame:
+    """Turn ``{column: dates × symbols}`` frames into ``(symbol, column)`` columns."""
+    combined = pd.concat(dict(frames), axis=1, names=["Field", "Symbol"])
+    symbols = next(iter(frames.values())).columns
+    order = pd.MultiIndex.from_product(
+        [symbols, list(frames)], names=["Symbol", "Field"]
+    )
+    return combined.swaplevel(axis=1).reindex(columns=order)
+
+
 class Strategy(ABC):
-    """Abstract base class for trading strategies."""
+    """Abstract base class for trading strategies.
+
+    Strategies that set ``incremental = True`` additionally support
+    streaming evaluation through :meth:`update`: each call consumes one bar
+    and updates the indicator state in constant time instead of recomputing
+    the whole history.
+    """
+
+    incremental: bool = False
+
+    _state: Any = None
+    _pre_bar_state: bytes | None = None
+    _last_timestamp: Any = None
+    _latest: dict | None = None
 
     @abstractmethod
     def generate_signals(
@@ -14,3 +50,136 @@ class Strategy(ABC):
     ) -> pd.DataFrame:
         """Return trading signals for ``df`` relative to ``benchmark``."""
         raise NotImplementedError
+
+    def latest_signal(self, df: pd.DataFrame, benchmark: pd.DataFrame) -> pd.Series:
+        """Return the feature row of the most recent bar including ``Signal``.
+
+        The default evaluates :meth:`generate_signals` and takes the last
+        row; strategies override it to compute only the final values.
+        """
+        return self.generate_signals(df, benchmark).iloc[-1]
+
+    def generate_signals_batch(
+        self, panel: pd.DataFrame, benchmark: pd.DataFrame
+    ) -> pd.DataFrame:
+        """Return signals for every symbol of a :func:`make_panel` panel.
+
+        The result uses the same ``(symbol, column)`` layout as ``panel``.
+        The default runs :meth:`generate_signals` per symbol; strategies
+        override it with column-wise vectorized implementations.
+        """
+        results = {}
+        for symbol in panel.columns.get_level_values(0).unique():
+            df = panel[symbol].dropna(how="all")
+            results[symbol] = self.generate_signals(df, benchmark).reindex(panel.index)
+        return pd.concat(results, axis=1, names=["Symbol", "Field"])
+
+    def _new_state(self) -> Any:
+        """Return fresh indicator state for streaming evaluation."""
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support incremental updates"
+        )
+
+    def _advance(
+        self, state: Any, bar: Mapping, timestamp: Any, benchmark: float | None
+    ) -> dict:
+        """Feed one bar into ``state`` and return the resulting feature row."""
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support incremental updates"
+        )
+
+    @property
+    def last_timestamp(self) -> Any:
+        """Timestamp of the most recent bar passed to :meth:`update`."""
+        return self._last_timestamp
+
+    @property
+    def latest(self) -> dict | None:
+        """Feature row returned by the most recent :meth:`update`."""
+        return self._latest
+
+    def reset(self) -> None:
+        """Discard the streaming state."""
+        self._state = None
+        self._pre_bar_state = None
+        self._last_timestamp = None
+        self._latest = None
+
+    def update(
+        self,
+        bar: Mapping,
+        benchmark: float | None = None,
+        timestamp: Any = None,
+    ) -> dict:
+        """Consume one OHLCV bar and return its feature row including ``Signal``.
+
+        Parameters
+        ----------
+        bar : Mapping
+            Bar with ``Open``, ``High``, ``Low``, ``Close`` and ``Volume``;
+            typically a row of an OHLCV DataFrame.
+        benchmark : float, optional
+            Benchmark close for the same bar.
+        timestamp : optional
+            Bar timestamp. Defaults to ``bar.name`` for DataFrame rows.
+
+        Passing a bar with the same timestamp as the previous call replaces
+        that bar, so the still open candle can be refreshed on every tick.
+        """
+        if timestamp is None:
+            timestamp = getattr(bar, "name", None)
+        if self._state is None:
+            self._state = self._new_state()
+        last = self._last_timestamp
+        if last is not None and timestamp == last:
+            self._state = pickle.loads(self._pre_bar_state)
+        elif last is not None and timestamp is not None and timestamp < last:
+            raise ValueError(f"bar {timestamp} is older than {last}")
+        else:
+            # Serialized copy of the state before this bar; pickle is much
+            # cheaper than deepcopy for the indicator deques.
+            self._pre_bar_state = pickle.dumps(self._state, pickle.HIGHEST_PROTOCOL)
+        self._latest = self._advance(self._state, bar, timestamp, benchmark)
+        self._last_timestamp = timestamp
+        return self._latest
+
+    def prime(
+        self, df: pd.DataFrame, benchmark: pd.DataFrame | None = None
+    ) -> dict | None:
+        """Reset the streaming state and feed the history in ``df``.
+
+        Returns the feature row of the last bar or ``None`` for empty data.
+        """
+        self.reset()
+        if df is None or df.empty:
+            return None
+        bench = None
+        if benchmark is not None:
+            bench = benchmark["Close"].reindex(df.index).ffill().tolist()
+        state = self._new_state()
+        records = df.to_dict("records")
+        index = list(df.index)
+        # Only the last bar needs a restorable pre-bar snapshot.
+        for i in range(len(records) - 1):
+            self._advance(state, records[i], index[i], bench[i] if bench else None)
+        self._state = state
+        return self.update(records[-1], bench[-1] if bench else None, index[-1])
+
+    def snapshot(self) -> dict:
+        """Return a copy of the streaming state."""
+        return copy.deepcopy(
+            {
+                "state": self._state,
+                "pre_bar_state": self._pre_bar_state,
+                "last_timestamp": self._last_timestamp,
+                "latest": self._latest,
+            }
+        )
+
+    def restore(self, snapshot: dict) -> None:
+        """Restore a state previously returned by :meth:`snapshot`."""
+        snapshot = copy.deepcopy(snapshot)
+        self._state = snapshot["state"]
+        self._pre_bar_state = snapshot["pre_bar_state"]
+        self._last_timestamp = snapshot["last_timestamp"]
+        self._latest = snapshot["latest"]
@@ -0,0 +1,292 @@
+"""Incremental indicator implementations.
+
+Each indicator consumes one value (or bar) per call to ``update`` and
+returns its current value in O(1) (amortized) time. The results match the
+batch helpers in :mod:`strategies.momentum` and the rolling/ewm pandas
+operations they are built on, including their ``NaN`` warm-up behaviour.
+Indicator state is plain Python data, so :meth:`Indicator.snapshot` and
+:meth:`Indicator.restore` can save and reload it.
+"""
+
+from __future__ import annotations
+
+import bisect
+import copy
+import math
+from collections import deque
+
+NAN = float("nan")
+
+
+def _isnan(value: float) -> bool:
+    return value != value
+
+
+class Indicator:
+    """Base class providing snapshot/restore of the indicator state."""
+
+    def snapshot(self) -> dict:
+        """Return a copy of the internal state."""
+        return copy.deepcopy(self.__dict__)
+
+    def restore(self, state: dict) -> None:
+        """Restore a state previously returned by :meth:`snapshot`."""
+        self.__dict__.update(copy.deepcopy(state))
+
+
+class EMA(Indicator):
+    """Exponential moving average, equivalent to ``ewm(span, adjust=False)``."""
+
+    def __init__(self, span: int) -> None:
+        self.span = span
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = NAN
+        self._old_wt = 1.0
+
+    def _next(self, x: float) -> tuple[float, float]:
+        alpha = self.alpha
+        weighted = self.value
+        old_wt = self._old_wt
+        if _isnan(weighted):
+            return (x, old_wt) if not _isnan(x) else (weighted, old_wt)
+        old_wt *= 1.0 - alpha
+        if not _isnan(x):
+            # Same arithmetic as pandas' ewm kernel for bit-identical output.
+            if weighted != x:
+                weighted = old_wt * weighted + alpha * x
+                weighted /= old_wt + alpha
+            old_wt = 1.0
+        return weighted, old_wt
+
+    def update(self, x: float) -> float:
+        self.value, self._old_wt = self._next(x)
+        return self.value
+
+    def peek(self, x: float) -> float:
+        """Return the value after ``x`` without changing the state."""
+        return self._next(x)[0]
+
+
+class RollingMean(Indicator):
+    """Rolling mean over ``window`` values; ``NaN`` until the window is full."""
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self._values: deque[float] = deque()
+        self._sum = 0.0
+        self._nobs = 0
+        self._updates = 0
+        self.value = NAN
+
+    def _mean(self, total: float, nobs: int) -> float:
+        return total / nobs if nobs >= self.window else NAN
+
+    def update(self, x: float) -> float:
+        self._values.append(x)
+        if not _isnan(x):
+            self._sum += x
+            self._nobs += 1
+        if len(self._values) > self.window:
+            old = self._values.popleft()
+            if not _isnan(old):
+                self._sum -= old
+                self._nobs -= 1
+        self._updates += 1
+        if self._updates % self.window == 0:
+            # Periodically re-sum to stop floating point drift.
+            self._sum = math.fsum(v for v in self._values if not _isnan(v))
+        self.value = self._mean(self._sum, self._nobs)
+        return self.value
+
+    def peek(self, x: float) -> float:
+        """Return the mean after ``x`` without changing the state."""
+        total, nobs = self._sum, self._nobs
+        if not _isnan(x):
+            total += x
+            nobs += 1
+        if len(self._values) + 1 > self.window:
+            old = self._values[0]
+            if not _isnan(old):
+                total -= old
+                nobs -= 1
+        return self._mean(total, nobs)
+
+
+class RollingQuantile(Indicator):
+    """Rolling quantile with linear interpolation, like ``rolling().quantile``.
+
+    A sorted copy of the window is maintained with :mod:`bisect`, giving
+    logarithmic lookups per update.
+    """
+
+    def __init__(self, window: int, quantile: float) -> None:
+        self.window = window
+        self.quantile = quantile
+        self._values: deque[float] = deque()
+        self._sorted: list[float] = []
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        self._values.append(x)
+        if not _isnan(x):
+            bisect.insort(self._sorted, x)
+        if len(self._values) > self.window:
+            old = self._values.popleft()
+            if not _isnan(old):
+                del self._sorted[bisect.bisect_left(self._sorted, old)]
+        nobs = len(self._sorted)
+        if nobs < self.window:
+            self.value = NAN
+        elif nobs == 1:
+            self.value = self._sorted[0]
+        else:
+            idx_with_fraction = self.quantile * (nobs - 1)
+            idx = int(idx_with_fraction)
+            low = self._sorted[idx]
+            if idx_with_fraction == idx:
+                self.value = low
+            else:
+                high = self._sorted[idx + 1]
+                self.value = low + (high - low) * (idx_with_fraction - idx)
+        return self.value
+
+
+class RollingExtreme(Indicator):
+    """Rolling maximum or minimum using a monotonic deque."""
+
+    def __init__(self, window: int, mode: str = "max") -> None:
+        if mode not in ("max", "min"):
+            raise ValueError(f"unknown mode: {mode}")
+        self.window = window
+        self.mode = mode
+        self._candidates: deque[tuple[int, float]] = deque()
+        self._nans: deque[int] = deque()
+        self._index = 0
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        i = self._index
+        self._index += 1
+        start = i - self.window + 1
+        while self._candidates and self._candidates[0][0] < start:
+            self._candidates.popleft()
+        while self._nans and self._nans[0] < start:
+            self._nans.popleft()
+        if _isnan(x):
+            self._nans.append(i)
+        else:
+            if self.mode == "max":
+                while self._candidates and self._candidates[-1][1] <= x:
+                    self._candidates.pop()
+            else:
+                while self._candidates and self._candidates[-1][1] >= x:
+                    self._candidates.pop()
+            self._candidates.append((i, x))
+        full = self._index >= self.window and not self._nans
+        self.value = self._candidates[0][1] if full and self._candidates else NAN
+        return self.value
+
+
+class Lag(Indicator):
+    """Return the value seen ``periods`` updates ago (``shift(periods)``)."""
+
+    def __init__(self, periods: int) -> None:
+        self.periods = periods
+        self._values: deque[float] = deque(maxlen=periods + 1)
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        self._values.append(x)
+        self.value = (
+            self._values[0] if len(self._values) == self.periods + 1 else NAN
+        )
+        return self.value
+
+
+class ATR(Indicator):
+    """Average true range matching :func:`strategies.momentum.atr`."""
+
+    def __init__(self, period: int = 14) -> None:
+        self._mean = RollingMean(period)
+        self._prev_close = NAN
+        self.value = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        ranges = [high - low]
+        if not _isnan(self._prev_close):
+            ranges += [abs(high - self._prev_close), abs(low - self._prev_close)]
+        ranges = [r for r in ranges if not _isnan(r)]
+        true_range = max(ranges) if ranges else NAN
+        self._prev_close = close
+        self.value = self._mean.update(true_range)
+        return self.value
+
+
+class RSI(Indicator):
+    """Relative strength index matching :func:`strategies.momentum.rsi`."""
+
+    def __init__(self, period: int = 14) -> None:
+        self._gain = RollingMean(period)
+        self._loss = RollingMean(period)
+        self._prev = NAN
+        self.value = NAN
+
+    @staticmethod
+    def _rsi(avg_gain: float, avg_loss: float) -> float:
+        if _isnan(avg_gain) or _isnan(avg_loss):
+            return NAN
+        if avg_loss == 0:
+            # pandas: x / 0 -> inf (RSI 100), 0 / 0 -> NaN
+            return 100.0 if avg_gain > 0 else NAN
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+    def _split(self, x: float) -> tuple[float, float]:
+        diff = x - self._prev
+        if _isnan(diff):
+            return NAN, NAN
+        return max(diff, 0.0), -min(diff, 0.0)
+
+    def update(self, x: float) -> float:
+        up, down = self._split(x)
+        self._prev = x
+        self.value = self._rsi(self._gain.update(up), self._loss.update(down))
+        return self.value
+
+    def peek(self, x: float) -> float:
+        """Return the RSI after ``x`` without changing the state."""
+        up, down = self._split(x)
+        return self._rsi(self._gain.peek(up), self._loss.peek(down))
+
+
+class OBV(Indicator):
+    """On-balance volume matching :func:`strategies.momentum.on_balance_volume`."""
+
+    def __init__(self) -> None:
+        self._prev_close = NAN
+        self.value = 0.0
+        self._started = False
+
+    def update(self, close: float, volume: float) -> float:
+        diff = close - self._prev_close
+        direction = 0.0 if _isnan(diff) else float((diff > 0) - (diff < 0))
+        self._prev_close = close
+        step = direction * volume
+        if not self._started:
+            self.value = step
+            self._started = True
+        elif not _isnan(step):
+            self.value += step
+        return self.value
+
+
+__all__ = [
+    "Indicator",
+    "EMA",
+    "RollingMean",
+    "RollingQuantile",
+    "RollingExtreme",
+    "Lag",
+    "ATR",
+    "RSI",
+    "OBV",
+]
@@ -2,13 +2,17 @@
 
 from __future__ import annotations
 
+import math
 from dataclasses import dataclass
-from typing import Optional
+from typing import Mapping, Optional
 
 import numpy as np
 import pandas as pd
 
-from .base import Strategy
+from .base import Strategy, fields_to_panel
+from .indicators import ATR, EMA, Lag, OBV, RSI, RollingQuantile
+
+NAN = float("nan")
 
 
 @dataclass
@@ -122,6 +126,152 @@ def compute_features(
     return df
 
 
+def compute_features_panel(
+    panel: pd.DataFrame, benchmark: pd.DataFrame, stress_threshold: float = 0.08
+) -> pd.DataFrame:
+    """Compute :func:`compute_features` for all symbols of a panel at once.
+
+    Parameters
+    ----------
+    panel : pd.DataFrame
+        Wide OHLCV data with ``(symbol, field)`` columns, see
+        :func:`strategies.base.make_panel`.
+    benchmark : pd.DataFrame
+        Benchmark OHLCV data, aligned to the panel dates once.
+    stress_threshold : float, optional
+        Maximum acceptable ``ATR_ratio``.  Default is ``0.08`` (8%).
+
+    Returns
+    -------
+    pd.DataFrame
+        Features with ``(feature, symbol)`` columns; each feature block is
+        a dates × symbols frame.
+    """
+
+    def field(name: str) -> pd.DataFrame:
+        return panel.xs(name, axis=1, level=1)
+
+    close = field("Close")
+    high = field("High")
+    low = field("Low")
+    volume = field("Volume")
+    bench = benchmark["Close"].reindex(panel.index).ffill()
+
+    out = {
+        "Open": field("Open"),
+        "High": high,
+        "Low": low,
+        "Close": close,
+        "Volume": volume,
+    }
+    out["EMA50"] = ema(close, 50)
+    out["EMA200"] = ema(close, 200)
+    out["EMA50_slope"] = out["EMA50"].diff()
+
+    weekly = close.resample("W").last()
+    out["Weekly_MACD"] = macd(weekly).reindex(panel.index, method="ffill")
+    out["ROC63"] = close.pct_change(63)
+    out["ROC126"] = close.pct_change(126)
+    out["Weekly_RSI"] = rsi(weekly).reindex(panel.index, method="ffill")
+
+    prev_close = close.shift()
+    true_range = np.fmax(
+        np.fmax(high - low, (high - prev_close).abs()), (low - prev_close).abs()
+    )
+    out["ATR14"] = true_range.rolling(14).mean()
+    out["ATR_ratio"] = out["ATR14"] / close
+
+    direction = np.sign(close.diff()).fillna(0)
+    out["OBV"] = (direction * volume).cumsum()
+    out["OBV_slope"] = out["OBV"].diff()
+    out["Volume_pct"] = volume / volume.rolling(126).quantile(0.6)
+
+    close_ff = close.ffill()
+    bench_change = bench / bench.shift(252)
+    out["Rel_Strength"] = (close_ff / close_ff.shift(252)).div(bench_change, axis=0) - 1
+
+    bull = (bench > ema(bench, 200)).to_numpy()[:, None]
+    calm = (out["ATR_ratio"] < stress_threshold).to_numpy()
+    out["Regime"] = pd.DataFrame(bull & calm, index=panel.index, columns=close.columns)
+
+    return pd.concat(out, axis=1, names=["Field", "Symbol"])
+
+
+def _last(series: pd.Series, ts) -> float:
+    """Value of ``series`` forward-filled to ``ts`` (``NaN`` if none)."""
+    upto = series.loc[:ts]
+    return float(upto.iloc[-1]) if len(upto) else float("nan")
+
+
+def latest_features(
+    df: pd.DataFrame, benchmark: pd.DataFrame, stress_threshold: float = 0.08
+) -> dict:
+    """Compute the :func:`compute_features` values for the last row only.
+
+    EMAs still run over the full history, but the rolling indicators are
+    evaluated on the trailing window they need and the ratios from single
+    lookups, so no per-row feature columns are materialized.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Asset OHLCV data.
+    benchmark : pd.DataFrame
+        Benchmark OHLCV data.
+    stress_threshold : float, optional
+        Maximum acceptable ``ATR_ratio``.  Default is ``0.08`` (8%).
+
+    Returns
+    -------
+    dict
+        Feature values of the last row, keyed like the batch columns.
+    """
+
+    nan = float("nan")
+    n = len(df)
+    ts = df.index[-1]
+    close = df["Close"]
+    volume = df["Volume"]
+    bench = benchmark["Close"].reindex(df.index).ffill()
+    row = df.iloc[-1].to_dict()
+    last_close = row["Close"]
+
+    ema50 = ema(close, 50)
+    row["EMA50"] = float(ema50.iloc[-1])
+    row["EMA200"] = float(ema(close, 200).iloc[-1])
+    row["EMA50_slope"] = float(ema50.iloc[-1] - ema50.iloc[-2]) if n > 1 else nan
+
+    weekly = close.resample("W").last()
+    row["Weekly_MACD"] = _last(macd(weekly), ts)
+    row["Weekly_RSI"] = _last(rsi(weekly), ts)
+
+    row["ROC63"] = last_close / close.iloc[-64] - 1 if n > 63 else nan
+    row["ROC126"] = last_close / close.iloc[-127] - 1 if n > 126 else nan
+
+    row["ATR14"] = float(atr(df.iloc[-15:]).iloc[-1])
+    row["ATR_ratio"] = row["ATR14"] / last_close
+
+    obv = on_balance_volume(df)
+    row["OBV"] = float(obv.iloc[-1])
+    row["OBV_slope"] = float(obv.iloc[-1] - obv.iloc[-2]) if n > 1 else nan
+    row["Volume_pct"] = float(volume_percentile(volume.iloc[-126:]).iloc[-1])
+
+    aligned = pd.concat([close, bench], axis=1).ffill()
+    if n > 252:
+        asset_ratio = aligned.iloc[-1, 0] / aligned.iloc[-253, 0]
+        bench_ratio = aligned.iloc[-1, 1] / aligned.iloc[-253, 1]
+        row["Rel_Strength"] = float(asset_ratio / bench_ratio - 1)
+    else:
+        row["Rel_Strength"] = nan
+
+    bench_last = bench.iloc[-1]
+    bench_ema200 = ema(bench, 200).iloc[-1]
+    row["Regime"] = bool(
+        bench_last > bench_ema200 and row["ATR_ratio"] < stress_threshold
+    )
+    return row
+
+
 def compute_score(row: pd.Series, weights: Scores) -> float:
     trend_checks = [
         row["Close"] > row["EMA200"],
@@ -145,17 +295,255 @@ def compute_score(row: pd.Series, weights: Scores) -> float:
     return (trend_score + vol_score + rs_score + fund_score) * 100
 
 
+def compute_scores(features: pd.DataFrame, weights: Scores) -> pd.Series:
+    """Vectorized equivalent of :func:`compute_score` for a feature frame.
+
+    Produces the same values as applying :func:`compute_score` row by
+    row, using column operations instead of a Python call per row. Also
+    accepts the ``(feature, symbol)`` frames of :func:`compute_features_panel`,
+    returning one score column per symbol.
+    """
+    trend_hits = (
+        (features["Close"] > features["EMA200"]).astype(int)
+        + (features["EMA50_slope"] > 0).astype(int)
+        + (features["Weekly_MACD"] > 0).astype(int)
+    )
+    trend_score = weights.trend * (trend_hits / 3)
+
+    volume_pct = features["Volume_pct"]
+    vol_ok = (volume_pct >= 1) & (volume_pct <= 1.5) & (features["OBV_slope"] > 0)
+    vol_score = np.where(vol_ok, weights.volume, 0)
+
+    rs_score = np.where(features["Rel_Strength"] > 0, weights.rel_strength, 0)
+
+    fundamentals = (
+        features["Fundamental"] if "Fundamental" in features.columns else 0.5
+    )
+    fund_score = weights.fundamentals * fundamentals
+
+    return (trend_score + vol_score + rs_score + fund_score) * 100
+
+
+def week_label(ts: pd.Timestamp) -> pd.Timestamp:
+    """Return the label of the ``resample("W")`` bin containing ``ts``.
+
+    Weekly bins end (and are labelled) on Sunday midnight, right-closed.
+    """
+    label = ts.normalize() + pd.Timedelta(days=(6 - ts.weekday()) % 7)
+    if label < ts:
+        label += pd.Timedelta(days=7)
+    return label
+
+
+def _div(a: float, b: float) -> float:
+    """Divide like pandas: ``x / 0`` yields ``inf``/``NaN`` instead of raising."""
+    if b == 0:
+        if a != a or a == 0:
+            return NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+def signal_for(row) -> str:
+    """Return the signal for a single feature row with a ``Score``."""
+    if row["Regime"] and row["Score"] >= 60:
+        return "buy"
+    if row["Score"] < 45 or row["Close"] < row["EMA50"]:
+        return "sell"
+    return "hold"
+
+
+class MomentumState:
+    """Incremental indicator state mirroring :func:`compute_features`.
+
+    Weekly MACD/RSI are built from the running weekly close: completed weeks
+    are committed to the weekly indicators, while a bar closing a week (the
+    Sunday candle) sees the value including its own close, like the
+    forward-filled ``resample("W")`` series of the batch version.
+    """
+
+    def __init__(self) -> None:
+        self.ema50 = EMA(50)
+        self.ema200 = EMA(200)
+        self.prev_ema50 = NAN
+        self.weekly_ema12 = EMA(12)
+        self.weekly_ema26 = EMA(26)
+        self.weekly_rsi = RSI(14)
+        self.week = None
+        self.week_close = NAN
+        self.weekly_macd_value = NAN
+        self.weekly_rsi_value = NAN
+        self.close_63 = Lag(63)
+        self.close_126 = Lag(126)
+        self.atr = ATR(14)
+        self.obv = OBV()
+        self.prev_obv = NAN
+        self.volume_q60 = RollingQuantile(126, 0.6)
+        self.close = NAN
+        self.bench = NAN
+        self.close_252 = Lag(252)
+        self.bench_252 = Lag(252)
+        self.bench_ema200 = EMA(200)
+
+    def _commit_week(self, close: float) -> None:
+        self.weekly_ema12.update(close)
+        self.weekly_ema26.update(close)
+        self.weekly_macd_value = self.weekly_ema12.value - self.weekly_ema26.value
+        self.weekly_rsi_value = self.weekly_rsi.update(close)
+
+    def _weekly(self, ts: pd.Timestamp, close: float) -> tuple[float, float]:
+        label = week_label(ts)
+        if self.week is None:
+            self.week = label
+        elif label != self.week:
+            self._commit_week(self.week_close)
+            # Weeks without any bar are NaN rows in the resampled series.
+            for _ in range((label - self.week).days // 7 - 1):
+                self._commit_week(NAN)
+            self.week = label
+            self.week_close = NAN
+        if close == close:
+            self.week_close = close
+        if ts < label:
+            return self.weekly_macd_value, self.weekly_rsi_value
+        wc = self.week_close
+        return (
+            self.weekly_ema12.peek(wc) - self.weekly_ema26.peek(wc),
+            self.weekly_rsi.peek(wc),
+        )
+
+    def advance(
+        self, bar, ts: pd.Timestamp, benchmark: float | None, stress_threshold: float
+    ) -> dict:
+        close = float(bar["Close"])
+        high = float(bar["High"])
+        low = float(bar["Low"])
+        volume = float(bar["Volume"])
+        if benchmark is not None and benchmark == benchmark:
+            self.bench = float(benchmark)
+        if close == close:
+            self.close = close
+        bench = self.bench
+
+        row = dict(bar)
+        ema50 = self.ema50.update(close)
+        row["EMA50"] = ema50
+        row["EMA200"] = self.ema200.update(close)
+        row["EMA50_slope"] = ema50 - self.prev_ema50
+        self.prev_ema50 = ema50
+
+        weekly_macd, weekly_rsi = self._weekly(ts, close)
+        row["Weekly_MACD"] = weekly_macd
+        row["ROC63"] = _div(close, self.close_63.update(close)) - 1
+        row["ROC126"] = _div(close, self.close_126.update(close)) - 1
+        row["Weekly_RSI"] = weekly_rsi
+
+        row["ATR14"] = self.atr.update(high, low, close)
+        row["ATR_ratio"] = _div(row["ATR14"], close)
+
+        obv = self.obv.update(close, volume)
+        row["OBV"] = obv
+        row["OBV_slope"] = obv - self.prev_obv
+        self.prev_obv = obv
+        row["Volume_pct"] = _div(volume, self.volume_q60.update(volume))
+
+        asset_ratio = _div(self.close, self.close_252.update(self.close))
+        bench_ratio = _div(bench, self.bench_252.update(bench))
+        row["Rel_Strength"] = _div(asset_ratio, bench_ratio) - 1
+
+        bench_ema200 = self.bench_ema200.update(bench)
+        row["Regime"] = bool(
+            bench > bench_ema200 and row["ATR_ratio"] < stress_threshold
+        )
+        return row
+
+
 class MomentumStrategy(Strategy):
     """Replicates the previous momentum/trend strategy."""
 
-    def __init__(self, weights: Optional[Scores] = None) -> None:
+    incremental = True
+
+    def __init__(
+        self,
+        weights: Optional[Scores | Mapping[str, float]] = None,
+        stress_threshold: float = 0.08,
+    ) -> None:
+        if isinstance(weights, Mapping):
+            weights = Scores(**weights)
         self.weights = weights or Scores()
+        self.stress_threshold = stress_threshold
+
+    def _new_state(self) -> MomentumState:
+        return MomentumState()
+
+    def _advance(self, state, bar, timestamp, benchmark) -> dict:
+        row = state.advance(bar, timestamp, benchmark, self.stress_threshold)
+        row["Score"] = compute_score(row, self.weights)
+        row["Signal"] = signal_for(row)
+        return row
+
+    def latest_signal(
+        self,
+        df: pd.DataFrame,
+        benchmark: pd.DataFrame,
+        stress_threshold: Optional[float] = None,
+    ) -> pd.Series:
+        """Return ``Score`` and ``Signal`` for the last bar of ``df``.
+
+        Equivalent to ``generate_signals(df, benchmark).iloc[-1]`` but only
+        computes the final feature values.
+        """
+
+        if stress_threshold is None:
+            stress_threshold = self.stress_threshold
+        row = latest_features(df, benchmark, stress_threshold)
+        row["Score"] = compute_score(row, self.weights)
+        row["Signal"] = signal_for(row)
+        return pd.Series(row, name=df.index[-1])
+
+    def generate_signals_batch(
+        self,
+        panel: pd.DataFrame,
+        benchmark: pd.DataFrame,
+        stress_threshold: Optional[float] = None,
+    ) -> pd.DataFrame:
+        """Generate signals for every symbol of ``panel`` in one pass.
+
+        Features are computed column-wise across all symbols. Rows are
+        aligned on the union of panel dates, so for symbols with a bar on
+        every date the values equal those of :meth:`generate_signals`.
+
+        Returns
+        -------
+        pd.DataFrame
+            Features, ``Score`` and ``Signal`` with ``(symbol, column)``
+            MultiIndex columns.
+        """
+
+        if stress_threshold is None:
+            stress_threshold = self.stress_threshold
+        features = compute_features_panel(panel, benchmark, stress_threshold)
+        score = compute_scores(features, self.weights)
+        close = features["Close"]
+        conditions = [
+            features["Regime"] & (score >= 60),
+            (score < 45) | (close < features["EMA50"]),
+        ]
+        signal = pd.DataFrame(
+            np.select(conditions, ["buy", "sell"], default="hold"),
+            index=close.index,
+            columns=close.columns,
+        )
+        frames = {name: features[name] for name in features.columns.unique(0)}
+        frames["Score"] = score
+        frames["Signal"] = signal
+        return fields_to_panel(frames)
 
     def generate_signals(
         self,
         df: pd.DataFrame,
         benchmark: pd.DataFrame,
-        stress_threshold: float = 0.08,
+        stress_threshold: Optional[float] = None,
     ) -> pd.DataFrame:
         """Generate momentum-based trading signals.
 
@@ -167,13 +555,13 @@ class MomentumStrategy(Strategy):
             Benchmark data.
         stress_threshold : float, optional
             Maximum ``ATR_ratio`` before the regime is considered stressed.
-            Defaults to ``0.08`` (8%).
+            Defaults to the strategy's ``stress_threshold`` (8%).
         """
 
+        if stress_threshold is None:
+            stress_threshold = self.stress_threshold
         features = compute_features(df, benchmark, stress_threshold)
-        features["Score"] = features.apply(
-            compute_score, axis=1, weights=self.weights
-        )
+        features["Score"] = compute_scores(features, self.weights)
 
         conditions = [
             (features["Regime"]) & (features["Score"] >= 60),
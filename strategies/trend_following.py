@@ -6,7 +6,10 @@ from dataclasses import dataclass
 import numpy as np
 import pandas as pd
 
-from .base import Strategy
+from .base import Strategy, fields_to_panel
+from .indicators import EMA, RollingExtreme
+
+NAN = float("nan")
 
 
 @dataclass
@@ -18,9 +21,50 @@ class TrendParams:
     donchian_window: int = 20
 
 
+class TrendState:
+    """Incremental indicator state for :class:`TrendFollowingStrategy`."""
+
+    def __init__(self, params: TrendParams) -> None:
+        self.ema_short = EMA(params.short_window)
+        self.ema_long = EMA(params.long_window)
+        self.donchian_high = RollingExtreme(params.donchian_window, "max")
+        self.donchian_low = RollingExtreme(params.donchian_window, "min")
+        self.prev_diff = NAN
+        self.prev_high = NAN
+        self.prev_low = NAN
+
+    def advance(self, bar) -> dict:
+        close = float(bar["Close"])
+        row = dict(bar)
+        row["EMA_short"] = self.ema_short.update(close)
+        row["EMA_long"] = self.ema_long.update(close)
+        diff = row["EMA_short"] - row["EMA_long"]
+        row["EMA_diff"] = diff
+        row["Donchian_high"] = self.donchian_high.update(float(bar["High"]))
+        row["Donchian_low"] = self.donchian_low.update(float(bar["Low"]))
+
+        crossover_buy = diff > 0 and self.prev_diff <= 0
+        crossover_sell = diff < 0 and self.prev_diff >= 0
+        breakout_buy = close > self.prev_high
+        breakout_sell = close < self.prev_low
+        if crossover_buy or breakout_buy:
+            row["Signal"] = "buy"
+        elif crossover_sell or breakout_sell:
+            row["Signal"] = "sell"
+        else:
+            row["Signal"] = "hold"
+
+        self.prev_diff = diff
+        self.prev_high = row["Donchian_high"]
+        self.prev_low = row["Donchian_low"]
+        return row
+
+
 class TrendFollowingStrategy(Strategy):
     """Generate signals based on EMA crossovers and Donchian channel breakouts."""
 
+    incremental = True
+
     def __init__(
         self,
         short_window: int = 20,
@@ -29,6 +73,82 @@ class TrendFollowingStrategy(Strategy):
     ) -> None:
         self.params = TrendParams(short_window, long_window, donchian_window)
 
+    def _new_state(self) -> TrendState:
+        return TrendState(self.params)
+
+    def _advance(self, state, bar, timestamp, benchmark) -> dict:
+        return state.advance(bar)
+
+    def latest_signal(self, df: pd.DataFrame, benchmark: pd.DataFrame) -> pd.Series:
+        """Return the signal row for the last bar of ``df``.
+
+        The Donchian channel is evaluated on the trailing
+        ``donchian_window + 1`` bars only.
+        """
+        close = df["Close"]
+        window = self.params.donchian_window
+        ema_short = close.ewm(span=self.params.short_window, adjust=False).mean()
+        ema_long = close.ewm(span=self.params.long_window, adjust=False).mean()
+        diff = (ema_short.iloc[-2:] - ema_long.iloc[-2:]).tolist()
+        prev_diff = diff[0] if len(diff) > 1 else float("nan")
+
+        tail = df.iloc[-(window + 1):]
+        highs = tail["High"].rolling(window).max().tolist()
+        lows = tail["Low"].rolling(window).min().tolist()
+        prev_high = highs[-2] if len(highs) > 1 else float("nan")
+        prev_low = lows[-2] if len(lows) > 1 else float("nan")
+
+        row = df.iloc[-1].to_dict()
+        row.update(
+            EMA_short=float(ema_short.iloc[-1]),
+            EMA_long=float(ema_long.iloc[-1]),
+            EMA_diff=diff[-1],
+            Donchian_high=highs[-1],
+            Donchian_low=lows[-1],
+        )
+        last_close = row["Close"]
+        if (diff[-1] > 0 and prev_diff <= 0) or last_close > prev_high:
+            row["Signal"] = "buy"
+        elif (diff[-1] < 0 and prev_diff >= 0) or last_close < prev_low:
+            row["Signal"] = "sell"
+        else:
+            row["Signal"] = "hold"
+        return pd.Series(row, name=df.index[-1])
+
+    def generate_signals_batch(
+        self, panel: pd.DataFrame, benchmark: pd.DataFrame
+    ) -> pd.DataFrame:
+        """Generate signals for every symbol of ``panel`` in one pass.
+
+        EMAs and Donchian channels are computed on dates × symbols frames
+        and the result has ``(symbol, column)`` MultiIndex columns.
+        """
+        close = panel.xs("Close", axis=1, level=1)
+        high = panel.xs("High", axis=1, level=1)
+        low = panel.xs("Low", axis=1, level=1)
+        p = self.params
+
+        out = {
+            name: panel.xs(name, axis=1, level=1)
+            for name in ("Open", "High", "Low", "Close", "Volume")
+        }
+        out["EMA_short"] = close.ewm(span=p.short_window, adjust=False).mean()
+        out["EMA_long"] = close.ewm(span=p.long_window, adjust=False).mean()
+        diff = out["EMA_short"] - out["EMA_long"]
+        out["EMA_diff"] = diff
+        out["Donchian_high"] = high.rolling(p.donchian_window).max()
+        out["Donchian_low"] = low.rolling(p.donchian_window).min()
+
+        prev_diff = diff.shift(1)
+        buy = ((diff > 0) & (prev_diff <= 0)) | (close > out["Donchian_high"].shift(1))
+        sell = ((diff < 0) & (prev_diff >= 0)) | (close < out["Donchian_low"].shift(1))
+        out["Signal"] = pd.DataFrame(
+            np.select([buy, sell], ["buy", "sell"], default="hold"),
+            index=close.index,
+            columns=close.columns,
+        )
+        return fields_to_panel(out)
+
     def generate_signals(self, df: pd.DataFrame, benchmark: pd.DataFrame) -> pd.DataFrame:  # noqa: D401
         data = df.copy()
 
@@ -2,8 +2,11 @@
 
 import os
 import sys
+import tempfile
 import types
 
+import pytest
+
 
 def _ensure_stub(name: str) -> types.ModuleType:
     module = types.ModuleType(name)
@@ -21,6 +24,9 @@ def _ensure_stub(name: str) -> types.ModuleType:
 # ``tests`` directory.
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
+# Keep the databases written during tests out of the working tree.
+TEST_DB_DIR = tempfile.mkdtemp(prefix="hawkeye-test-")
+
 pandas = _ensure_stub("pandas")
 setattr(pandas, "DataFrame", type("DataFrame", (), {}))
 setattr(pandas, "Series", type("Series", (), {}))
@@ -80,6 +86,7 @@ schedule_mod.every = _every
 schedule_mod.run_pending = lambda: None
 
 matplotlib = _ensure_stub("matplotlib")
+matplotlib.use = lambda *a, **k: None
 plt = types.SimpleNamespace()
 mdates = types.SimpleNamespace()
 matplotlib.pyplot = plt
@@ -93,6 +100,13 @@ mplfinance.original_flavor = types.SimpleNamespace(
 )
 sys.modules.setdefault("mplfinance.original_flavor", mplfinance.original_flavor)
 
+import ohlcv_store
+import state_store
+
+state_store.DB_FILE = os.path.join(TEST_DB_DIR, "state.db")
+# hawkeye takes its cache database path from ohlcv_store at import.
+ohlcv_store.DB_FILE = os.path.join(TEST_DB_DIR, "cache.db")
+
 threading = _ensure_stub("threading")
 
 
@@ -106,3 +120,8 @@ class _DummyThread:
 
 threading.Thread = _DummyThread
 
+
+@pytest.fixture(autouse=True)
+def _test_databases(monkeypatch):
+    # Tests reloading ohlcv_store reset its module default.
+    monkeypatch.setattr(ohlcv_store, "DB_FILE", os.path.join(TEST_DB_DIR, "cache.db"))
@@ -6,7 +6,7 @@ import strategies.arbitrage as arb
 
 def _patch_dataframe(monkeypatch):
     """Replace pandas.DataFrame with a simple identity function."""
-    monkeypatch.setattr(arb.pd, "DataFrame", lambda rows: rows, raising=False)
+    monkeypatch.setattr(arb.pd, "DataFrame", lambda rows: rows)
 
 
 # Helper to mock requests.get to return predefined prices
@@ -28,7 +28,7 @@ def _mock_prices(monkeypatch, binance_price, coinbase_price):
         assert "coinbase" in url
         return Resp({"data": {"amount": str(coinbase_price)}})
 
-    monkeypatch.setattr(arb.requests, "get", fake_get, raising=False)
+    monkeypatch.setattr(arb.http_client, "get", fake_get)
 
 
 def test_generate_signals_hold(monkeypatch):
@@ -68,7 +68,7 @@ def test_generate_signals_raises_on_binance_error(monkeypatch):
     def fake_get(url, *args, **kwargs):
         raise HTTPError("boom")
 
-    monkeypatch.setattr(arb.requests, "get", fake_get, raising=False)
+    monkeypatch.setattr(arb.http_client, "get", fake_get)
 
     with pytest.raises(HTTPError):
         arb.ArbitrageStrategy().generate_signals()
@@ -98,7 +98,7 @@ def test_generate_signals_raises_on_coinbase_error(monkeypatch):
             return Resp({"price": "100"})
         return Resp(error=HTTPError("fail"))
 
-    monkeypatch.setattr(arb.requests, "get", fake_get, raising=False)
+    monkeypatch.setattr(arb.http_client, "get", fake_get)
 
     with pytest.raises(HTTPError):
         arb.ArbitrageStrategy().generate_signals()
@@ -13,3 +13,42 @@ def test_simulation_generates_notifications():
     assert notifications == messages
     assert messages[0] == "Balance: 900.00 | P&L: +0.00"
     assert messages[1] == "Balance: 1020.00 | P&L: +20.00"
+
+
+def test_ledger_tracks_realized_unrealized_and_fees():
+    ledger = autotrade_simulation.SimLedger(1000.0, fee_rate=0.001)
+    ledger.apply("BUY", 100.0, 2)
+    ledger.apply("BUY", 130.0, 1)
+    ledger.apply("SELL", 120.0, 2)
+
+    assert ledger.position == 1
+    assert abs(ledger.cost - 110.0) < 1e-9
+    assert abs(ledger.realized - 20.0) < 1e-9
+    assert abs(ledger.fees - 0.57) < 1e-9
+    assert abs(ledger.unrealized(150.0) - 40.0) < 1e-9
+    assert abs(
+        ledger.pnl(150.0) - (ledger.realized + ledger.unrealized(150.0) - ledger.fees)
+    ) < 1e-9
+
+
+def test_ledger_handles_position_flip():
+    ledger = autotrade_simulation.SimLedger(1000.0)
+    ledger.apply("BUY", 100.0, 1)
+    ledger.apply("SELL", 110.0, 3)
+
+    assert ledger.position == -2
+    assert ledger.realized == 10.0
+    assert ledger.cost == -220.0
+    assert ledger.unrealized(100.0) == 20.0
+
+
+def test_replay_matches_incremental_messages():
+    trades = [
+        {"side": "BUY", "price": 100.0, "qty": 1.5},
+        {"side": "BUY", "price": 90.0, "qty": 0.5},
+        {"side": "SELL", "price": 120.0, "qty": 2},
+    ]
+    ledger = autotrade_simulation.SimLedger(500.0)
+    messages = [ledger.apply(**t) for t in trades]
+    assert messages == autotrade_simulation.simulate_autotrade(trades, 500.0)
+    assert autotrade_simulation.SimLedger.replay(trades, 500.0) == ledger
@@ -60,11 +60,35 @@ def test_autotradesim_command_sets_percent(monkeypatch):
     assert any("ETHUSDT" in m for m in messages)
 
 
-def test_record_simulated_trade(monkeypatch):
-    cfg = {"sim_start": 1000, "sim_balance": 1000, "sim_position": 0.0, "sim_actions": []}
-    msg1 = hawkeye.record_simulated_trade(cfg, "BUY", 100, 2)
+def test_record_simulated_trade(monkeypatch, tmp_path):
+    monkeypatch.setattr(hawkeye.state_store, "DB_FILE", str(tmp_path / "state.db"))
+    cfg = {"sim_start": 1000, "sim_balance": 1000, "sim_position": 0.0}
+    msg1 = hawkeye.record_simulated_trade(cfg, "BUY", 100, 2, 1, "ETH")
     assert cfg["sim_balance"] == 1000 - 100 * 2
     assert "Balance" in msg1
-    msg2 = hawkeye.record_simulated_trade(cfg, "SELL", 110, 2)
+    msg2 = hawkeye.record_simulated_trade(cfg, "SELL", 110, 2, 1, "ETH")
     assert cfg["sim_balance"] == 1000 - 100 * 2 + 110 * 2
     assert "+" in msg2 or "-" in msg2
+    # Trades go to the state store, never into the symbol config.
+    assert "sim_actions" not in cfg
+    assert hawkeye.state_store.load_sim_trades("1", "ETH") == [
+        {"side": "BUY", "price": 100.0, "qty": 2.0},
+        {"side": "SELL", "price": 110.0, "qty": 2.0},
+    ]
+
+
+def test_record_simulated_trade_does_not_replay(monkeypatch, tmp_path):
+    monkeypatch.setattr(hawkeye.state_store, "DB_FILE", str(tmp_path / "state.db"))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("trade history replayed")
+
+    monkeypatch.setattr(hawkeye.state_store, "load_sim_trades", fail)
+    cfg = {"sim_start": 1000.0, "sim_balance": 1000.0, "sim_position": 0.0, "sim_cost": 0.0}
+    for _ in range(3):
+        hawkeye.record_simulated_trade(cfg, "BUY", 100.0, 1, chat_id=1, symbol="ETH")
+    msg = hawkeye.record_simulated_trade(cfg, "SELL", 110.0, 3, chat_id=1, symbol="ETH")
+
+    assert msg == "Balance: 1030.00 | P&L: +30.00"
+    assert cfg["sim_realized"] == 30.0
+    assert cfg["sim_position"] == 0.0
@@ -4,7 +4,9 @@ sys.modules.pop("pandas", None)
 import pandas as pd
 import importlib
 
+import backtest_engine
 import backtest
+importlib.reload(backtest_engine)
 importlib.reload(backtest)
 
 
@@ -1,6 +1,14 @@
+import threading
 import types
 
 import hawkeye
+from backtest_jobs import BacktestQueue
+
+
+def _result():
+    return types.SimpleNamespace(
+        metrics={"roi": 0.1, "max_drawdown": 0.2}, equity=[1.0, 1.1]
+    )
 
 
 def test_backtest_command_normalizes_symbol(monkeypatch):
@@ -26,14 +34,16 @@ def test_backtest_command_normalizes_symbol(monkeypatch):
 
     monkeypatch.setattr(hawkeye, "bot", DummyBot())
     monkeypatch.setattr(hawkeye, "translate", lambda cid, key, **kwargs: key)
+    monkeypatch.setattr(hawkeye, "backtest_queue", BacktestQueue(1))
+    monkeypatch.setattr(hawkeye, "generate_equity_chart", lambda equity, symbol: None)
 
     called = {}
 
-    def fake_run_backtest(symbol, start, end):
+    def fake_backtest_symbol(symbol, start, end, /, progress=None, **kwargs):
         called["symbol"] = symbol
-        return 0.1, 0.2
+        return _result()
 
-    monkeypatch.setattr(hawkeye, "run_backtest", fake_run_backtest)
+    monkeypatch.setattr(hawkeye, "backtest_symbol", fake_backtest_symbol)
 
     msg = types.SimpleNamespace(
         text="/backtest doge 2021-01-01 2021-02-01",
@@ -41,9 +51,115 @@ def test_backtest_command_normalizes_symbol(monkeypatch):
     )
 
     hawkeye.backtest_command(msg)
+    hawkeye.backtest_queue.wait(5)
 
     assert called["symbol"] == "DOGEUSDT"
-    assert "backtest_result" in messages
+    assert messages == ["backtest_queued", "backtest_result"]
+
+
+def test_backtest_command_runs_in_background_and_caches(monkeypatch):
+    replies = []
+    sent = []
+    photos = []
+
+    class DummyBot:
+        def reply_to(self, message, text):
+            replies.append(text)
+
+        def send_message(self, chat_id, text, **kwargs):
+            sent.append(text)
+
+        def send_photo(self, chat_id, photo, **kwargs):
+            photos.append(photo)
+
+    monkeypatch.setattr(hawkeye, "bot", DummyBot())
+    monkeypatch.setattr(
+        hawkeye, "translate", lambda cid, key, **kwargs: f"{key}:{kwargs.get('step', '')}"
+    )
+    monkeypatch.setattr(hawkeye, "backtest_queue", BacktestQueue(1))
+    monkeypatch.setattr(hawkeye, "generate_equity_chart", lambda equity, symbol: "chart")
+
+    release = threading.Event()
+    runs = []
+
+    def slow_backtest(symbol, start, end, /, progress=None, **kwargs):
+        runs.append(symbol)
+        progress("fetch")
+        # The handler must not wait for the backtest to finish.
+        assert release.wait(5)
+        return _result()
+
+    monkeypatch.setattr(hawkeye, "backtest_symbol", slow_backtest)
+    msg = types.SimpleNamespace(
+        text="/backtest btc 2021-01-01 2021-02-01", chat=types.SimpleNamespace(id=1)
+    )
+
+    hawkeye.backtest_command(msg)
+    assert replies == ["backtest_queued:"]
+    release.set()
+    hawkeye.backtest_queue.wait(5)
+
+    assert sent == ["backtest_progress:backtest_step_fetch:"]
+    assert replies == ["backtest_queued:", "backtest_result:"]
+    assert photos == ["chart"]
+
+    hawkeye.backtest_command(msg)
+    assert runs == ["BTCUSDT"]
+    assert replies[-1] == "backtest_result:"
+    assert photos == ["chart", "chart"]
+
+
+def test_backtest_command_uses_configured_strategy_and_reports_joins(monkeypatch):
+    replies = []
+
+    class DummyBot:
+        def reply_to(self, message, text):
+            replies.append(text)
+
+        def send_message(self, *args, **kwargs):
+            pass
+
+        def send_photo(self, *args, **kwargs):
+            pass
+
+    monkeypatch.setattr(hawkeye, "bot", DummyBot())
+    monkeypatch.setattr(hawkeye, "translate", lambda cid, key, **kwargs: key)
+    monkeypatch.setattr(hawkeye, "backtest_queue", BacktestQueue(1))
+    monkeypatch.setattr(hawkeye, "generate_equity_chart", lambda equity, symbol: None)
+    monkeypatch.setattr(hawkeye, "strategy_name", "arbitrage")
+    monkeypatch.setattr(hawkeye, "strategy_params", {"symbol": "BTCUSDT", "threshold": 0.01})
+
+    release = threading.Event()
+    runs = []
+
+    def slow_backtest(symbol, start, end, /, progress=None, **kwargs):
+        runs.append((symbol, kwargs))
+        assert release.wait(5)
+        return _result()
+
+    monkeypatch.setattr(hawkeye, "backtest_symbol", slow_backtest)
+    msg = types.SimpleNamespace(
+        text="/backtest eth 2021-01-01 2021-02-01", chat=types.SimpleNamespace(id=1)
+    )
+
+    hawkeye.backtest_command(msg)
+    hawkeye.backtest_command(msg)
+    assert replies == ["backtest_queued", "backtest_joined"]
+    release.set()
+    hawkeye.backtest_queue.wait(5)
+    assert runs == [
+        (
+            "ETHUSDT",
+            {"strategy_name": "arbitrage", "symbol": "BTCUSDT", "threshold": 0.01},
+        )
+    ]
+
+    # A changed configuration is not served from the cache.
+    monkeypatch.setattr(hawkeye, "strategy_params", {"symbol": "BTCUSDT", "threshold": 0.02})
+    hawkeye.backtest_command(msg)
+    hawkeye.backtest_queue.wait(5)
+    assert len(runs) == 2
+    assert runs[-1][1]["threshold"] == 0.02
 
 
 def test_backtest_command_invalid_date(monkeypatch):
@@ -0,0 +1,95 @@
+import sys
+for _name in ("numpy", "pandas"):
+    if not hasattr(sys.modules.get(_name), "__version__"):
+        sys.modules.pop(_name, None)
+import importlib
+
+import pandas as pd
+import pytest
+
+import backtest_engine
+importlib.reload(backtest_engine)
+
+from backtest_engine import BacktestConfig, run_engine
+
+
+def _frame(close, signals, low=None, high=None):
+    index = pd.date_range("2021-01-01", periods=len(close), freq="h")
+    return pd.DataFrame(
+        {
+            "Open": close,
+            "High": high or close,
+            "Low": low or close,
+            "Close": close,
+            "Signal": signals,
+        },
+        index=index,
+    )
+
+
+def test_default_config_matches_long_flat_model():
+    df = _frame([1, 2, 3, 2, 4], ["buy", "hold", "sell", "buy", "sell"])
+    result = run_engine(df, BacktestConfig(initial_balance=100.0))
+
+    assert result.equity.tolist() == [100.0, 200.0, 300.0, 300.0, 600.0]
+    assert result.metrics["roi"] == pytest.approx(5.0)
+    assert result.metrics["max_drawdown"] == 0.0
+    assert result.metrics["trades"] == 2
+    assert result.trades["reason"].tolist() == ["signal", "signal"]
+
+
+def test_fees_and_slippage_are_charged_on_each_fill():
+    df = _frame([100.0, 110.0], ["buy", "sell"])
+    cfg = BacktestConfig(
+        initial_balance=1000.0, trade_amount=500.0, trade_percent=None,
+        fee_rate=0.001, slippage=0.01,
+    )
+    result = run_engine(df, cfg)
+
+    qty = 500.0 / 101.0
+    cash = 1000.0 - qty * 101.0 * 1.001 + qty * 108.9 * 0.999
+    assert result.equity.iloc[-1] == pytest.approx(cash)
+    assert result.metrics["fees"] == pytest.approx(qty * (101.0 + 108.9) * 0.001)
+    trade = result.trades.iloc[0]
+    assert trade["qty"] == pytest.approx(qty)
+    assert trade["exit_price"] == pytest.approx(108.9)
+
+
+def test_stop_loss_and_take_profit_exit_intrabar():
+    signals = ["buy", "hold", "hold", "hold"]
+    stop = run_engine(
+        _frame([100, 100, 96, 97], signals, low=[100, 100, 90, 97]),
+        BacktestConfig(auto_stop=5),
+    )
+    assert stop.trades["reason"].tolist() == ["stop_loss"]
+    assert stop.trades["exit_price"].iloc[0] == pytest.approx(95.0)
+    assert stop.equity.iloc[-1] == pytest.approx(950.0)
+
+    take = run_engine(
+        _frame([100, 104, 103, 103], signals, high=[100, 111, 103, 103]),
+        BacktestConfig(auto_takeprofit=10),
+    )
+    assert take.trades["reason"].tolist() == ["take_profit"]
+    assert take.equity.iloc[-1] == pytest.approx(1100.0)
+
+
+def test_trailing_stop_follows_previous_highs():
+    close = [100, 110, 120, 110, 100]
+    df = _frame(close, ["buy", "hold", "hold", "hold", "hold"], low=[100, 110, 120, 105, 100])
+    result = run_engine(df, BacktestConfig(trailing_percent=10))
+
+    assert result.trades["reason"].tolist() == ["trailing_stop"]
+    assert result.trades["exit_price"].iloc[0] == pytest.approx(108.0)
+    assert result.trades["exit_time"].iloc[0] == df.index[3]
+
+
+def test_max_percent_caps_and_scales_position():
+    close = [100.0, 100.0, 100.0, 100.0]
+    df = _frame(close, ["buy", "hold", "buy", "hold"])
+    result = run_engine(df, BacktestConfig(trade_percent=100, max_percent=30))
+
+    assert result.trades["qty"].iloc[0] == pytest.approx(3.0)
+    assert result.trades["reason"].iloc[0] == "open"
+
+    without_cap = run_engine(df, BacktestConfig(trade_percent=20))
+    assert without_cap.trades["qty"].iloc[0] == pytest.approx(2.0)
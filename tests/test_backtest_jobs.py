@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+
+from backtest_jobs import BacktestQueue, request_key
+
+
+def test_request_key_is_order_independent():
+    assert request_key({"a": 1, "b": "x"}) == request_key({"b": "x", "a": 1})
+    assert request_key({"a": 1}) != request_key({"a": 2})
+
+
+def test_identical_requests_share_one_job():
+    queue = BacktestQueue(workers=1)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+    done = []
+
+    def job(progress):
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        progress("step")
+        return 42
+
+    updates = []
+    state, _ = queue.submit({"s": 1}, job, progress=updates.append, done=done.append)
+    assert state == "queued"
+    assert started.wait(5)
+    state, _ = queue.submit({"s": 1}, job, progress=updates.append, done=done.append)
+    assert state == "joined"
+    release.set()
+    queue.wait(5)
+
+    assert calls == [1]
+    assert updates == ["step", "step"]
+    assert done == [42, 42]
+    state, future = queue.submit({"s": 1}, job)
+    assert (state, future.result()) == ("cached", 42)
+    queue.shutdown()
+
+
+def test_results_expire_and_errors_are_reported(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("backtest_jobs.time.monotonic", lambda: clock[0])
+    queue = BacktestQueue(workers=2, ttl=10)
+
+    queue.submit({"s": 1}, lambda progress: "result")
+    queue.wait(5)
+    assert queue.cached(request_key({"s": 1})) == "result"
+    clock[0] += 11
+    assert queue.cached(request_key({"s": 1})) is None
+
+    errors = []
+
+    def failing(progress):
+        raise ValueError("no data")
+
+    _, future = queue.submit({"s": 2}, failing, error=errors.append)
+    queue.wait(5)
+    assert isinstance(errors[0], ValueError)
+    with pytest.raises(ValueError):
+        future.result()
+    assert queue.pending == 0
+    queue.shutdown()
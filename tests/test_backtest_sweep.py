@@ -0,0 +1,103 @@
+import sys
+for _name in ("numpy", "pandas"):
+    if not hasattr(sys.modules.get(_name), "__version__"):
+        sys.modules.pop(_name, None)
+import importlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import strategies.base as base
+import strategies.momentum as momentum
+import strategies.trend_following as trend_following
+import backtest_engine
+import backtest
+import backtest_sweep
+for _module in (base, momentum, trend_following, backtest_engine, backtest, backtest_sweep):
+    importlib.reload(_module)
+
+from test_momentum_strategy import _ohlcv
+
+
+def test_grid_and_random_search_params():
+    grid = backtest_sweep.expand_grid({"short_window": [10, 20], "long_window": [50, 100]})
+    assert len(grid) == 4
+    assert {"short_window": 20, "long_window": 50} in grid
+
+    draws = backtest_sweep.sample_params(
+        {"short_window": (5, 30), "threshold": (0.1, 0.2), "mode": ["a", "b"]}, 10, seed=1
+    )
+    assert draws == backtest_sweep.sample_params(
+        {"short_window": (5, 30), "threshold": (0.1, 0.2), "mode": ["a", "b"]}, 10, seed=1
+    )
+    assert all(5 <= d["short_window"] <= 30 and isinstance(d["short_window"], int) for d in draws)
+    assert all(0.1 <= d["threshold"] <= 0.2 for d in draws)
+
+    assert backtest_sweep.strategy_kwargs({"weights.trend": 0.7, "stress_threshold": 0.1}) == {
+        "weights": {"trend": 0.7},
+        "stress_threshold": 0.1,
+    }
+    assert backtest_sweep.parse_param("short_window=10,20") == ("short_window", [10, 20])
+    assert backtest_sweep.parse_param("weights.trend=0.2:0.8") == ("weights.trend", (0.2, 0.8))
+
+
+def test_shared_frame_round_trip():
+    df = _ohlcv(50, seed=2)
+    shm, spec = backtest_sweep.share_frame(df)
+    try:
+        view_shm, view = backtest_sweep.attach_frame(spec)
+        assert view.index.equals(df.index)
+        np.testing.assert_array_equal(view.to_numpy(), df[list(spec[2])].to_numpy(float))
+        view_shm.close()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_sweep_pool_matches_single_runs():
+    df = _ohlcv(300, seed=4)
+    params = backtest_sweep.expand_grid({"short_window": [5, 10, 20], "long_window": [30, 60]})
+
+    serial = backtest_sweep.sweep_frames(df, "trend_following", params, workers=1)
+    pooled = backtest_sweep.sweep_frames(df, "trend_following", params, workers=2)
+
+    pd.testing.assert_frame_equal(serial, pooled)
+    assert serial["roi"].is_monotonic_decreasing
+    best = serial.iloc[0]
+    expected, _ = backtest.equity_metrics(
+        trend_following.TrendFollowingStrategy(
+            int(best["short_window"]), int(best["long_window"])
+        ).generate_signals(df, df)
+    )
+    assert np.isclose(best["roi"], expected)
+
+    by_drawdown = backtest_sweep.sweep_frames(
+        df, "trend_following", params, workers=1, sort_by="max_drawdown"
+    )
+    assert by_drawdown["max_drawdown"].is_monotonic_increasing
+
+
+def test_ranges_require_samples(monkeypatch, capsys):
+    fetched = []
+    monkeypatch.setattr(backtest_sweep, "fetch_candles", lambda *a: fetched.append(a))
+    with pytest.raises(ValueError, match="short_window"):
+        backtest_sweep.run_sweep(
+            "BTCUSDT", "2022-01-01", "2023-01-01", grid={"short_window": (5, 30)}
+        )
+    assert fetched == []
+
+    with pytest.raises(SystemExit):
+        backtest_sweep.main(
+            ["BTCUSDT", "2022-01-01", "2023-01-01", "--param", "short_window=5:30"]
+        )
+    assert "--samples is required" in capsys.readouterr().err
+
+
+def test_sweep_momentum_weights():
+    df = _ohlcv(400, seed=5)
+    results = backtest_sweep.sweep_frames(
+        df, "momentum", [{"weights.trend": 0.3}, {"weights.trend": 0.9}], workers=1
+    )
+    assert "error" not in results
+    assert len(results) == 2
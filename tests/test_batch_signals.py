@@ -0,0 +1,87 @@
+import sys
+for _name in ("numpy", "pandas"):
+    if not hasattr(sys.modules.get(_name), "__version__"):
+        sys.modules.pop(_name, None)
+import importlib
+
+import numpy as np
+import pandas as pd
+
+import strategies.base as base
+import strategies.momentum as momentum
+import strategies.trend_following as trend_following
+import backtest_engine
+import backtest
+importlib.reload(base)
+importlib.reload(momentum)
+importlib.reload(trend_following)
+importlib.reload(backtest_engine)
+importlib.reload(backtest)
+
+from test_momentum_strategy import _ohlcv
+
+
+def _assert_matches(batch, expected):
+    for col in expected.columns:
+        if expected[col].dtype == bool or not pd.api.types.is_numeric_dtype(expected[col]):
+            assert (batch[col].astype(expected[col].dtype) == expected[col]).all(), col
+        else:
+            np.testing.assert_allclose(
+                batch[col].to_numpy(float), expected[col].to_numpy(float), rtol=1e-9, err_msg=col
+            )
+
+
+def test_momentum_batch_matches_single_asset():
+    frames = {"AAA": _ohlcv(seed=21), "BBB": _ohlcv(seed=22)}
+    bench = _ohlcv(seed=23)
+    strategy = momentum.MomentumStrategy()
+    batch = strategy.generate_signals_batch(base.make_panel(frames), bench)
+
+    assert list(batch.columns.get_level_values(0).unique()) == ["AAA", "BBB"]
+    for symbol, df in frames.items():
+        _assert_matches(batch[symbol], strategy.generate_signals(df, bench))
+
+
+def test_trend_batch_matches_single_asset_with_ragged_dates():
+    late = _ohlcv(n=400, seed=25)
+    late.index = late.index + pd.Timedelta(days=150)
+    frames = {"AAA": _ohlcv(seed=24), "BBB": late}
+    strategy = trend_following.TrendFollowingStrategy()
+    batch = strategy.generate_signals_batch(base.make_panel(frames), None)
+
+    for symbol, df in frames.items():
+        _assert_matches(batch[symbol].loc[df.index], strategy.generate_signals(df, None))
+
+
+def test_run_backtest_batch_matches_single_runs(monkeypatch):
+    frames = {"AAAUSDT": _ohlcv(n=300, seed=26), "BBBUSDT": _ohlcv(n=300, seed=27)}
+    frames["BTCUSDT"] = _ohlcv(n=300, seed=28)
+    monkeypatch.setattr(
+        backtest, "fetch_candles", lambda symbol, start, end, interval="1d": frames[symbol]
+    )
+
+    results = backtest.run_backtest_batch(
+        ["AAAUSDT", "BBBUSDT"], "2020-01-01", "2020-12-31", "trend_following"
+    )
+
+    for symbol in ("AAAUSDT", "BBBUSDT"):
+        expected = backtest.run_backtest(symbol, "2020-01-01", "2020-12-31", "trend_following")
+        assert np.allclose(results[symbol], expected)
+
+
+def test_tick_signals_batch_engine(monkeypatch):
+    import hawkeye
+
+    frames = {"AAAUSDT": _ohlcv(n=300, seed=29), "BBBUSDT": _ohlcv(n=280, seed=30)}
+    bench = _ohlcv(n=300, seed=31)
+    strategy = momentum.MomentumStrategy()
+    monkeypatch.setattr(hawkeye, "strategy", strategy)
+    monkeypatch.setattr(hawkeye, "signal_engine", "batch")
+
+    pair_data = {pair: (1.0, df) for pair, df in frames.items()}
+    pair_data["CCCUSDT"] = (None, None)
+    signals = hawkeye.tick_signals(pair_data, bench)
+
+    assert set(signals) == {"AAAUSDT", "BBBUSDT"}
+    for pair, df in frames.items():
+        assert signals[pair] == strategy.generate_signals(df, bench)["Signal"].iloc[-1]
@@ -8,7 +8,7 @@ def test_order_timeout(monkeypatch):
     def fake_post(*args, **kwargs):
         raise binance_client.Timeout("timeout")
 
-    monkeypatch.setattr(binance_client.requests, "post", fake_post, raising=False)
+    monkeypatch.setattr(binance_client.http_client, "post", fake_post)
 
     with pytest.raises(binance_client.BinanceAPIError):
         client.order("BTCUSDT", "BUY", 1.0)
@@ -20,7 +20,7 @@ def test_balance_request_exception(monkeypatch):
     def fake_get(*args, **kwargs):
         raise binance_client.RequestException("boom")
 
-    monkeypatch.setattr(binance_client.requests, "get", fake_get, raising=False)
+    monkeypatch.setattr(binance_client.http_client, "get", fake_get)
 
     with pytest.raises(binance_client.BinanceAPIError):
         client.balance()
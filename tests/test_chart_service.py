@@ -0,0 +1,190 @@
+import importlib
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+import chart_service
+from chart_service import ChartService
+
+
+def _fake_png(*args):
+    return repr(args).encode()
+
+
+PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+
+def _pid_png(*args):
+    return str(os.getpid()).encode()
+
+
+def _no_setup():
+    pass
+
+
+def test_identical_charts_are_rendered_once():
+    calls = []
+
+    def render(*args):
+        calls.append(args)
+        return _fake_png(*args)
+
+    service = ChartService(workers=0, cache_size=2, renderers={"line": render})
+    first = service.render("line", "BTCUSDT", [1, 2, 3])
+    second = service.render("line", "BTCUSDT", [1, 2, 3])
+    assert first.read() == second.read() == _fake_png([1, 2, 3])
+    assert len(calls) == 1
+
+    service.render("line", "BTCUSDT", [1, 2, 4])
+    service.render("line", "ETHUSDT", [1, 2, 3])
+    # LRU: the first chart was evicted by the two newer ones.
+    service.render("line", "BTCUSDT", [1, 2, 3])
+    assert len(calls) == 4
+    assert service.renders == 4
+
+
+def test_concurrent_requests_share_one_render():
+    started = threading.Event()
+    calls = []
+
+    def slow(*args):
+        calls.append(args)
+        started.set()
+        time.sleep(0.1)
+        return b"png"
+
+    service = ChartService(workers=0, renderers={"slow": slow})
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(service.render("slow", "X", 1).read()))
+        for _ in range(4)
+    ]
+    threads[0].start()
+    assert started.wait(5)
+    for t in threads[1:]:
+        t.start()
+    for t in threads:
+        t.join(5)
+    assert results == [b"png"] * 4
+    assert len(calls) == 1
+
+
+def test_failed_render_returns_none_and_is_not_cached():
+    attempts = []
+
+    def broken(*args):
+        attempts.append(args)
+        raise RuntimeError("no display")
+
+    service = ChartService(workers=0, renderers={"broken": broken})
+    assert service.render("broken", "X", 1) is None
+    assert service.render("broken", "X", 1) is None
+    assert len(attempts) == 2
+
+
+def test_in_process_renders_select_agg_once(monkeypatch):
+    setups = []
+    monkeypatch.setattr(chart_service, "_init_worker", lambda: setups.append(1))
+    service = ChartService(workers=0, renderers={"line": _fake_png})
+    service.render("line", "X", 1)
+    service.render("line", "X", 2)
+    assert setups == [1]
+
+
+def test_renders_in_worker_process(monkeypatch):
+    # Workers start from a fresh interpreter without the conftest stubs.
+    monkeypatch.setattr(chart_service, "_init_worker", _no_setup)
+    service = ChartService(workers=1, renderers={"pid": _pid_png})
+    try:
+        png = service.render("pid", "X", 1).read()
+    finally:
+        service.close()
+    assert int(png) != os.getpid()
+
+
+def test_candlestick_chart_sends_raw_candles(monkeypatch):
+    import hawkeye
+
+    service = ChartService(workers=0, renderers={"candles": _fake_png})
+    monkeypatch.setattr(hawkeye, "chart_service", service)
+    raw = [[1_700_000_000_000, "1", "2", "0.5", "1.5", "10"]]
+    monkeypatch.setattr(hawkeye, "fetch_json", lambda url, params=None, **kw: raw)
+
+    chart = hawkeye.generate_binance_candlestick("BTCUSDT")
+    assert chart.read() == _fake_png(
+        "BTCUSDT", [[1_700_000_000_000, 1.0, 2.0, 0.5, 1.5]], "%H:%M", "Time (UTC)", "Price"
+    )
+    hawkeye.generate_binance_candlestick("BTCUSDT")
+    assert service.renders == 1
+
+
+PLOTTING_MODULES = (
+    "numpy",
+    "pandas",
+    "matplotlib",
+    "matplotlib.pyplot",
+    "matplotlib.dates",
+    "mplfinance",
+    "mplfinance.original_flavor",
+)
+# Real modules imported by the first test using them; reused afterwards
+# because their submodules stay cached in sys.modules.
+_real_plotting = {}
+
+
+@pytest.fixture
+def real_plotting(monkeypatch):
+    """Replace the conftest plotting stubs by the real libraries or skip."""
+    for name in PLOTTING_MODULES:
+        if name in _real_plotting:
+            monkeypatch.setitem(sys.modules, name, _real_plotting[name])
+        elif not hasattr(sys.modules.get(name), "__file__"):
+            monkeypatch.delitem(sys.modules, name, raising=False)
+    matplotlib = pytest.importorskip("matplotlib")
+    pytest.importorskip("mplfinance")
+    for name in PLOTTING_MODULES:
+        _real_plotting[name] = importlib.import_module(name)
+    monkeypatch.setattr(chart_service, "_figures", {})
+    return matplotlib
+
+
+def _candles(n=5):
+    return [
+        [1_700_000_000_000 + i * 3_600_000, 1.0 + i, 2.0 + i, 0.5 + i, 1.5 + i]
+        for i in range(n)
+    ]
+
+
+def test_renderers_produce_png(real_plotting):
+    charts = [
+        chart_service.render_orderbook("BTCUSDT", [(99.0, 1.0), (98.0, 2.0)], [(101.0, 1.5)]),
+        chart_service.render_candles("BTCUSDT", _candles(), "%H:%M", "Time", "Price"),
+        chart_service.render_candle_grid([("BTC", _candles()), ("ETH", [])], "no data"),
+        chart_service.render_equity("BTCUSDT", [c[0] for c in _candles()], [1.0, 1.1, 1.0, 1.2, 1.3]),
+        # Figures are reused between renders of the same type.
+        chart_service.render_candles("ETHUSDT", _candles(3)),
+    ]
+    assert all(png.startswith(PNG_MAGIC) for png in charts)
+    assert len(chart_service._figures) == 4
+
+
+def test_in_process_render_produces_png(real_plotting):
+    service = ChartService(workers=0)
+    chart = service.render("candles", "BTCUSDT", "BTCUSDT", _candles())
+
+    assert chart is not None
+    assert chart.read().startswith(PNG_MAGIC)
+    assert real_plotting.get_backend().lower() == "agg"
+
+
+def test_worker_process_render_produces_png(real_plotting):
+    service = ChartService(workers=1)
+    try:
+        chart = service.render("equity", "BTCUSDT", "BTCUSDT", [0, 3_600_000], [1.0, 1.1])
+    finally:
+        service.close()
+    assert chart is not None
+    assert chart.read().startswith(PNG_MAGIC)
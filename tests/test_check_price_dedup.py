@@ -0,0 +1,112 @@
+import hawkeye
+
+
+class DummySignals:
+    def __init__(self, signal):
+        self.signal = signal
+    class _ILoc:
+        def __init__(self, signal):
+            self.signal = signal
+        def __getitem__(self, idx):
+            return {"Signal": self.signal}
+    @property
+    def iloc(self):
+        return self._ILoc(self.signal)
+
+
+class DummyBot:
+    def __init__(self):
+        self.messages = []
+    def send_message(self, cid, text):
+        self.messages.append((cid, text))
+    def send_photo(self, cid, photo):
+        pass
+    def message_handler(self, *args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+    def infinity_polling(self, *args, **kwargs):
+        pass
+
+
+def test_check_price_fetches_each_pair_once(monkeypatch):
+    bot = DummyBot()
+    monkeypatch.setattr(hawkeye, "bot", bot)
+    monkeypatch.setattr(hawkeye, "save_config", lambda: None)
+    monkeypatch.setattr(hawkeye, "translate", lambda cid, key, **kwargs: key)
+    monkeypatch.setattr(hawkeye, "get_binance_client", lambda cid: None)
+
+    price_calls = []
+    ohlcv_calls = []
+    signal_calls = []
+
+    def fake_price(sym):
+        price_calls.append(sym)
+        return 100.0
+
+    def fake_ohlcv(sym, limit=400):
+        ohlcv_calls.append(sym)
+        return object()
+
+    def fake_signals(asset, bench):
+        signal_calls.append(asset)
+        return DummySignals("sell")
+
+    monkeypatch.setattr(hawkeye, "get_price", fake_price)
+    monkeypatch.setattr(hawkeye, "get_daily_ohlcv", fake_ohlcv)
+    monkeypatch.setattr(hawkeye.strategy, "generate_signals", fake_signals)
+    hawkeye.users = {
+        "1": {"notifications": True, "symbols": {"ETH": {"last_signal": "buy"}}},
+        "2": {"notifications": True, "symbols": {"ETHUSDT": {"last_signal": "buy"}}},
+        "3": {"notifications": False, "symbols": {"BNBUSDT": {}}},
+    }
+
+    hawkeye.check_price()
+
+    assert price_calls == ["ETHUSDT"]
+    # benchmark plus one download for the shared pair
+    assert ohlcv_calls == ["BTCUSDT", "ETHUSDT"]
+    assert len(signal_calls) == 1
+    assert hawkeye.users["1"]["symbols"]["ETH"]["last_signal"] == "sell"
+    assert hawkeye.users["2"]["symbols"]["ETHUSDT"]["last_signal"] == "sell"
+    assert sorted(cid for cid, _ in bot.messages) == ["1", "2"]
+
+
+def test_alert_chart_is_built_once_and_reused_by_file_id(monkeypatch):
+    import io
+    from types import SimpleNamespace
+
+    class PhotoBot(DummyBot):
+        def __init__(self):
+            super().__init__()
+            self.photos = []
+        def send_photo(self, cid, photo):
+            self.photos.append((cid, photo))
+            return SimpleNamespace(photo=[SimpleNamespace(file_id="small"), SimpleNamespace(file_id="big")])
+
+    bot = PhotoBot()
+    monkeypatch.setattr(hawkeye, "bot", bot)
+    monkeypatch.setattr(hawkeye, "save_config", lambda: None)
+    monkeypatch.setattr(hawkeye, "translate", lambda cid, key, **kwargs: key)
+    monkeypatch.setattr(hawkeye, "get_price", lambda sym: 90.0)
+    monkeypatch.setattr(hawkeye, "get_daily_ohlcv", lambda sym, limit=400: None)
+
+    charts = []
+
+    def fake_chart(sym):
+        charts.append(sym)
+        return io.BytesIO(b"png")
+
+    monkeypatch.setattr(hawkeye, "generate_buy_sell_chart", fake_chart)
+    hawkeye.users = {
+        str(cid): {"notifications": True, "symbols": {"ETHUSDT": {"stop_loss": 95.0}}}
+        for cid in range(3)
+    }
+    hawkeye.alert_index.rebuild(hawkeye.users, hawkeye.normalize_symbol)
+
+    hawkeye.check_price()
+
+    assert charts == ["ETHUSDT"]
+    assert [cid for cid, _ in bot.photos] == ["0", "1", "2"]
+    assert bot.photos[0][1].read() == b"png"
+    assert [photo for _, photo in bot.photos[1:]] == ["big", "big"]
@@ -23,7 +23,7 @@ def test_get_daily_ohlcv_binance_handles_error(monkeypatch, caplog):
         def json(self):
             return {"msg": "Invalid symbol"}
     monkeypatch.setattr(
-        hawkeye.requests, "get", lambda *a, **k: Resp(), raising=False
+        hawkeye.http_client, "get", lambda *a, **k: Resp(), raising=False
     )
     with caplog.at_level(hawkeye.logging.ERROR):
         result = hawkeye.get_daily_ohlcv("BAD")
@@ -0,0 +1,26 @@
+import hawkeye
+
+
+def test_host_semaphore_is_shared_per_host():
+    a = hawkeye.host_semaphore("https://fapi.binance.com/fapi/v1/premiumIndex")
+    b = hawkeye.host_semaphore("https://fapi.binance.com/fapi/v1/depth")
+    c = hawkeye.host_semaphore("https://api.binance.com/api/v3/klines")
+    assert a is b
+    assert a is not c
+
+
+def test_fetch_tick_data_collects_all_pairs(monkeypatch):
+    monkeypatch.setattr(hawkeye, "ws_client", None)
+    monkeypatch.setattr(hawkeye, "fetch_workers", 4)
+    prices = {"ETHUSDT": 100.0, "BNBUSDT": None, "SOLUSDT": 20.0}
+    monkeypatch.setattr(hawkeye, "get_price", lambda sym: prices[sym])
+    monkeypatch.setattr(hawkeye, "get_daily_ohlcv", lambda sym, limit=400: f"ohlcv-{sym}")
+
+    benchmark, data = hawkeye.fetch_tick_data(sorted(prices))
+
+    assert benchmark == "ohlcv-BTCUSDT"
+    assert data == {
+        "BNBUSDT": (None, None),
+        "ETHUSDT": (100.0, "ohlcv-ETHUSDT"),
+        "SOLUSDT": (20.0, "ohlcv-SOLUSDT"),
+    }
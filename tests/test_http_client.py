@@ -0,0 +1,48 @@
+import types
+
+import http_client
+
+
+class FakeSession:
+    created = 0
+
+    def __init__(self):
+        FakeSession.created += 1
+        self.calls = []
+        self.closed = False
+        self.mounted = {}
+
+    def mount(self, prefix, adapter):
+        self.mounted[prefix] = adapter
+
+    def get(self, url, **kwargs):
+        self.calls.append(("GET", url))
+        return self
+
+    def post(self, url, **kwargs):
+        self.calls.append(("POST", url))
+        return self
+
+    def close(self):
+        self.closed = True
+
+
+def test_sessions_are_reused_per_host(monkeypatch):
+    FakeSession.created = 0
+    monkeypatch.setattr(http_client, "requests", types.SimpleNamespace(Session=FakeSession))
+    http_client.close_all()
+
+    a = http_client.get("https://fapi.binance.com/fapi/v1/premiumIndex")
+    b = http_client.post("https://fapi.binance.com/fapi/v1/order")
+    c = http_client.get("https://api.binance.com/api/v3/klines")
+
+    assert a is b
+    assert a is not c
+    assert FakeSession.created == 2
+    assert a.calls == [
+        ("GET", "https://fapi.binance.com/fapi/v1/premiumIndex"),
+        ("POST", "https://fapi.binance.com/fapi/v1/order"),
+    ]
+
+    http_client.close_all()
+    assert a.closed and c.closed
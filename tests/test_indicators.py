@@ -0,0 +1,153 @@
+import sys
+for _name in ("numpy", "pandas"):
+    if not hasattr(sys.modules.get(_name), "__version__"):
+        sys.modules.pop(_name, None)
+import importlib
+
+import numpy as np
+import pandas as pd
+
+import strategies.momentum as momentum
+import strategies.trend_following as trend_following
+from strategies import indicators
+importlib.reload(momentum)
+importlib.reload(trend_following)
+
+from test_momentum_strategy import _ohlcv
+
+FEATURES = [
+    "EMA50",
+    "EMA200",
+    "EMA50_slope",
+    "Weekly_MACD",
+    "ROC63",
+    "ROC126",
+    "Weekly_RSI",
+    "ATR14",
+    "ATR_ratio",
+    "OBV",
+    "OBV_slope",
+    "Volume_pct",
+    "Rel_Strength",
+    "Score",
+]
+
+
+def _stream(values, indicator):
+    return np.array([indicator.update(v) for v in values])
+
+
+def test_indicators_match_batch_helpers():
+    df = _ohlcv(n=300, seed=5)
+    close = df["Close"]
+
+    ema = _stream(close, indicators.EMA(20))
+    np.testing.assert_array_equal(ema, momentum.ema(close, 20).to_numpy())
+
+    rsi = _stream(close, indicators.RSI(14))
+    np.testing.assert_allclose(rsi, momentum.rsi(close).to_numpy(), rtol=1e-9)
+
+    atr = indicators.ATR(14)
+    streamed = [atr.update(h, l, c) for h, l, c in zip(df["High"], df["Low"], close)]
+    np.testing.assert_allclose(streamed, momentum.atr(df).to_numpy(), rtol=1e-9)
+
+    obv = indicators.OBV()
+    streamed = [obv.update(c, v) for c, v in zip(close, df["Volume"])]
+    np.testing.assert_allclose(
+        streamed, momentum.on_balance_volume(df).to_numpy(), rtol=1e-9
+    )
+
+    q60 = _stream(df["Volume"], indicators.RollingQuantile(126, 0.6))
+    np.testing.assert_allclose(
+        q60, df["Volume"].rolling(126).quantile(0.6).to_numpy(), rtol=1e-12
+    )
+
+    high = _stream(df["High"], indicators.RollingExtreme(20, "max"))
+    np.testing.assert_array_equal(high, df["High"].rolling(20).max().to_numpy())
+
+
+def test_momentum_stream_matches_generate_signals():
+    asset = _ohlcv(seed=1)
+    bench = _ohlcv(seed=2)
+    strategy = momentum.MomentumStrategy()
+    expected = strategy.generate_signals(asset, bench)
+
+    rows = []
+    bench_close = bench["Close"].reindex(asset.index).ffill()
+    for ts, bar in asset.iterrows():
+        rows.append(strategy.update(bar, bench_close[ts]))
+    actual = pd.DataFrame(rows, index=asset.index)
+
+    for col in FEATURES:
+        np.testing.assert_allclose(
+            actual[col].to_numpy(float), expected[col].to_numpy(float), rtol=1e-9, err_msg=col
+        )
+    assert (actual["Regime"] == expected["Regime"]).all()
+    assert (actual["Signal"] == expected["Signal"]).all()
+
+
+def test_prime_then_update_replaces_open_candle():
+    asset = _ohlcv(n=400, seed=3)
+    bench = _ohlcv(n=400, seed=4)
+    strategy = momentum.MomentumStrategy()
+    strategy.prime(asset.iloc[:-1], bench)
+
+    last = asset.iloc[-1]
+    partial = last.copy()
+    partial["Close"] = partial["Close"] * 0.9
+    strategy.update(partial, bench["Close"].iloc[-1])
+    row = strategy.update(last, bench["Close"].iloc[-1])
+
+    expected = strategy.generate_signals(asset, bench).iloc[-1]
+    assert strategy.last_timestamp == asset.index[-1]
+    assert row["Signal"] == expected["Signal"]
+    assert np.isclose(row["Score"], expected["Score"])
+    assert np.isclose(row["EMA50"], expected["EMA50"], rtol=1e-12)
+
+
+def test_snapshot_restore_roundtrip():
+    asset = _ohlcv(n=300, seed=6)
+    strategy = trend_following.TrendFollowingStrategy()
+    strategy.prime(asset.iloc[:200])
+    snap = strategy.snapshot()
+    first = [strategy.update(bar)["Signal"] for _, bar in asset.iloc[200:].iterrows()]
+
+    strategy.restore(snap)
+    second = [strategy.update(bar)["Signal"] for _, bar in asset.iloc[200:].iterrows()]
+    assert first == second
+
+
+def test_trend_stream_matches_generate_signals():
+    asset = _ohlcv(seed=7)
+    strategy = trend_following.TrendFollowingStrategy()
+    expected = strategy.generate_signals(asset, asset)
+
+    actual = pd.DataFrame(
+        [strategy.update(bar) for _, bar in asset.iterrows()], index=asset.index
+    )
+    for col in ["EMA_short", "EMA_long", "EMA_diff", "Donchian_high", "Donchian_low"]:
+        np.testing.assert_array_equal(actual[col].to_numpy(float), expected[col].to_numpy(float))
+    assert (actual["Signal"] == expected["Signal"]).all()
+
+
+def test_check_price_streams_new_bars_only(monkeypatch):
+    import hawkeye
+
+    asset = _ohlcv(n=400, seed=8)
+    bench = _ohlcv(n=400, seed=9)
+    strategy = momentum.MomentumStrategy()
+    monkeypatch.setattr(hawkeye, "strategy", strategy)
+    monkeypatch.setattr(hawkeye, "signal_streams", {})
+
+    hawkeye.pair_signal("ETHUSDT", asset.iloc[:-2], bench)
+    stream = hawkeye.signal_streams["ETHUSDT"]
+    fed = []
+    original = stream.update
+    monkeypatch.setattr(
+        stream, "update", lambda bar, b=None, ts=None: fed.append(ts) or original(bar, b, ts)
+    )
+
+    signal = hawkeye.pair_signal("ETHUSDT", asset, bench)
+
+    assert fed == list(asset.index[-3:])
+    assert signal == strategy.generate_signals(asset, bench)["Signal"].iloc[-1]
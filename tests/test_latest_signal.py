@@ -0,0 +1,58 @@
+import sys
+for _name in ("numpy", "pandas"):
+    if not hasattr(sys.modules.get(_name), "__version__"):
+        sys.modules.pop(_name, None)
+import importlib
+
+import numpy as np
+
+import strategies.base as base
+import strategies.momentum as momentum
+import strategies.trend_following as trend_following
+importlib.reload(base)
+importlib.reload(momentum)
+importlib.reload(trend_following)
+
+from test_momentum_strategy import _ohlcv
+
+COLUMNS = [
+    "EMA50",
+    "EMA200",
+    "EMA50_slope",
+    "Weekly_MACD",
+    "Weekly_RSI",
+    "ROC63",
+    "ROC126",
+    "ATR14",
+    "ATR_ratio",
+    "OBV",
+    "OBV_slope",
+    "Volume_pct",
+    "Rel_Strength",
+    "Score",
+]
+
+
+def test_momentum_latest_signal_matches_last_row():
+    asset = _ohlcv(seed=11)
+    bench = _ohlcv(seed=12)
+    strategy = momentum.MomentumStrategy()
+    # Include histories ending mid-week, on a Sunday and shorter than 252 bars.
+    for end in (100, 300, 403, 404, 600):
+        expected = strategy.generate_signals(asset.iloc[:end], bench).iloc[-1]
+        actual = strategy.latest_signal(asset.iloc[:end], bench)
+        for col in COLUMNS:
+            assert np.isclose(actual[col], expected[col], rtol=1e-9, equal_nan=True), col
+        assert actual["Regime"] == expected["Regime"]
+        assert actual["Signal"] == expected["Signal"]
+
+
+def test_trend_latest_signal_matches_last_row():
+    asset = _ohlcv(seed=13)
+    strategy = trend_following.TrendFollowingStrategy()
+    for end in (10, 21, 22, 250, 600):
+        expected = strategy.generate_signals(asset.iloc[:end], asset).iloc[-1]
+        actual = strategy.latest_signal(asset.iloc[:end], asset)
+        for col in ["EMA_short", "EMA_long", "EMA_diff", "Donchian_high", "Donchian_low"]:
+            assert np.isclose(actual[col], expected[col], equal_nan=True), col
+        assert actual["Signal"] == expected["Signal"]
@@ -0,0 +1,47 @@
+import sys
+for _name in ("numpy", "pandas"):
+    if not hasattr(sys.modules.get(_name), "__version__"):
+        sys.modules.pop(_name, None)
+import importlib
+
+import numpy as np
+import pandas as pd
+
+import strategies.momentum as momentum
+importlib.reload(momentum)
+
+
+def _ohlcv(n=600, seed=1):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    high = close * (1 + rng.uniform(0, 0.02, n))
+    low = close * (1 - rng.uniform(0, 0.02, n))
+    volume = rng.uniform(100, 200, n)
+    index = pd.date_range("2020-01-01", periods=n, freq="D")
+    return pd.DataFrame(
+        {"Open": close, "High": high, "Low": low, "Close": close, "Volume": volume},
+        index=index,
+    )
+
+
+def test_vectorized_scores_match_row_wise():
+    asset = _ohlcv(seed=1)
+    bench = _ohlcv(seed=2)
+    features = momentum.compute_features(asset, bench)
+    weights = momentum.Scores()
+
+    expected = features.apply(momentum.compute_score, axis=1, weights=weights)
+    actual = momentum.compute_scores(features, weights)
+
+    pd.testing.assert_series_equal(actual, expected, check_exact=True, check_names=False)
+
+
+def test_vectorized_scores_use_fundamental_column():
+    features = momentum.compute_features(_ohlcv(seed=3), _ohlcv(seed=4))
+    features["Fundamental"] = np.linspace(0, 1, len(features))
+    weights = momentum.Scores(trend=0.4, volume=0.3, rel_strength=0.2, fundamentals=0.1)
+
+    expected = features.apply(momentum.compute_score, axis=1, weights=weights)
+    actual = momentum.compute_scores(features, weights)
+
+    pd.testing.assert_series_equal(actual, expected, check_exact=True, check_names=False)
@@ -0,0 +1,182 @@
+import sys
+for _name in ("numpy", "pandas"):
+    if not hasattr(sys.modules.get(_name), "__version__"):
+        sys.modules.pop(_name, None)
+import importlib
+
+import ohlcv_store
+importlib.reload(ohlcv_store)
+import backtest
+importlib.reload(backtest)
+
+DAY = 86_400_000
+
+
+def _kline(ts, close):
+    return [ts, str(close), str(close + 1), str(close - 1), str(close), "10"]
+
+
+def test_store_and_load_candles(tmp_path):
+    db = str(tmp_path / "cache.db")
+    rows = ohlcv_store.parse_binance_klines([_kline(i * DAY, 100 + i) for i in range(5)])
+    ohlcv_store.store_candles("binance", "BTCUSDT", "1d", rows, db_file=db)
+    # the open candle is replaced, not duplicated
+    ohlcv_store.store_candles("binance", "BTCUSDT", "1d", [(4 * DAY, 1, 2, 0.5, 1.5, 3)], db_file=db)
+
+    assert ohlcv_store.last_open_time("binance", "BTCUSDT", "1d", db_file=db) == 4 * DAY
+    df = ohlcv_store.load_candles("binance", "BTCUSDT", "1d", limit=3, db_file=db)
+    assert list(df["Close"]) == [102.0, 103.0, 1.5]
+    assert list(df.columns) == ["Open", "High", "Low", "Close", "Volume"]
+    assert df.index.is_monotonic_increasing
+
+
+def test_missing_spans(tmp_path):
+    db = str(tmp_path / "cache.db")
+    ohlcv_store.add_span("binance", "ETHUSDT", "1d", 10 * DAY, 20 * DAY, db_file=db)
+    ohlcv_store.add_span("binance", "ETHUSDT", "1d", 21 * DAY, 25 * DAY, db_file=db)
+    ohlcv_store.add_span("binance", "ETHUSDT", "1d", 40 * DAY, 50 * DAY, db_file=db)
+
+    missing = ohlcv_store.missing_spans("binance", "ETHUSDT", "1d", 0, 60 * DAY, db_file=db)
+    assert missing == [(0, 9 * DAY), (26 * DAY, 39 * DAY), (51 * DAY, 60 * DAY)]
+    assert ohlcv_store.missing_spans("binance", "ETHUSDT", "1d", 12 * DAY, 24 * DAY, db_file=db) == []
+
+
+def test_fetch_candles_only_requests_missing_ranges(monkeypatch, tmp_path):
+    monkeypatch.setattr(ohlcv_store, "DB_FILE", str(tmp_path / "cache.db"))
+    requests_made = []
+
+    class Resp:
+        def __init__(self, payload):
+            self.payload = payload
+        def raise_for_status(self):
+            pass
+        def json(self):
+            return self.payload
+
+    def fake_get(url, params=None, timeout=10):
+        requests_made.append((params["startTime"], params["endTime"]))
+        start, end = params["startTime"], params["endTime"]
+        return Resp([_kline(ts, ts // DAY) for ts in range(start, end + 1, DAY)])
+
+    monkeypatch.setattr(backtest.http_client, "get", fake_get)
+
+    df = backtest.fetch_candles("btcusdt", "2021-01-01", "2021-01-10")
+    assert len(df) == 10
+    df = backtest.fetch_candles("BTCUSDT", "2021-01-05", "2021-01-15")
+    assert len(df) == 11
+    assert df["Close"].iloc[0] == df.index[0].timestamp() // 86400
+
+    jan1 = 1609459200000
+    assert requests_made == [
+        (jan1, jan1 + 9 * DAY),
+        (jan1 + 10 * DAY, jan1 + 14 * DAY),
+    ]
+
+
+def test_daily_ohlcv_fetches_only_new_candles(monkeypatch, tmp_path):
+    import hawkeye
+
+    monkeypatch.setattr(ohlcv_store, "DB_FILE", str(tmp_path / "cache.db"))
+    now_ms = int(hawkeye.time.time() * 1000) // DAY * DAY
+    calls = []
+
+    def fake_fetch(url, params=None, **kwargs):
+        calls.append(dict(params))
+        start = params.get("startTime", now_ms - (params["limit"] - 1) * DAY)
+        return [_kline(ts, 100) for ts in range(start, now_ms + 1, DAY)]
+
+    monkeypatch.setattr(hawkeye, "fetch_json", fake_fetch)
+
+    df = hawkeye.get_daily_ohlcv_binance("BTCUSDT", limit=30)
+    assert len(df) == 30
+    df = hawkeye.get_daily_ohlcv_binance("BTCUSDT", limit=30)
+    assert len(df) == 30
+    assert "startTime" not in calls[0]
+    assert calls[1]["startTime"] == now_ms
+
+
+HOUR = 3_600_000
+
+
+def test_malformed_chunk_is_skipped_and_retried(monkeypatch, tmp_path):
+    monkeypatch.setattr(ohlcv_store, "DB_FILE", str(tmp_path / "cache.db"))
+    monkeypatch.setattr(backtest._rate_limiter, "interval", 0)
+    monkeypatch.setattr(backtest, "KLINES_MAX_LIMIT", 5)
+    requests_made = []
+    broken = {"first": True}
+
+    class Resp:
+        def __init__(self, payload):
+            self.payload = payload
+        def raise_for_status(self):
+            pass
+        def json(self):
+            return self.payload
+
+    def fake_get(url, params=None, timeout=10):
+        start, end = params["startTime"], params["endTime"]
+        requests_made.append(start)
+        if start == jan1 and broken.pop("first", False):
+            return Resp([["not", "a", "kline"]])
+        return Resp([_kline(ts, ts // DAY) for ts in range(start, end + 1, DAY)])
+
+    jan1 = 1609459200000
+    monkeypatch.setattr(backtest.http_client, "get", fake_get)
+
+    df = backtest.fetch_candles("BTCUSDT", "2021-01-01", "2021-01-10")
+    assert len(df) == 5
+    assert df.index[0].day == 6
+
+    requests_made.clear()
+    df = backtest.fetch_candles("BTCUSDT", "2021-01-01", "2021-01-10")
+    assert len(df) == 10
+    assert requests_made == [jan1]
+
+
+def test_fetch_candles_paginates_long_ranges(monkeypatch, tmp_path):
+    monkeypatch.setattr(ohlcv_store, "DB_FILE", str(tmp_path / "cache.db"))
+    monkeypatch.setattr(backtest._rate_limiter, "interval", 0)
+    requests_made = []
+    attempts = {}
+
+    class Resp:
+        def __init__(self, payload, status_code=200):
+            self.payload = payload
+            self.status_code = status_code
+            self.headers = {"Retry-After": "0"}
+        def raise_for_status(self):
+            pass
+        def json(self):
+            return self.payload
+
+    def fake_get(url, params=None, timeout=10):
+        start, end = params["startTime"], params["endTime"]
+        attempts[start] = attempts.get(start, 0) + 1
+        if attempts[start] == 1 and len(attempts) == 2:
+            return Resp([], status_code=429)
+        requests_made.append((start, end))
+        rows = range(start, end + 1, HOUR)
+        assert len(rows) <= params["limit"] == backtest.KLINES_MAX_LIMIT
+        return Resp([_kline(ts, ts // HOUR) for ts in rows])
+
+    monkeypatch.setattr(backtest.http_client, "get", fake_get)
+
+    df = backtest.fetch_candles("BTCUSDT", "2021-01-01", "2021-04-01", "1h")
+    assert len(df) == 90 * 24 + 1
+    assert df.index.is_unique and df.index.is_monotonic_increasing
+    assert len(requests_made) == 3
+    assert max(attempts.values()) == 2
+
+    requests_made.clear()
+    df = backtest.fetch_candles("BTCUSDT", "2021-03-01", "2021-05-01", "1h")
+    assert len(df) == 61 * 24 + 1
+    april = 1617235200000
+    assert requests_made == [(april + HOUR, april + 30 * 24 * HOUR)]
+
+
+def test_kline_chunks_cover_range_without_overlap():
+    chunks = backtest.kline_chunks(0, 2500 * HOUR, "1h")
+    assert chunks[0] == (0, 999 * HOUR)
+    assert chunks[-1][1] == 2500 * HOUR
+    for (_, prev_end), (start, _) in zip(chunks, chunks[1:]):
+        assert start == prev_end + HOUR
@@ -0,0 +1,64 @@
+import json
+import os
+import time
+
+import persistence
+
+
+def _writer(path, snapshot, delay):
+    return persistence.Debouncer(
+        lambda: persistence.atomic_write_json(str(path), snapshot()), delay=delay
+    )
+
+
+def test_writes_are_coalesced(tmp_path):
+    path = tmp_path / "config.json"
+    state = {"n": 0}
+    calls = []
+
+    def snapshot():
+        calls.append(state["n"])
+        return dict(state)
+
+    writer = _writer(path, snapshot, delay=0.05)
+    for i in range(1, 51):
+        state["n"] = i
+        writer.mark_dirty()
+    assert not path.exists()
+
+    deadline = time.time() + 2
+    while writer.dirty and time.time() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)
+
+    assert calls == [50]
+    assert json.loads(path.read_text()) == {"n": 50}
+    assert os.listdir(tmp_path) == ["config.json"]
+
+
+def test_close_flushes_pending_changes(tmp_path):
+    path = tmp_path / "config.json"
+    writer = _writer(path, lambda: {"a": 1}, delay=60)
+    writer.mark_dirty()
+    writer.close()
+
+    assert json.loads(path.read_text()) == {"a": 1}
+    assert not writer.dirty
+
+
+def test_failed_write_keeps_old_file(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text('{"old": true}')
+
+    def broken():
+        return {"bad": object()}
+
+    writer = _writer(path, broken, delay=0)
+    try:
+        writer.mark_dirty()
+    except TypeError:
+        pass
+
+    assert json.loads(path.read_text()) == {"old": True}
+    assert writer.dirty
+    assert os.listdir(tmp_path) == ["config.json"]
@@ -0,0 +1,95 @@
+import sys
+for _name in ("numpy", "pandas"):
+    if not hasattr(sys.modules.get(_name), "__version__"):
+        sys.modules.pop(_name, None)
+import importlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import strategies.base as base
+import strategies.momentum as momentum
+import strategies.trend_following as trend_following
+import backtest_engine
+import backtest
+for _module in (base, momentum, trend_following, backtest_engine, backtest):
+    importlib.reload(_module)
+
+from backtest_engine import BacktestConfig, run_engine, run_portfolio
+from test_momentum_strategy import _ohlcv
+
+
+def _frame(close, signals, start="2021-01-01"):
+    index = pd.date_range(start, periods=len(close), freq="D")
+    return pd.DataFrame({"Close": close, "Signal": signals}, index=index)
+
+
+def test_single_symbol_portfolio_matches_engine():
+    df = trend_following.TrendFollowingStrategy(5, 20).generate_signals(_ohlcv(300, seed=8), None)
+    cfg = BacktestConfig(fee_rate=0.001, slippage=0.0005, auto_stop=4, trailing_percent=6)
+
+    portfolio = run_portfolio({"AAAUSDT": df}, cfg)
+    single = run_engine(df, cfg)
+
+    np.testing.assert_allclose(portfolio.equity.to_numpy(), single.equity.to_numpy())
+    pd.testing.assert_frame_equal(portfolio.trades.drop(columns="symbol"), single.trades)
+
+
+def test_shared_cash_respects_allocation_limits():
+    a = _frame([10.0, 10.0, 20.0, 20.0], ["buy", "hold", "hold", "sell"])
+    b = _frame([5.0, 5.0, 5.0, 10.0], ["buy", "hold", "hold", "hold"])
+    c = _frame([1.0, 1.0, 1.0], ["hold", "buy", "hold"], start="2021-01-02")
+
+    result = run_portfolio(
+        {"A": a, "B": b, "C": c},
+        BacktestConfig(initial_balance=1000.0),
+        allocations={"A": 50, "B": 25},
+    )
+
+    trades = result.trades.set_index("symbol")
+    # Explicit limits for A and B; C's equal share is capped by the cash left.
+    assert trades.loc["A", "qty"] == pytest.approx(50.0)
+    assert trades.loc["B", "qty"] == pytest.approx(50.0)
+    assert trades.loc["C", "qty"] == pytest.approx(250.0)
+    assert trades.loc["C", "entry_time"] == a.index[2]
+    assert result.holdings.loc[a.index[2]].sum() == pytest.approx(1500.0)
+    assert result.equity.iloc[-1] == pytest.approx(1000 + 500 + 250 + 0)
+    assert result.symbol_metrics.loc["A", "pnl"] == pytest.approx(500.0)
+    assert result.symbol_metrics.loc["C", "trades"] == 0
+    assert result.symbol_metrics.loc["B", "max_weight"] == pytest.approx(500 / 1750)
+
+
+def test_portfolio_backtest_uses_real_benchmark(monkeypatch):
+    frames = {
+        "AAAUSDT": _ohlcv(n=300, seed=40),
+        "BBBUSDT": _ohlcv(n=260, seed=41).iloc[:-40],
+        "BTCUSDT": _ohlcv(n=300, seed=42),
+    }
+    monkeypatch.setattr(
+        backtest, "fetch_candles", lambda symbol, start, end, interval="1d": frames[symbol.upper()]
+    )
+    captured = {}
+
+    class SpyStrategy(momentum.MomentumStrategy):
+        def generate_signals_batch(self, panel, benchmark):
+            captured["benchmark"] = benchmark
+            return super().generate_signals_batch(panel, benchmark)
+
+    monkeypatch.setattr(backtest, "get_strategy", lambda name, **kw: SpyStrategy(**kw))
+
+    result = backtest.run_portfolio_backtest(
+        ["aaausdt", "BBBUSDT"], "2020-01-01", "2020-12-31", "momentum",
+        config=BacktestConfig(max_percent=40),
+    )
+
+    assert captured["benchmark"] is frames["BTCUSDT"]
+    assert list(result.holdings.columns) == ["AAAUSDT", "BBBUSDT"]
+    assert result.equity.index.equals(frames["AAAUSDT"].index)
+    assert list(result.symbol_metrics.index) == ["AAAUSDT", "BBBUSDT"]
+    assert len(result.trades)
+    for trade in result.trades.itertuples():
+        weight = result.holdings.loc[trade.entry_time, trade.symbol] / result.equity[trade.entry_time]
+        assert weight <= 0.4 + 1e-9
+    close = frames["BTCUSDT"]["Close"]
+    assert result.metrics["benchmark_roi"] == pytest.approx(close.iloc[-1] / close.iloc[0] - 1)
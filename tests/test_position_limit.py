@@ -144,7 +144,7 @@ def test_autotradesim_skips_when_position_open(monkeypatch):
         }
     }
     calls = []
-    def fake_record(cfg, side, price, qty):
+    def fake_record(cfg, side, price, qty, chat_id, symbol):
         calls.append((side, qty))
         return ""
     monkeypatch.setattr(hawkeye, "record_simulated_trade", fake_record)
@@ -187,7 +187,9 @@ def test_autotrade_respects_max_percent(monkeypatch):
     assert abs(hawkeye.users["1"]["symbols"]["ETHUSDT"]["position"] - 2.5) < 1e-6
 
 
-def test_autotradesim_respects_max_percent(monkeypatch):
+def test_autotradesim_respects_max_percent(monkeypatch, tmp_path):
+    db_file = str(tmp_path / "state.db")
+    monkeypatch.setattr(hawkeye.state_store, "DB_FILE", db_file)
     bot = DummyBot()
     monkeypatch.setattr(hawkeye, "bot", bot)
     monkeypatch.setattr(hawkeye, "save_config", lambda: None)
@@ -216,7 +218,8 @@ def test_autotradesim_respects_max_percent(monkeypatch):
         hawkeye.check_price()
         hawkeye.users["1"]["symbols"]["ETHUSDT"]["last_signal"] = "sell"
     data = hawkeye.users["1"]["symbols"]["ETHUSDT"]
-    quantities = [a["qty"] for a in data["sim_actions"]]
+    trades = hawkeye.state_store.load_sim_trades("1", "ETHUSDT", db_file=db_file)
+    quantities = [t["qty"] for t in trades]
     expected = [1.0, 0.9, 0.6]
     assert all(abs(a - b) < 1e-6 for a, b in zip(quantities, expected))
     hawkeye.check_price()
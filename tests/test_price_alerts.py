@@ -0,0 +1,226 @@
+import threading
+
+import hawkeye
+from price_alerts import AlertDispatcher, AlertIndex
+
+
+class DummyBot:
+    def __init__(self):
+        self.messages = []
+    def send_message(self, cid, text):
+        self.messages.append((cid, text))
+    def send_photo(self, *args, **kwargs):
+        pass
+
+
+class LiveSocket:
+    connected = True
+    def __init__(self, prices):
+        self.prices = prices
+    def get_price(self, pair):
+        return self.prices.get(pair)
+    def set_symbols(self, pairs):
+        pass
+    def reconnect_stale(self):
+        return 0
+
+
+def test_index_keeps_only_users_with_alerts():
+    users = {
+        "1": {"symbols": {"ETH": {"stop_loss": 90.0}, "BNB": {"last_signal": "buy"}}},
+        "2": {"symbols": {"ETHUSDT": {"percent": 5, "base_price": 100.0}}},
+        "3": {"notifications": False, "symbols": {"ETH": {"stop_loss": 1.0}}},
+    }
+    index = AlertIndex()
+    index.rebuild(users, lambda sym: sym if sym.endswith("USDT") else sym + "USDT")
+
+    assert [(cid, sym) for cid, sym, _ in index.entries("ethusdt")] == [("1", "ETH"), ("2", "ETHUSDT")]
+    assert "BNBUSDT" not in index
+    assert index.entries("ETHUSDT")[0][2] is users["1"]["symbols"]["ETH"]
+
+
+def test_ticks_return_only_crossed_thresholds():
+    index = AlertIndex()
+    users = {
+        str(cid): {"symbols": {"ETHUSDT": {"stop_loss": 90.0 + cid, "take_profit": 110.0 + cid}}}
+        for cid in range(5)
+    }
+    index.rebuild(users, str.upper)
+
+    assert index.crossed("ETHUSDT", 100.0) == []
+    assert [cid for cid, _, _ in index.crossed("ETHUSDT", 92.5)] == ["3", "4"]
+    # Staying below a stop does not fire it again.
+    assert index.crossed("ETHUSDT", 92.2) == []
+    assert [cid for cid, _, _ in index.crossed("ETHUSDT", 112.0)] == ["0", "1", "2"]
+
+
+def test_updates_move_and_remove_single_entries():
+    index = AlertIndex()
+    data = {"stop_loss": 90.0}
+    index.update("1", "ETHUSDT", data, "ETHUSDT")
+    assert index.crossed("ETHUSDT", 100.0) == []
+
+    # A threshold set beyond the current price fires on the next tick.
+    data["stop_loss"] = 101.0
+    index.update("1", "ETHUSDT", data, "ETHUSDT")
+    assert [cid for cid, _, _ in index.crossed("ETHUSDT", 100.5)] == ["1"]
+
+    index.remove("1", "ETHUSDT")
+    assert "ETHUSDT" not in index
+    assert index.crossed("ETHUSDT", 50.0) == []
+
+
+def test_trailing_and_percent_thresholds():
+    index = AlertIndex()
+    trailing = {"trailing_percent": 10.0, "stop_loss": 90.0}
+    percent = {"percent": 5.0, "base_price": 100.0}
+    index.update("1", "ETHUSDT", trailing, "ETHUSDT")
+    index.update("2", "ETHUSDT", percent, "ETHUSDT")
+    index.crossed("ETHUSDT", 98.0)
+
+    # The stop is raised once the price exceeds 90 / 0.9.
+    assert [cid for cid, _, _ in index.crossed("ETHUSDT", 101.0)] == ["1"]
+    assert [cid for cid, _, _ in index.crossed("ETHUSDT", 105.0)] == ["2"]
+
+
+def test_dispatcher_handles_ticks_off_the_caller_thread():
+    index = AlertIndex()
+    index.rebuild({"1": {"symbols": {"ETHUSDT": {"stop_loss": 1.0}}}}, str.upper)
+    seen = []
+    dispatcher = AlertDispatcher(
+        lambda pair, price: seen.append((pair, price, threading.current_thread().name)),
+        index,
+    )
+    dispatcher.push("ethusdt", 10.0)
+    dispatcher.push("BTCUSDT", 20.0)
+    dispatcher.join()
+
+    assert seen == [("ETHUSDT", 10.0, "price-alerts")]
+
+
+def test_websocket_tick_fires_stop_loss_and_polling_skips_it(monkeypatch):
+    bot = DummyBot()
+    monkeypatch.setattr(hawkeye, "bot", bot)
+    monkeypatch.setattr(hawkeye, "save_config", lambda: None)
+    monkeypatch.setattr(hawkeye, "translate", lambda cid, key, **kwargs: key)
+    monkeypatch.setattr(hawkeye, "generate_buy_sell_chart", lambda sym: None)
+    monkeypatch.setattr(hawkeye, "get_daily_ohlcv", lambda sym, limit=400: None)
+    monkeypatch.setattr(hawkeye, "get_price", lambda sym: 80.0)
+    hawkeye.users = {"1": {"symbols": {"ETHUSDT": {"stop_loss": 95.0}}}}
+    hawkeye.alert_index.rebuild(hawkeye.users, hawkeye.normalize_symbol)
+
+    hawkeye.check_price_event("ETHUSDT", 96.0)
+    assert bot.messages == []
+    hawkeye.check_price_event("ETHUSDT", 94.0)
+    assert bot.messages == [("1", "stop_loss_reached")]
+    hawkeye.check_price_event("ETHUSDT", 93.0)
+    assert len(bot.messages) == 1
+
+    monkeypatch.setattr(hawkeye, "ws_client", LiveSocket({"ETHUSDT": 94.0}))
+    monkeypatch.setattr(hawkeye, "alert_dispatcher", object())
+    monkeypatch.setattr(hawkeye, "ws_alerts", True)
+    hawkeye.check_price()
+    assert len(bot.messages) == 1
+
+    # Without socket prices polling takes over with the same crossing rules:
+    # no repeat while the price stays below the stop-loss ...
+    monkeypatch.setattr(hawkeye, "ws_client", LiveSocket({}))
+    hawkeye.check_price()
+    assert len(bot.messages) == 1
+
+    # ... and a new alert once it crosses it again.
+    monkeypatch.setattr(hawkeye, "get_price", lambda sym: 100.0)
+    hawkeye.check_price()
+    assert len(bot.messages) == 1
+    monkeypatch.setattr(hawkeye, "get_price", lambda sym: 80.0)
+    hawkeye.check_price()
+    assert bot.messages[-1] == ("1", "stop_loss_reached")
+    assert len(bot.messages) == 2
+
+
+def test_set_command_updates_the_index(monkeypatch):
+    class Message:
+        def __init__(self, text):
+            self.text = text
+            self.chat = type("Chat", (), {"id": 7})()
+
+    bot = DummyBot()
+    bot.reply_to = lambda message, text: None
+    monkeypatch.setattr(hawkeye, "bot", bot)
+    monkeypatch.setattr(hawkeye, "save_config", lambda: None)
+    monkeypatch.setattr(hawkeye, "translate", lambda cid, key, **kwargs: key)
+    monkeypatch.setattr(hawkeye, "generate_buy_sell_chart", lambda sym: None)
+    hawkeye.users = {"7": {"notifications": True, "symbols": {}}}
+    hawkeye.alert_index.rebuild(hawkeye.users, hawkeye.normalize_symbol)
+
+    hawkeye.set_config(Message("/set SOLUSDT 10 20"))
+    hawkeye.check_price_event("SOLUSDT", 21.0)
+    assert bot.messages == [("7", "take_profit_reached")]
+
+    hawkeye.remove_symbol(Message("/remove SOLUSDT"))
+    assert "SOLUSDT" not in hawkeye.alert_index
+
+
+def test_rest_fallback_only_for_stale_socket_prices(monkeypatch):
+    rest = []
+    monkeypatch.setattr(hawkeye, "get_price", lambda sym: rest.append(sym) or 1.0)
+    # LiveSocket returns None for pairs without a fresh price.
+    monkeypatch.setattr(hawkeye, "ws_client", LiveSocket({"ETHUSDT": 2.0}))
+
+    assert hawkeye.resolve_price("ETHUSDT") == 2.0
+    assert hawkeye.resolve_price("BNBUSDT") == 1.0
+    assert rest == ["BNBUSDT"]
+
+
+def test_dispatcher_only_handles_the_latest_tick_per_pair():
+    index = AlertIndex()
+    index.rebuild(
+        {"1": {"symbols": {"ETHUSDT": {"stop_loss": 1.0}, "BTCUSDT": {"stop_loss": 1.0}}}},
+        str.upper,
+    )
+    started = threading.Event()
+    release = threading.Event()
+    seen = []
+
+    def slow(pair, price):
+        seen.append((pair, price))
+        started.set()
+        release.wait(5)
+
+    dispatcher = AlertDispatcher(slow, index)
+    dispatcher.push("ETHUSDT", 1.0)
+    assert started.wait(5)
+    for price in (2.0, 3.0, 4.0):
+        dispatcher.push("ETHUSDT", price)
+    dispatcher.push("BTCUSDT", 10.0)
+    release.set()
+    dispatcher.join()
+
+    assert seen == [("ETHUSDT", 1.0), ("ETHUSDT", 4.0), ("BTCUSDT", 10.0)]
+
+
+def test_stream_ticks_raise_trailing_stop_without_a_message_each(monkeypatch):
+    bot = DummyBot()
+    monkeypatch.setattr(hawkeye, "bot", bot)
+    monkeypatch.setattr(hawkeye, "save_config", lambda: None)
+    monkeypatch.setattr(hawkeye, "translate", lambda cid, key, **kw: (key, kw.get("sl")))
+    monkeypatch.setattr(hawkeye, "generate_buy_sell_chart", lambda sym: None)
+    monkeypatch.setattr(hawkeye, "get_daily_ohlcv", lambda sym, limit=400: None)
+    monkeypatch.setattr(hawkeye, "get_price", lambda sym: 115.0)
+    monkeypatch.setattr(hawkeye, "trailing_raises", {})
+    entry = {"trailing_percent": 10.0, "stop_loss": 90.0}
+    monkeypatch.setattr(hawkeye, "users", {"1": {"symbols": {"ETHUSDT": entry}}})
+    monkeypatch.setattr(hawkeye, "alert_index", AlertIndex())
+    hawkeye.alert_index.rebuild(hawkeye.users, hawkeye.normalize_symbol)
+
+    for price in (99.0, 105.0, 110.0, 115.0):
+        hawkeye.check_price_event("ETHUSDT", price)
+    assert entry["stop_loss"] == 103.5
+    assert bot.messages == []
+
+    monkeypatch.setattr(hawkeye, "ws_client", LiveSocket({"ETHUSDT": 115.0}))
+    monkeypatch.setattr(hawkeye, "alert_dispatcher", object())
+    monkeypatch.setattr(hawkeye, "ws_alerts", True)
+    hawkeye.check_price()
+    hawkeye.check_price()
+    assert bot.messages == [("1", ("trailing_raise", "103.50"))]
@@ -0,0 +1,107 @@
+import threading
+
+import hawkeye
+from price_snapshot import PriceSnapshot
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_snapshot_fetches_once_within_ttl():
+    calls = []
+    clock = Clock()
+
+    def fetch(url):
+        calls.append(url)
+        return [
+            {"symbol": "BTCUSDT", "markPrice": "100"},
+            {"symbol": "ETHUSDT", "markPrice": "10"},
+        ]
+
+    snap = PriceSnapshot(fetch, "https://example.com/premiumIndex", ttl=30, clock=clock)
+    assert snap.get("btcusdt")["markPrice"] == "100"
+    assert snap.get("ETHUSDT")["markPrice"] == "10"
+    assert snap.get("SOLUSDT") is None
+    assert len(calls) == 1
+
+    clock.now = 31
+    snap.get("BTCUSDT")
+    assert len(calls) == 2
+
+
+def test_failed_refresh_is_retried_after_a_short_backoff():
+    calls = []
+    clock = Clock()
+
+    def fetch(url):
+        calls.append(url)
+        return None
+
+    snap = PriceSnapshot(fetch, "https://example.com/premiumIndex", ttl=30, clock=clock)
+    assert snap.rows() == {}
+    assert snap.get("BTCUSDT") is None
+    assert len(calls) == 1
+
+    clock.now = 5
+    snap.rows()
+    assert len(calls) == 2
+
+
+def test_lookups_do_not_wait_for_a_running_refresh():
+    clock = Clock()
+    started = threading.Event()
+    release = threading.Event()
+    prices = iter(["100", "101"])
+
+    def fetch(url):
+        price = next(prices)
+        if price == "101":
+            started.set()
+            release.wait(5)
+        return [{"symbol": "BTCUSDT", "markPrice": price}]
+
+    snap = PriceSnapshot(fetch, "https://example.com/premiumIndex", ttl=30, clock=clock)
+    assert snap.get("BTCUSDT")["markPrice"] == "100"
+
+    clock.now = 31
+    refresher = threading.Thread(target=snap.rows)
+    refresher.start()
+    assert started.wait(5)
+    # The second lookup neither blocks nor starts another fetch.
+    assert snap.get("BTCUSDT")["markPrice"] == "100"
+    release.set()
+    refresher.join(5)
+    assert snap.get("BTCUSDT")["markPrice"] == "101"
+
+
+def test_get_price_uses_snapshot(monkeypatch):
+    calls = []
+
+    def fake_fetch(url, params=None, **kwargs):
+        calls.append((url, params))
+        if params:
+            # Per-symbol request: only the new listing is known.
+            if params["symbol"] == "NEWUSDT":
+                return {"symbol": "NEWUSDT", "markPrice": "2.5"}
+            return None
+        return [{"symbol": "BTCUSDT", "markPrice": "101.5"}]
+
+    snap = PriceSnapshot(fake_fetch, hawkeye.BINANCE_PRICE_URL, ttl=30)
+    monkeypatch.setattr(hawkeye, "mark_price_snapshot", snap)
+    monkeypatch.setattr(hawkeye, "fetch_json", fake_fetch)
+
+    assert hawkeye.get_price("BTCUSDT") == 101.5
+    assert calls == [(hawkeye.BINANCE_PRICE_URL, None)]
+
+    # Symbols missing from the snapshot fall back to the single-symbol endpoint.
+    assert hawkeye.get_price("NEWUSDT") == 2.5
+    assert hawkeye.get_price("ETHUSDT") is None
+    assert calls[1:] == [
+        (hawkeye.BINANCE_PRICE_URL, {"symbol": "NEWUSDT"}),
+        (hawkeye.BINANCE_PRICE_URL, {"symbol": "ETHUSDT"}),
+    ]
@@ -23,8 +23,8 @@ def test_place_protective_order_types(monkeypatch):
                 return {}
         return R()
 
-    monkeypatch.setattr(binance_client.requests, "get", fake_get, raising=False)
-    monkeypatch.setattr(binance_client.requests, "post", fake_post, raising=False)
+    monkeypatch.setattr(binance_client.http_client, "get", fake_get)
+    monkeypatch.setattr(binance_client.http_client, "post", fake_post)
 
     client.place_protective_order("BTCUSDT", "SELL", 1.0, 99.0)
     client.place_protective_order("BTCUSDT", "SELL", 1.0, 105.0)
@@ -0,0 +1,89 @@
+import sqlite3
+
+import pytest
+
+import state_store
+
+
+def _users():
+    return {
+        "1": {
+            "language": "de",
+            "symbols": {
+                "ETH": {
+                    "stop_loss": 1500.0,
+                    "trailing_percent": None,
+                    "sim_start": 1000.0,
+                    "sim_balance": 800.0,
+                    "sim_position": 2.0,
+                    "sim_actions": [{"side": "BUY", "price": 100, "qty": 2}],
+                },
+                "BTC": {"take_profit": 90000.0, "position": 0.5},
+            },
+        },
+        "2": {"language": "en", "symbols": {}},
+    }
+
+
+def test_migration_roundtrip(tmp_path):
+    db = str(tmp_path / "state.db")
+    assert state_store.migrate_from_config(_users(), db)
+    assert not state_store.migrate_from_config(_users(), db)
+
+    users = state_store.load_users(db)
+    eth = users["1"]["symbols"]["ETH"]
+    assert eth == {
+        "stop_loss": 1500.0,
+        "sim_start": 1000.0,
+        "sim_balance": 800.0,
+        "sim_position": 2.0,
+    }
+    assert users["1"]["symbols"]["BTC"]["position"] == 0.5
+    assert users["2"] == {"language": "en", "symbols": {}}
+    assert state_store.load_sim_trades("1", "ETH", db) == [
+        {"side": "BUY", "price": 100.0, "qty": 2.0}
+    ]
+    assert state_store.sim_trade_totals("1", db) == {"ETH": (1, 2.0)}
+
+
+def test_failed_migration_writes_nothing(tmp_path):
+    db = str(tmp_path / "state.db")
+    state_store.init_db(db)
+    with sqlite3.connect(db) as conn:
+        conn.execute("DROP TABLE sim_trades")
+
+    with pytest.raises(sqlite3.OperationalError):
+        state_store.migrate_from_config(_users(), db)
+
+    assert not state_store.is_migrated(db)
+    assert state_store.load_users(db) == {}
+
+
+def test_sync_writes_only_changed_rows(tmp_path):
+    db = str(tmp_path / "state.db")
+    state_store.migrate_from_config(_users(), db)
+    users = state_store.load_users(db)
+    assert state_store.sync_users(users, db) == 0
+
+    users["1"]["symbols"]["ETH"]["stop_loss"] = 1600.0
+    assert state_store.sync_users(users, db) == 1
+
+    users["1"]["symbols"]["BTC"]["position"] = 0.0
+    del users["2"]
+    assert state_store.sync_users(users, db) == 2
+
+    reloaded = state_store.load_users(db)
+    assert reloaded["1"]["symbols"]["ETH"]["stop_loss"] == 1600.0
+    assert reloaded["1"]["symbols"]["BTC"]["position"] == 0.0
+    assert "2" not in reloaded
+    with sqlite3.connect(db) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM symbols").fetchone()[0] == 2
+
+
+def test_clear_sim_trades(tmp_path):
+    db = str(tmp_path / "state.db")
+    state_store.add_sim_trade("1", "ETH", "buy", 100, 1, db)
+    state_store.add_sim_trade("1", "BTC", "BUY", 100, 1, db)
+    state_store.clear_sim_trades("1", "ETH", db)
+    assert state_store.load_sim_trades("1", "ETH", db) == []
+    assert state_store.sim_trade_totals("1", db) == {"BTC": (1, 1.0)}
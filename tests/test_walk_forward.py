@@ -0,0 +1,118 @@
+import sys
+for _name in ("numpy", "pandas"):
+    if not hasattr(sys.modules.get(_name), "__version__"):
+        sys.modules.pop(_name, None)
+import importlib
+
+import numpy as np
+import pytest
+
+import strategies.base as base
+import strategies.trend_following as trend_following
+import backtest_engine
+import backtest
+import backtest_sweep
+import walk_forward
+for _module in (base, trend_following, backtest_engine, backtest, backtest_sweep, walk_forward):
+    importlib.reload(_module)
+
+from test_momentum_strategy import _ohlcv
+
+
+def test_window_bounds():
+    assert walk_forward.window_bounds(100, 40, 20) == [(0, 40, 40, 60), (20, 60, 60, 80), (40, 80, 80, 100)]
+    assert walk_forward.window_bounds(100, 40, 20, anchored=True)[-1] == (0, 80, 80, 100)
+    with pytest.raises(ValueError):
+        walk_forward.window_bounds(100, 40, 20, step=10)
+
+
+def test_walk_forward_reuses_signals_and_picks_best_params(monkeypatch):
+    df = _ohlcv(500, seed=11)
+    grid = backtest_sweep.expand_grid({"short_window": [5, 10], "long_window": [30, 60]})
+    calls = []
+    original = trend_following.TrendFollowingStrategy.generate_signals
+
+    def counting(self, data, benchmark=None):
+        calls.append(self.params)
+        return original(self, data, benchmark)
+
+    monkeypatch.setattr(trend_following.TrendFollowingStrategy, "generate_signals", counting)
+    monkeypatch.setattr(
+        walk_forward, "get_strategy", lambda name, **kw: trend_following.TrendFollowingStrategy(**kw)
+    )
+
+    result = walk_forward.walk_forward_frames(df, "trend_following", grid, train=200, test=100)
+
+    # Three overlapping windows, but signals are computed once per parameter set.
+    assert len(result.windows) == 3
+    assert len(calls) == len(grid)
+
+    first = result.windows.iloc[0]
+    full = {
+        tuple(p.values()): trend_following.TrendFollowingStrategy(**p).generate_signals(df, df)
+        for p in grid
+    }
+    train_rois = {
+        key: backtest_engine.run_engine(signals.iloc[:200]).metrics["roi"]
+        for key, signals in full.items()
+    }
+    best = max(train_rois, key=train_rois.get)
+    assert tuple(first["params"].values()) == best
+    assert first["train_roi"] == pytest.approx(train_rois[best])
+    test_run = backtest_engine.run_engine(full[best].iloc[200:300])
+    assert first["test_roi"] == pytest.approx(test_run.metrics["roi"])
+
+    # Test windows are chained into one out-of-sample equity curve.
+    assert result.equity.index.equals(df.index[200:500])
+    expected = np.prod(1 + result.windows["test_roi"]) - 1
+    assert result.metrics["roi"] == pytest.approx(expected)
+    assert result.metrics["windows"] == 3
+
+
+def test_walk_forward_minimises_drawdown():
+    df = _ohlcv(500, seed=11)
+    grid = backtest_sweep.expand_grid({"short_window": [5, 10], "long_window": [30, 60]})
+
+    result = walk_forward.walk_forward_frames(
+        df, "trend_following", grid, train=200, test=100, metric="max_drawdown"
+    )
+
+    drawdowns = [
+        backtest_engine.run_engine(
+            trend_following.TrendFollowingStrategy(**p).generate_signals(df, df).iloc[:200]
+        ).metrics["max_drawdown"]
+        for p in grid
+    ]
+    first = result.windows.iloc[0]
+    assert first["train_max_drawdown"] == pytest.approx(min(drawdowns))
+    assert first["params"] == grid[int(np.argmin(drawdowns))]
+
+
+def test_positions_open_at_window_end_pay_exit_costs():
+    df = _ohlcv(500, seed=11)
+    grid = backtest_sweep.expand_grid({"short_window": [5], "long_window": [30]})
+    cfg = backtest_engine.BacktestConfig(fee_rate=0.01, slippage=0.01)
+
+    result = walk_forward.walk_forward_frames(
+        df, "trend_following", grid, train=200, test=50, config=cfg
+    )
+
+    closed = result.trades[result.trades["reason"] == "window_end"]
+    assert len(closed)
+    signals = walk_forward.SignalCache(df, "trend_following").signals(grid[0])
+    for _, trade in closed.iterrows():
+        end = df.index.get_loc(trade["exit_time"])
+        window = result.windows[result.windows["test_end"] == trade["exit_time"]].iloc[0]
+        start = df.index.get_loc(window["test_start"])
+        # Cash carried over from the previous test window.
+        balance = result.equity.iloc[start - 201] if start > 200 else cfg.initial_balance
+        marked = backtest_engine.run_engine(
+            signals.iloc[start:end + 1],
+            walk_forward.replace(cfg, initial_balance=balance),
+        )
+        # The window result is below its mark-to-market value by the exit costs.
+        assert result.equity[trade["exit_time"]] < marked.equity.iloc[-1]
+        assert trade["exit_price"] == pytest.approx(df["Close"].iloc[end] * 0.99)
+
+    expected = np.prod(1 + result.windows["test_roi"]) - 1
+    assert result.metrics["roi"] == pytest.approx(expected)
@@ -0,0 +1,216 @@
+import json
+import threading
+import time
+import types
+
+import pytest
+
+import binance_client
+from binance_client import BinanceWebSocketClient
+
+
+class FakeApp:
+    instances = []
+
+    def __init__(self, url, on_open, on_message, on_error, on_close):
+        self.url = url
+        self.on_open = on_open
+        self.on_message = on_message
+        self.on_close = on_close
+        self.sent = []
+        self.closed = False
+        self.kwargs = None
+        self._done = threading.Event()
+        FakeApp.instances.append(self)
+
+    def run_forever(self, **kwargs):
+        self.kwargs = kwargs
+        self.on_open(self)
+        self._done.wait(5)
+        self.on_close(self, None, None)
+
+    def send(self, text):
+        self.sent.append(json.loads(text))
+
+    def close(self):
+        self.closed = True
+        self._done.set()
+
+
+def _wait(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def _client(monkeypatch, symbols, **kwargs):
+    FakeApp.instances = []
+    monkeypatch.setattr(
+        binance_client, "websocket", types.SimpleNamespace(WebSocketApp=FakeApp)
+    )
+    kwargs.setdefault("messages_per_second", 1000)
+    client = BinanceWebSocketClient(symbols, **kwargs)
+    _wait(lambda: all(shard.connected for shard in client._shards))
+    return client
+
+
+def test_symbols_are_sharded_over_combined_streams(monkeypatch):
+    client = _client(monkeypatch, ["AUSDT", "BUSDT", "CUSDT"], max_streams=2)
+
+    assert client.connections == 2
+    urls = [app.url for app in FakeApp.instances]
+    assert urls == [
+        "wss://fstream.binance.com/stream?streams=ausdt@miniTicker/busdt@miniTicker",
+        "wss://fstream.binance.com/stream?streams=cusdt@miniTicker",
+    ]
+    assert client.connected
+
+    client.subscribe("DUSDT")
+    assert FakeApp.instances[1].sent[-1]["params"] == ["dusdt@miniTicker"]
+    client.subscribe("EUSDT")
+    assert client.connections == 3
+    client.close()
+
+
+def test_removal_rebalances_into_fewer_connections(monkeypatch):
+    client = _client(monkeypatch, ["AUSDT", "BUSDT", "CUSDT", "DUSDT"], max_streams=2)
+    first, second = FakeApp.instances
+
+    client.set_symbols(["AUSDT", "CUSDT"])
+
+    assert client.connections == 1
+    # One of the two half-empty connections is closed and its symbol moved.
+    closed, kept = (first, second) if first.closed else (second, first)
+    assert not kept.closed and closed.closed
+    removed, moved = ("dusdt", "ausdt") if kept is second else ("busdt", "cusdt")
+    assert [(m["method"], m["params"]) for m in kept.sent] == [
+        ("UNSUBSCRIBE", [f"{removed}@miniTicker"]),
+        ("SUBSCRIBE", [f"{moved}@miniTicker"]),
+    ]
+    assert sorted(client.symbols) == ["ausdt", "cusdt"]
+
+
+def test_set_symbols_batches_one_message_per_connection(monkeypatch):
+    client = _client(monkeypatch, ["AUSDT"], messages_per_second=2)
+    app = FakeApp.instances[0]
+
+    client.set_symbols(["AUSDT", "BUSDT", "CUSDT", "DUSDT"])
+    assert [(m["method"], m["params"]) for m in app.sent] == [
+        ("SUBSCRIBE", ["busdt@miniTicker", "cusdt@miniTicker", "dusdt@miniTicker"])
+    ]
+
+    # A second burst waits for its send slot without holding the client lock.
+    sender = threading.Thread(target=client.set_symbols, args=(["AUSDT"],))
+    sender.start()
+    _wait(lambda: client.symbols == ["ausdt"])
+    assert client._shard_lock.acquire(timeout=0.1)
+    client._shard_lock.release()
+    sender.join(5)
+    assert app.sent[-1]["method"] == "UNSUBSCRIBE"
+    assert len(app.sent[-1]["params"]) == 3
+    client.close()
+
+
+def test_changes_while_connecting_are_sent_on_open(monkeypatch):
+    gate = threading.Event()
+
+    class SlowApp(FakeApp):
+        def run_forever(self, **kwargs):
+            gate.wait(5)
+            super().run_forever(**kwargs)
+
+    FakeApp.instances = []
+    monkeypatch.setattr(
+        binance_client, "websocket", types.SimpleNamespace(WebSocketApp=SlowApp)
+    )
+    client = BinanceWebSocketClient(["AUSDT", "BUSDT"], messages_per_second=1000)
+    _wait(lambda: FakeApp.instances)
+    client.update_symbols(add=["CUSDT"], remove=["BUSDT"])
+    gate.set()
+    (shard,) = client._shards
+    _wait(lambda: shard.connected and len(FakeApp.instances[0].sent) == 2)
+
+    sent = [(m["method"], m["params"]) for m in FakeApp.instances[0].sent]
+    assert sent == [
+        ("UNSUBSCRIBE", ["busdt@miniTicker"]),
+        ("SUBSCRIBE", ["cusdt@miniTicker"]),
+    ]
+    assert shard._streamed == {"ausdt", "cusdt"}
+    client.close()
+
+
+def test_messages_of_all_shards_update_prices(monkeypatch):
+    seen = []
+    client = _client(monkeypatch, ["AUSDT", "BUSDT"], max_streams=1, on_price=lambda s, p: seen.append((s, p)))
+    payload = {"stream": "busdt@miniTicker", "data": {"s": "BUSDT", "c": "1.5"}}
+    FakeApp.instances[1].on_message(FakeApp.instances[1], json.dumps(payload))
+
+    assert client.get_price("busdt") == 1.5
+    assert seen == [("BUSDT", 1.5)]
+
+
+def test_book_ticker_reports_mid_price(monkeypatch):
+    client = _client(monkeypatch, ["AUSDT"], stream_type="bookTicker")
+    app = FakeApp.instances[0]
+    assert app.url.endswith("?streams=ausdt@bookTicker")
+
+    payload = {"stream": "ausdt@bookTicker", "data": {"s": "AUSDT", "b": "1.0", "a": "1.2"}}
+    app.on_message(app, json.dumps(payload).encode())
+    assert client.get_price("AUSDT") == 1.1
+
+
+def test_all_mark_price_stream_filters_subscribed_symbols(monkeypatch):
+    client = _client(monkeypatch, ["AUSDT"], stream_type="allMarkPrice")
+    client.subscribe("BUSDT")
+    assert client.connections == 1
+    app = FakeApp.instances[0]
+    assert app.url.endswith("?streams=!markPrice@arr@1s")
+    assert app.sent == []
+
+    payload = {
+        "stream": "!markPrice@arr@1s",
+        "data": [
+            {"e": "markPriceUpdate", "s": "AUSDT", "p": "2.5"},
+            {"e": "markPriceUpdate", "s": "BUSDT", "p": "3.5"},
+            {"e": "markPriceUpdate", "s": "CUSDT", "p": "4.5"},
+        ],
+    }
+    app.on_message(app, json.dumps(payload))
+    assert client.get_price("AUSDT") == 2.5
+    assert client.get_price("BUSDT") == 3.5
+    assert client.get_price("CUSDT") is None
+
+
+def test_unknown_stream_type_is_rejected(monkeypatch):
+    with pytest.raises(ValueError):
+        _client(monkeypatch, [], stream_type="depth")
+
+
+def test_prices_go_stale_and_silent_connections_reconnect(monkeypatch):
+    now = [100.0]
+    client = _client(
+        monkeypatch, ["AUSDT"], stale_after=30, backoff_base=0.001, clock=lambda: now[0]
+    )
+    app = FakeApp.instances[0]
+    assert app.kwargs == {"ping_interval": 20.0, "ping_timeout": 10.0}
+    app.on_message(app, json.dumps({"stream": "ausdt@miniTicker", "data": {"s": "AUSDT", "c": "2"}}))
+    assert client.get_price("AUSDT") == 2.0
+
+    now[0] += 31
+    assert client.get_price("AUSDT") is None
+    assert client.reconnect_stale() == 1
+    assert app.closed
+    # The same thread opens a new connection with the current symbols.
+    _wait(lambda: len(FakeApp.instances) == 2 and client.connected)
+    assert FakeApp.instances[1].url == app.url
+    client.close()
+
+
+def test_backoff_grows_exponentially_up_to_the_cap():
+    client = BinanceWebSocketClient.__new__(BinanceWebSocketClient)
+    client.backoff_base, client.backoff_max = 1.0, 8.0
+    delays = [client.backoff_delay(n) for n in range(6)]
+    assert 0.5 <= delays[0] <= 1.0
+    assert 4.0 <= delays[3] <= 8.0
+    assert all(d <= 8.0 for d in delays)
@@ -0,0 +1,303 @@
+"""Walk-forward analysis of strategy parameters.
+
+The history is cut into consecutive windows: each parameter set is ranked
+on a training window and the best one is traded on the following test
+window, then both windows roll forward. Only test windows count towards
+the reported out-of-sample result.
+
+Windows overlap heavily, so strategy indicators are not recomputed per
+window. :class:`SignalCache` generates the signals of every parameter set
+once over the full history; all strategies are causal, so the signal on a
+bar only depends on earlier bars and a window is a plain slice of the
+cached frame. This also keeps indicators warmed up at the start of each
+window, as they are in the live bot.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+import logging
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backtest import fetch_candles
+from backtest_engine import (
+    BARS_PER_YEAR,
+    BacktestConfig,
+    BacktestResult,
+    compute_metrics,
+    run_engine,
+)
+from backtest_sweep import LOWER_IS_BETTER, expand_grid, strategy_kwargs
+from strategies import get_strategy
+
+logger = logging.getLogger(__name__)
+
+
+class SignalCache:
+    """Full-history signals per parameter set, computed on first use."""
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        strategy_name: str,
+        benchmark: Optional[pd.DataFrame] = None,
+    ) -> None:
+        self.df = df
+        self.benchmark = df if benchmark is None else benchmark
+        self.strategy_name = strategy_name
+        self.computed = 0
+        self._signals: Dict[Tuple, pd.DataFrame] = {}
+
+    @staticmethod
+    def key(params: Mapping[str, Any]) -> Tuple:
+        return tuple(sorted(params.items()))
+
+    def signals(self, params: Mapping[str, Any]) -> pd.DataFrame:
+        """Return the signals of ``params`` over the full history."""
+        key = self.key(params)
+        cached = self._signals.get(key)
+        if cached is None:
+            strategy = get_strategy(self.strategy_name, **strategy_kwargs(params))
+            cached = strategy.generate_signals(self.df, self.benchmark)
+            self._signals[key] = cached
+            self.computed += 1
+        return cached
+
+
+def window_bounds(
+    n: int, train: int, test: int, step: Optional[int] = None, anchored: bool = False
+) -> List[Tuple[int, int, int, int]]:
+    """Return ``(train_start, train_end, test_start, test_end)`` bar ranges.
+
+    Ends are exclusive. ``step`` defaults to ``test``; smaller steps would
+    let test windows overlap and are rejected. With ``anchored`` every
+    training window starts at bar 0.
+    """
+    step = step or test
+    if step < test:
+        raise ValueError("step must not be smaller than the test window")
+    windows = []
+    start = 0
+    while start + train + test <= n:
+        train_end = start + train
+        windows.append((0 if anchored else start, train_end, train_end, train_end + test))
+        start += step
+    return windows
+
+
+def close_at_window_end(result: BacktestResult, cfg: BacktestConfig) -> BacktestResult:
+    """Sell a position left open by ``result`` at the last close.
+
+    The exit pays ``cfg.slippage`` and ``cfg.fee_rate`` like a signal exit,
+    so the next test window starts from cash that was actually realizable.
+    The trade is reported with reason ``"window_end"``.
+    """
+    trades = result.trades
+    is_open = trades["reason"] == "open"
+    if not is_open.any():
+        return result
+    row = trades.index[is_open][0]
+    qty = float(trades.at[row, "qty"])
+    cost = float(trades.at[row, "entry_price"]) * qty
+    marked = qty * float(trades.at[row, "exit_price"])
+    fill = float(trades.at[row, "exit_price"]) * (1 - cfg.slippage)
+    fee = qty * fill * cfg.fee_rate
+    pnl = qty * fill - fee - cost
+    trades = trades.astype({"exit_time": object})
+    trades.loc[row, ["exit_time", "exit_price", "pnl", "return", "reason"]] = [
+        result.equity.index[-1],
+        fill,
+        pnl,
+        pnl / cost if cost else 0.0,
+        "window_end",
+    ]
+    equity = result.equity.copy()
+    equity.iloc[-1] -= marked - (qty * fill - fee)
+    metrics = compute_metrics(
+        equity.to_numpy(),
+        trades,
+        np.zeros(len(equity)),
+        result.metrics["fees"] + fee,
+        cfg,
+    )
+    metrics["exposure"] = result.metrics["exposure"]
+    return BacktestResult(equity, trades, metrics)
+
+
+@dataclass
+class WalkForwardResult:
+    """Per-window choices and the chained out-of-sample performance."""
+
+    windows: pd.DataFrame
+    equity: pd.Series
+    trades: pd.DataFrame
+    metrics: dict = field(default_factory=dict)
+
+
+def walk_forward_frames(
+    df: pd.DataFrame,
+    strategy_name: str,
+    param_sets: Iterable[Mapping[str, Any]],
+    train: int,
+    test: int,
+    step: Optional[int] = None,
+    benchmark: Optional[pd.DataFrame] = None,
+    config: Optional[BacktestConfig] = None,
+    metric: str = "roi",
+    anchored: bool = False,
+    cache: Optional[SignalCache] = None,
+) -> WalkForwardResult:
+    """Run a walk-forward analysis on ``df``.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        OHLCV candles of the traded symbol.
+    strategy_name : str
+        Strategy passed to :func:`strategies.get_strategy`.
+    param_sets : Iterable[Mapping[str, Any]]
+        Candidate parameters, e.g. from :func:`backtest_sweep.expand_grid`.
+    train, test : int
+        Training and test window lengths in bars.
+    step : int, optional
+        Bars to roll forward after each window; defaults to ``test``.
+    benchmark : pd.DataFrame, optional
+        Benchmark candles; defaults to ``df`` like :func:`run_backtest`.
+    config : BacktestConfig, optional
+        Trading rules and costs for all runs.
+    metric : str
+        Engine metric optimised on the training windows; metrics in
+        :data:`backtest_sweep.LOWER_IS_BETTER` are minimised.
+    anchored : bool
+        Grow the training window from the first bar instead of rolling it.
+    cache : SignalCache, optional
+        Reuse signals computed by an earlier run.
+
+    Returns
+    -------
+    WalkForwardResult
+        One row per window with the chosen params, their training score and
+        test metrics, plus the chained test-window equity curve, trades and
+        aggregate out-of-sample metrics.
+    """
+
+    cfg = config or BacktestConfig()
+    param_sets = list(param_sets)
+    if not param_sets:
+        raise ValueError("No parameter sets to evaluate")
+    cache = cache or SignalCache(df, strategy_name, benchmark)
+    bounds = window_bounds(len(df), train, test, step, anchored)
+    if not bounds:
+        raise ValueError("Not enough candles for one training and test window")
+
+    lower = metric in LOWER_IS_BETTER
+    worst = np.inf if lower else -np.inf
+    pick = np.argmin if lower else np.argmax
+    rows = []
+    curves = []
+    trades = []
+    balance = float(cfg.initial_balance)
+    for train_start, train_end, test_start, test_end in bounds:
+        scores = []
+        for params in param_sets:
+            window = cache.signals(params).iloc[train_start:train_end]
+            value = run_engine(window, cfg).metrics.get(metric, np.nan)
+            scores.append(worst if np.isnan(value) else value)
+        best_index = int(pick(scores))
+        best = param_sets[best_index]
+        # The test window continues with the cash left by the previous one; a
+        # position still open at its end is sold at the last close, paying
+        # fees and slippage, so no exit is booked for free.
+        test_cfg = replace(cfg, initial_balance=balance)
+        result = close_at_window_end(
+            run_engine(cache.signals(best).iloc[test_start:test_end], test_cfg), test_cfg
+        )
+        balance = float(result.equity.iloc[-1])
+        curves.append(result.equity)
+        trades.append(result.trades)
+        rows.append(
+            {
+                "train_start": df.index[train_start],
+                "train_end": df.index[train_end - 1],
+                "test_start": df.index[test_start],
+                "test_end": df.index[test_end - 1],
+                "params": dict(best),
+                f"train_{metric}": scores[best_index],
+                **{f"test_{k}": v for k, v in result.metrics.items()},
+            }
+        )
+
+    equity = pd.concat(curves)
+    trade_frame = pd.concat(trades, ignore_index=True)
+    windows = pd.DataFrame(rows)
+    values = equity.to_numpy()
+    metrics = compute_metrics(
+        values, trade_frame, np.zeros(len(values)), float(windows["test_fees"].sum()), cfg
+    )
+    lengths = [end - start for _, _, start, end in bounds]
+    metrics["exposure"] = float(np.average(windows["test_exposure"], weights=lengths))
+    metrics["windows"] = len(windows)
+    train_mean = windows[f"train_{metric}"].replace(worst, np.nan).mean()
+    test_key = f"test_{metric}"
+    if test_key in windows and train_mean:
+        metrics["efficiency"] = float(windows[test_key].mean() / train_mean)
+    logger.info(
+        "Walk-forward over %d windows: out-of-sample ROI %.2f%% (%d signal runs)",
+        len(windows),
+        metrics["roi"] * 100,
+        cache.computed,
+    )
+    return WalkForwardResult(windows, equity, trade_frame, metrics)
+
+
+def run_walk_forward(
+    symbol: str,
+    start: str,
+    end: str,
+    strategy_name: str,
+    grid: Mapping[str, Sequence[Any]],
+    train: int,
+    test: int,
+    step: Optional[int] = None,
+    interval: str = "1d",
+    benchmark: Optional[str] = None,
+    config: Optional[BacktestConfig] = None,
+    metric: str = "roi",
+    anchored: bool = False,
+) -> WalkForwardResult:
+    """Fetch candles for ``symbol`` and run :func:`walk_forward_frames` on ``grid``."""
+    df = fetch_candles(symbol, start, end, interval)
+    if df.empty:
+        raise ValueError("No data returned from Binance")
+    bench = None
+    if benchmark and benchmark.upper() != symbol.upper():
+        bench = fetch_candles(benchmark, start, end, interval)
+        if bench.empty:
+            raise ValueError(f"No benchmark data for {benchmark}")
+    if config is None:
+        config = BacktestConfig(bars_per_year=BARS_PER_YEAR.get(interval, 365))
+    return walk_forward_frames(
+        df,
+        strategy_name,
+        expand_grid(grid),
+        train,
+        test,
+        step,
+        benchmark=bench,
+        config=config,
+        metric=metric,
+        anchored=anchored,
+    )
+
+
+__all__ = [
+    "SignalCache",
+    "WalkForwardResult",
+    "window_bounds",
+    "close_at_window_end",
+    "walk_forward_frames",
+    "run_walk_forward",
+]